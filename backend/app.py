@@ -1,16 +1,34 @@
 """
 EduFlow LMS - Application Launcher
 Simple launcher that imports the main application from main.py
+
+Development (default): single process with auto-reload.
+Production: RELOAD=0 WORKERS=4 python app.py
 """
 
+import os
 import uvicorn
 from main import app
+from database import engine
 
 if __name__ == "__main__":
+    reload = os.getenv("RELOAD", "1") == "1"  # Set RELOAD=0 outside development
+    workers = int(os.getenv("WORKERS", os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    if engine.dialect.name != "postgresql":
+        workers = 1  # Startup init is only serialized across workers on PostgreSQL
+
     # Run the application using the app from main.py
+    # httptools replaces the pure-Python HTTP parser; loop="auto" uses uvloop when it is
+    # installed (not on Windows) and falls back to asyncio otherwise
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
-    ) 
\ No newline at end of file
+        reload=reload,
+        workers=1 if reload else workers,  # Reload mode only supports a single process
+        loop="auto",
+        http="httptools",
+        proxy_headers=True,
+        timeout_keep_alive=30,
+        limit_concurrency=1000
+    )
@@ -1,14 +1,21 @@
 import os
+import time
+import hashlib
 import jwt
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import Optional, Tuple
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Dict, Optional, Tuple
 
-from database import get_db
-from models import User, UserRole
+from database import get_db, STRICT_LOADING
+from models import Department, User, UserRole
+from utils.cache import TTLCache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -22,6 +29,66 @@ REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 24 * 30  # 30 days
 # Security scheme for token extraction
 security = HTTPBearer()
 
+# Relationships loaded together with the current user; add to this list rather than
+# touching other lazy relationships on current_user in endpoints (one query, no N+1).
+# Many-to-one, so a joined load costs no extra round trip.
+CURRENT_USER_LOAD_OPTIONS = (joinedload(User.department),)
+if STRICT_LOADING:
+    CURRENT_USER_LOAD_OPTIONS += (raiseload("*"),)
+
+# Opt-in caches for the auth hot path (keyed by token hash, never the raw token)
+JWT_CACHE_ENABLED = os.getenv("JWT_CACHE_ENABLED", "0") == "1"
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+_user_cache = TTLCache(maxsize=5000, ttl=60)
+
+# (role, is_active) per user id, re-read for role-gated routes so a demoted or deactivated
+# user loses access even though their token still carries the old role. Always on: the
+# TTL bounds how long other workers (which invalidate_cached_user can't reach) may lag.
+_user_status_cache = TTLCache(maxsize=10000, ttl=30)
+
+@dataclass(frozen=True)
+class Claims:
+    """Identity carried by the access token; enough for role checks without a user SELECT."""
+    id: int
+    role: UserRole
+
+# _user_cache holds plain column values, never ORM instances: an instance is bound to
+# the session that loaded it, and concurrent requests must not share one
+def _column_values(obj) -> Dict[str, Any]:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+def _user_snapshot(user: User) -> Dict[str, Any]:
+    department = user.department
+    return {
+        "user": _column_values(user),
+        "department": _column_values(department) if department is not None else None,
+    }
+
+def _user_from_snapshot(db: Session, snapshot: Dict[str, Any]) -> User:
+    """Rebuild a request-local User (and its department) and attach it to db without a SELECT."""
+    existing = db.identity_map.get(db.identity_key(User, snapshot["user"]["id"]))
+    if existing is not None:
+        return existing
+    user = User(**snapshot["user"])
+    make_transient_to_detached(user)
+    department = None
+    if snapshot["department"] is not None:
+        department = Department(**snapshot["department"])
+        make_transient_to_detached(department)
+    # Loaded state, as if joined in by CURRENT_USER_LOAD_OPTIONS; no backref events
+    set_committed_value(user, "department", department)
+    db.add(user)
+    return user
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop a cached user row after it changes (role, status, password, ...)."""
+    _user_cache.pop(user_id)
+    _user_status_cache.pop(user_id)
+
+def _load_user_status(db: Session, user_id: int) -> Optional[Tuple[UserRole, bool]]:
+    row = db.execute(select(User.role, User.is_active).where(User.id == user_id)).first()
+    return (row.role, bool(row.is_active)) if row is not None else None
+
 class AuthManager:
     def create_user(self, db: Session, name: str, email: str, password: str, role: Optional[UserRole] = None) -> User:
         # Check if user already exists
@@ -54,7 +121,7 @@ class AuthManager:
 
         return user
 
-    def create_access_token(self, user_id: int) -> str:
+    def create_access_token(self, user_id: int, role: Optional[UserRole] = None) -> str:
         expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         expire = datetime.now(timezone.utc) + expires_delta
 
@@ -63,6 +130,9 @@ class AuthManager:
             "exp": expire,
             "type": "access"
         }
+        if role is not None:
+            # Lets get_current_claims answer role checks without loading the user
+            payload["role"] = role.value
 
         return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
@@ -98,17 +168,34 @@ class AuthManager:
 
     def verify_token(self, token: str) -> Tuple[Optional[int], Optional[str]]:
         """Verify token and return user_id and token_type."""
+        user_id, token_type, _ = self.verify_token_claims(token)
+        return user_id, token_type
+
+    def verify_token_claims(self, token: str) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+        """Verify token and return user_id, token_type and role (None for tokens without a role claim)."""
+        cache_key = None
+        if JWT_CACHE_ENABLED:
+            cache_key = hashlib.sha256(token.encode()).hexdigest()[:32]
+            cached = _token_cache.get(cache_key)
+            if cached is not None and cached[2] > time.time():
+                return cached[0], cached[1], cached[3]
+
         try:
             payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
             user_id = int(payload.get("sub"))
             token_type = payload.get("type")
-            return user_id, token_type
+            role = payload.get("role")
+            if cache_key is not None:
+                _token_cache.set(cache_key, (user_id, token_type, payload.get("exp", 0), role))
+            return user_id, token_type, role
         except (jwt.InvalidTokenError, jwt.ExpiredSignatureError, ValueError):
-            return None, None
+            return None, None, None
 
-    def get_user_by_id(self, db: Session, user_id: int) -> Optional[User]:
-        """Get user by ID."""
-        return db.query(User).filter(User.id == user_id).first()
+    def get_user_by_id(self, db: Session, user_id: int, options=CURRENT_USER_LOAD_OPTIONS) -> Optional[User]:
+        """Get user by ID, eager-loading the relationships in `options`."""
+        return db.execute(
+            select(User).options(*options).where(User.id == user_id)
+        ).scalar_one_or_none()
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a plain password against a hashed password."""
@@ -121,11 +208,7 @@ class AuthManager:
 # Create global auth manager instance
 auth_manager = AuthManager()
 
-# Dependency to get current user from token
-async def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-) -> User:
+def _request_token(request: Request) -> str:
     # Try to get token from cookie first
     token = request.cookies.get("access_token")
 
@@ -137,17 +220,96 @@ async def get_current_user(
 
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
+    return token
+
+# Dependency to get current user from token
+async def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db)
+) -> User:
+    token = _request_token(request)
 
     user_id, token_type = auth_manager.verify_token(token)
     if user_id is None or token_type != "access":
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = auth_manager.get_user_by_id(db, user_id)
+    user = None
+    if JWT_CACHE_ENABLED:
+        snapshot = _user_cache.get(user_id)
+        if snapshot is not None:
+            user = _user_from_snapshot(db, snapshot)
+
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
+        # Sync session; keep the query off the event loop
+        user = await run_in_threadpool(auth_manager.get_user_by_id, db, user_id)
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        if JWT_CACHE_ENABLED:
+            _user_cache.set(user_id, _user_snapshot(user))
 
     return user
 
+# Dependency for routes that only need the caller's id and role. Tokens carrying a role
+# claim are answered from the JWT alone; older tokens fall back to loading the user.
+# The claimed role is not re-checked here, so role-gated routes go through
+# require_admin / require_role, which compare it with the stored user row.
+async def get_current_claims(
+    request: Request,
+    db: Session = Depends(get_db)
+) -> Claims:
+    token = _request_token(request)
+
+    user_id, token_type, role = auth_manager.verify_token_claims(token)
+    if user_id is None or token_type != "access":
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if role is not None:
+        try:
+            return Claims(id=user_id, role=UserRole(role))
+        except ValueError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = await get_current_user(request, db)
+    return Claims(id=user.id, role=user.role)
+
+async def _verified_claims(claims: Claims, db: Session) -> Claims:
+    """Claims with the stored role; 401 for deleted users, 403 for deactivated ones."""
+    status = _user_status_cache.get(claims.id)
+    if status is None:
+        # Sync session; keep the query off the event loop
+        status = await run_in_threadpool(_load_user_status, db, claims.id)
+        if status is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        _user_status_cache.set(claims.id, status)
+
+    role, is_active = status
+    if not is_active:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return claims if role == claims.role else Claims(id=claims.id, role=role)
+
+# Dependency for admin-only routes
+async def require_admin(
+    claims: Claims = Depends(get_current_claims),
+    db: Session = Depends(get_db)
+) -> Claims:
+    claims = await _verified_claims(claims, db)
+    if claims.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return claims
+
+# Dependency factory for role-gated routes: rejects other roles, checked against the
+# stored user row (cached briefly), before the handler runs any query
+def require_role(*roles: UserRole):
+    async def dependency(
+        claims: Claims = Depends(get_current_claims),
+        db: Session = Depends(get_db)
+    ) -> Claims:
+        claims = await _verified_claims(claims, db)
+        if claims.role not in roles:
+            raise HTTPException(status_code=403, detail="Access denied")
+        return claims
+    return dependency
+
 # Optional dependency for routes that can work with or without authentication
 async def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
     """Get current user if authenticated, otherwise return None."""
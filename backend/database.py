@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Database configuration
 database_url = os.getenv("DATABASE_URL")
@@ -12,29 +16,100 @@ if not database_url:
 # Export for use in other modules
 DATABASE_URL = database_url
 
+# STRICT_LOADING=1 makes un-eager-loaded relationship access raise instead of lazily
+# querying (set for tests/dev to catch N+1 regressions)
+STRICT_LOADING = os.getenv("STRICT_LOADING") == "1"
+
+# Connection pool settings per backend
+if database_url.startswith("sqlite"):
+    pool_kwargs = {"connect_args": {"check_same_thread": False}}
+    if ":memory:" in database_url:
+        # In-memory databases live in a single connection, so share it
+        pool_kwargs["poolclass"] = StaticPool
+    else:
+        # SQLite allows one writer at a time; a small pool avoids idle connections
+        pool_kwargs.update(pool_size=5, max_overflow=5, pool_timeout=10)
+else:
+    # Sync handlers run on FastAPI's threadpool (40 threads by default), so size the
+    # pool to match: pool_size + max_overflow = 40 means no thread waits on a connection
+    pool_kwargs = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "5")),
+        # Batch executemany INSERTs into multi-row VALUES statements
+        "insertmanyvalues_page_size": 1000,
+    }
+    if database_url.startswith(("postgresql://", "postgresql+psycopg2://")):
+        # psycopg2 also batches executemany UPDATE/DELETE via execute_batch
+        pool_kwargs["executemany_mode"] = "values_plus_batch"
+
 # Create engine with connection pooling
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
+    pool_pre_ping=not database_url.startswith("sqlite"),  # Local SQLite connections cannot go stale
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),  # pre-ping already catches dropped connections
     echo=False,  # Set to True for SQL debugging
-    connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    query_cache_size=1200,  # Compiled-statement cache; the default 500 is small for this many distinct queries
+    **pool_kwargs
 )
 
+# SQLite tuning: WAL lets readers run alongside a writer, and synchronous=NORMAL
+# avoids an fsync on every commit (still durable at WAL checkpoints)
+if database_url.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded attributes usable after commit without a reload SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Request-scoped sessions: one session per HTTP request (scope set by middleware in main.py),
+# falling back to one per thread outside a request
+request_scope = ContextVar("request_scope", default=None)
+ScopedSession = scoped_session(
+    SessionLocal,
+    scopefunc=lambda: request_scope.get() or threading.get_ident()
+)
+
+# Import Base from models lazily to avoid circular imports, then cache it
+_BASE = None
 
-# Import Base from models to avoid circular imports
 def get_base():
     """Get the Base class from models"""
-    from models import Base
-    return Base
+    global _BASE
+    if _BASE is None:
+        from models import Base
+        _BASE = Base
+    return _BASE
 
 # Dependency to get database session
 def get_db():
+    db = ScopedSession()
+    try:
+        yield db
+    finally:
+        # remove() closes the session: rolls back anything uncommitted, expunges every
+        # instance and returns the connection to the pool, so nothing outlives the request
+        ScopedSession.remove()
+
+# Transactional session for scripts (commits on success, rolls back on error)
+@contextmanager
+def session_scope():
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -52,6 +127,27 @@ def test_connection():
 # Function to create all tables
 def create_tables():
     """Create all database tables."""
+    # Skip schema inspection when migrations own the schema (e.g. in containers)
+    if os.getenv("SCHEMA_READY") == "1":
+        return
     Base = get_base()
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+
+    # create_all skips tables that already exist, so add any newer nullable columns and
+    # indexes explicitly
+    existing_columns = {
+        table_name: {column["name"] for column in inspect(engine).get_columns(table_name)}
+        for table_name in Base.metadata.tables
+    }
+    preparer = engine.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if column.nullable and column.name not in existing_columns[table.name]:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(engine.dialect)}"
+                    ))
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
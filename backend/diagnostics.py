@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Database diagnostics
+Runs the program/schema/enum checks against a single database session
+
+Usage: python diagnostics.py [programs|schema|enum ...]   (no arguments runs all checks)
+"""
+
+import argparse
+
+from database import session_scope
+from models import Program, ProgramType
+from sqlalchemy import text
+
+
+def check_programs(db):
+    """Print current programs and their stored types"""
+    result = db.execute(text('SELECT id, name, program_type FROM programs'))
+    programs = result.fetchall()
+    print('Current programs and their types:')
+    for prog in programs:
+        print(f'  ID: {prog[0]}, Name: {prog[1]}, Type: "{prog[2]}"')
+
+
+def check_schema(db):
+    """Print the programs table schema and a few sample rows"""
+    # Check the actual database schema for the enum
+    result = db.execute(text('PRAGMA table_info(programs)'))
+    columns = result.fetchall()
+    print('Programs table schema:')
+    for col in columns:
+        print(f'  {col}')
+
+    print()
+    # Check if there are any constraints or check constraints
+    result = db.execute(text('SELECT sql FROM sqlite_master WHERE type="table" AND name="programs"'))
+    schema = result.fetchone()
+    if schema:
+        print('Programs table creation SQL:')
+        print(schema[0])
+
+    print()
+    # Check current data
+    result = db.execute(text('SELECT id, name, program_type FROM programs LIMIT 3'))
+    programs = result.fetchall()
+    print('Sample program data:')
+    for prog in programs:
+        print(f'  ID: {prog[0]}, Name: {prog[1]}, Type: "{prog[2]}"')
+
+
+def debug_enum(db):
+    """Check that program types load through the ORM, raw SQL and the enum itself"""
+    print("🔍 Debugging enum issue...")
+
+    # Try to query programs directly
+    print("\n1. Trying to query programs with SQLAlchemy ORM:")
+    try:
+        programs = db.query(Program.name, Program.program_type).limit(3).all()
+        print(f"   Success! Loaded {len(programs)} sample programs")
+        for name, program_type in programs:
+            print(f"   - {name}: {program_type}")
+    except Exception as e:
+        print(f"   Error: {e}")
+
+    # Try to query programs with raw SQL
+    print("\n2. Trying to query programs with raw SQL:")
+    try:
+        result = db.execute(text('SELECT id, name, program_type FROM programs'))
+        programs = result.fetchall()
+        print(f"   Success! Found {len(programs)} programs")
+        for prog in programs[:3]:
+            print(f"   - {prog[1]}: {prog[2]}")
+    except Exception as e:
+        print(f"   Error: {e}")
+
+    # Try to create a new program object manually
+    print("\n3. Trying to create Program object manually:")
+    try:
+        test_prog = Program(
+            name="Test Program",
+            code="TEST123",
+            program_type=ProgramType.BACHELOR,
+            department_id=1,
+            duration_years=4,
+            total_credits=120
+        )
+        print(f"   Success! Created program with type: {test_prog.program_type}")
+    except Exception as e:
+        print(f"   Error: {e}")
+
+    # Check enum values
+    print("\n4. Checking enum values:")
+    for item in ProgramType:
+        print(f"   {item.name} = '{item.value}'")
+
+
+CHECKS = {
+    "programs": check_programs,
+    "schema": check_schema,
+    "enum": debug_enum,
+}
+
+
+def run_checks(names=None):
+    """Run the named checks (all of them by default) in one session"""
+    with session_scope() as db:
+        for name in names or CHECKS:
+            CHECKS[name](db)
+            print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EduFlow database diagnostics")
+    # No choices=: argparse checks an empty nargs="*" list against them and rejects it
+    parser.add_argument("checks", nargs="*", help=f"checks to run: {', '.join(CHECKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown check(s): {', '.join(unknown)} (choose from {', '.join(CHECKS)})")
+    run_checks(args.checks or list(CHECKS))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,180 +8,216 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database import get_db
+from database import session_scope
+from sqlalchemy import and_, exists, insert, update
+from sqlalchemy.orm import selectinload
 from models import (
     User, UserRole, Department, Program, Course, Semester, 
     ProgramLecturer, ProgramCourse
 )
-from datetime import datetime, timezone
+
+# Set VERBOSE=1 for per-row output
+VERBOSE = bool(os.getenv("VERBOSE"))
 
 def fix_program_assignments():
     """Fix program assignments and course allocations"""
     
     print("🔧 Fixing program assignments and course allocations...")
     
-    db = next(get_db())
-    
-    try:
+    with session_scope() as db:
         # 1. Get the Computer Science department and program
-        cs_department = db.query(Department).filter(
+        cs_department_id = db.query(Department.id).filter(
             Department.code == "CS"
-        ).first()
-        
-        if not cs_department:
+        ).scalar()
+
+        if not cs_department_id:
             print("❌ Computer Science department not found")
             return False
-            
-        cs_program = db.query(Program).filter(
-            Program.department_id == cs_department.id,
+
+        cs_program = db.query(Program.id, Program.name).filter(
+            Program.department_id == cs_department_id,
             Program.code == "BSCS"
         ).first()
-        
+
         if not cs_program:
             print("❌ Computer Science program not found")
             return False
-            
+
         print(f"✅ Found CS Program: {cs_program.name} (ID: {cs_program.id})")
-        
+
         # 2. Get Dr. Sarah Johnson (head of CS department)
-        sarah_johnson = db.query(User).filter(
+        sarah_johnson = db.query(User.id, User.name).filter(
             User.email == "sarah.johnson@lms.edu",
             User.role == UserRole.LECTURER
         ).first()
-        
+
         if not sarah_johnson:
             print("❌ Dr. Sarah Johnson not found")
             return False
-            
+
         print(f"✅ Found Lecturer: {sarah_johnson.name} (ID: {sarah_johnson.id})")
-        
+
         # 3. Check if lecturer is already assigned to program
-        existing_assignment = db.query(ProgramLecturer).filter(
+        assignment_filter = and_(
             ProgramLecturer.program_id == cs_program.id,
             ProgramLecturer.lecturer_id == sarah_johnson.id
-        ).first()
-        
-        if existing_assignment:
-            if existing_assignment.is_active:
-                print("✅ Lecturer already assigned to program")
-            else:
+        )
+        active_exists = db.query(
+            exists().where(assignment_filter, ProgramLecturer.is_active == True)
+        ).scalar()
+
+        if active_exists:
+            print("✅ Lecturer already assigned to program")
+        else:
+            # Only load the row when it has to be reactivated
+            existing_assignment = db.query(ProgramLecturer).filter(assignment_filter).first()
+            if existing_assignment:
                 existing_assignment.is_active = True
-                db.commit()
                 print("✅ Reactivated lecturer assignment")
-        else:
-            # Create new assignment
-            assignment = ProgramLecturer(
-                program_id=cs_program.id,
-                lecturer_id=sarah_johnson.id,
-                assigned_by_id=1,  # Admin
-                role="lecturer",
-                is_active=True
-            )
-            db.add(assignment)
-            db.commit()
-            print("✅ Created new lecturer assignment")
-        
+            else:
+                # Create new assignment
+                assignment = ProgramLecturer(
+                    program_id=cs_program.id,
+                    lecturer_id=sarah_johnson.id,
+                    assigned_by_id=1,  # Admin
+                    role="lecturer",
+                    is_active=True
+                )
+                db.add(assignment)
+                print("✅ Created new lecturer assignment")
+
         # 4. Get courses in CS department
         cs_courses = db.query(Course).filter(
-            Course.department_id == cs_department.id,
+            Course.department_id == cs_department_id,
             Course.is_active == True
         ).all()
-        
+
         print(f"📚 Found {len(cs_courses)} courses in CS department")
-        
+
         # 5. Allocate courses to the program
-        allocated_count = 0
-        for i, course in enumerate(cs_courses):
-            # Check if course is already allocated
-            existing_allocation = db.query(ProgramCourse).filter(
+        # Fetch existing allocations for all CS courses in one query
+        existing_allocations = {
+            allocation.course_id: allocation
+            for allocation in db.query(
+                ProgramCourse.course_id, ProgramCourse.id, ProgramCourse.is_active
+            ).filter(
                 ProgramCourse.program_id == cs_program.id,
-                ProgramCourse.course_id == course.id
-            ).first()
-            
+                ProgramCourse.course_id.in_([course.id for course in cs_courses])
+            ).all()
+        }
+
+        already_allocated = []
+        reactivated = []
+        reactivated_ids = []
+        new_allocations = []
+        allocated_codes = []
+        for i, course in enumerate(cs_courses):
+            existing_allocation = existing_allocations.get(course.id)
+
             if existing_allocation:
                 if existing_allocation.is_active:
-                    print(f"   ✅ {course.code} already allocated")
+                    already_allocated.append(course.code)
                 else:
-                    existing_allocation.is_active = True
-                    allocated_count += 1
-                    print(f"   ✅ Reactivated {course.code}")
+                    reactivated_ids.append(existing_allocation.id)
+                    reactivated.append(course.code)
             else:
                 # Create new allocation
-                allocation = ProgramCourse(
-                    program_id=cs_program.id,
-                    course_id=course.id,
-                    is_required=True,
-                    semester_order=i + 1,  # Sequential semester order
-                    allocated_by_id=1,  # Admin
-                    is_active=True
-                )
-                db.add(allocation)
-                allocated_count += 1
-                print(f"   ✅ Allocated {course.code} to program")
-        
-        db.commit()
-        
-        print(f"\n🎉 Successfully allocated {allocated_count} courses to CS program")
-        
+                new_allocations.append({
+                    "program_id": cs_program.id,
+                    "course_id": course.id,
+                    "is_required": True,
+                    "semester_order": i + 1,  # Sequential semester order
+                    "allocated_by_id": 1,  # Admin
+                    "is_active": True
+                })
+                allocated_codes.append(course.code)
+
+        # One UPDATE for every allocation that has to be reactivated
+        if reactivated_ids:
+            db.execute(
+                update(ProgramCourse)
+                .where(ProgramCourse.id.in_(reactivated_ids))
+                .values(is_active=True)
+            )
+        # Plain executemany INSERT; nothing reads these rows back as ORM objects
+        if new_allocations:
+            db.execute(insert(ProgramCourse), new_allocations)
+
+        # VERBOSE prints one line per course, otherwise one summary line per outcome
+        if VERBOSE:
+            for code in already_allocated:
+                print(f"   ✅ {code} already allocated to program")
+            for code in reactivated:
+                print(f"   ✅ Reactivated {code} in program")
+            for code in allocated_codes:
+                print(f"   ✅ Allocated {code} to program")
+        else:
+            if already_allocated:
+                print(f"   ✅ Already allocated: {', '.join(already_allocated)}")
+            if reactivated:
+                print(f"   ✅ Reactivated: {', '.join(reactivated)}")
+            if allocated_codes:
+                print(f"   ✅ Allocated: {', '.join(allocated_codes)}")
+        # session_scope commits on success; flush so the verification below sees the changes
+        db.flush()
+
+        print(f"\n🎉 Successfully allocated {len(new_allocations)} courses to CS program"
+              f" (reactivated {len(reactivated)})")
+
         # 6. Verify the assignments
         print("\n📋 Verification:")
-        
+
         # Check lecturer assignments
-        lecturer_assignments = db.query(ProgramLecturer).filter(
+        lecturer_assignments = db.query(ProgramLecturer).options(
+            selectinload(ProgramLecturer.lecturer)
+        ).filter(
             ProgramLecturer.program_id == cs_program.id,
             ProgramLecturer.is_active == True
         ).all()
-        
+
         print(f"   👨‍🏫 Lecturers assigned: {len(lecturer_assignments)}")
         for assignment in lecturer_assignments:
             lecturer = assignment.lecturer
             print(f"      - {lecturer.name} ({assignment.role})")
-        
+
         # Check course allocations
-        course_allocations = db.query(ProgramCourse).filter(
+        course_allocations = db.query(ProgramCourse).options(
+            selectinload(ProgramCourse.course)
+        ).filter(
             ProgramCourse.program_id == cs_program.id,
             ProgramCourse.is_active == True
         ).all()
-        
+
         print(f"   📚 Courses allocated: {len(course_allocations)}")
         for allocation in course_allocations:
             course = allocation.course
             print(f"      - {course.code}: {course.name} (Semester {allocation.semester_order})")
-        
+
         return True
-        
-    except Exception as e:
-        print(f"❌ Error fixing program assignments: {e}")
-        db.rollback()
-        return False
-    finally:
-        db.close()
 
 def create_sample_courses():
     """Create sample courses if none exist"""
     
     print("\n📚 Creating sample courses...")
     
-    db = next(get_db())
-    
-    try:
+    with session_scope() as db:
         # Get CS department
-        cs_department = db.query(Department).filter(Department.code == "CS").first()
-        if not cs_department:
+        cs_department_id = db.query(Department.id).filter(Department.code == "CS").scalar()
+        if not cs_department_id:
             print("❌ CS department not found")
             return False
-        
+
         # Get current semester
-        current_semester = db.query(Semester).filter(Semester.is_current == True).first()
-        if not current_semester:
+        current_semester_id = db.query(Semester.id).filter(Semester.is_current == True).scalar()
+        if not current_semester_id:
             print("❌ Current semester not found")
             return False
-        
+
         # Get Dr. Sarah Johnson
-        sarah_johnson = db.query(User).filter(
+        sarah_johnson_id = db.query(User.id).filter(
             User.email == "sarah.johnson@lms.edu"
-        ).first()
-        
+        ).scalar()
+
         # Sample CS courses
         sample_courses = [
             {
@@ -189,70 +225,69 @@ def create_sample_courses():
                 "code": "CS101",
                 "description": "Fundamentals of programming and problem solving",
                 "credits": 3,
-                "lecturer_id": sarah_johnson.id if sarah_johnson else None
+                "lecturer_id": sarah_johnson_id
             },
             {
                 "name": "Data Structures and Algorithms",
                 "code": "CS201",
                 "description": "Advanced programming concepts and algorithm design",
                 "credits": 4,
-                "lecturer_id": sarah_johnson.id if sarah_johnson else None
+                "lecturer_id": sarah_johnson_id
             },
             {
                 "name": "Database Systems",
                 "code": "CS301",
                 "description": "Database design, implementation, and management",
                 "credits": 3,
-                "lecturer_id": sarah_johnson.id if sarah_johnson else None
+                "lecturer_id": sarah_johnson_id
             },
             {
                 "name": "Software Engineering",
                 "code": "CS401",
                 "description": "Software development methodologies and practices",
                 "credits": 4,
-                "lecturer_id": sarah_johnson.id if sarah_johnson else None
+                "lecturer_id": sarah_johnson_id
             }
         ]
-        
-        created_count = 0
+
+        # Check which courses already exist in one query
+        existing_codes = {
+            code for (code,) in db.query(Course.code).filter(
+                Course.department_id == cs_department_id,
+                Course.code.in_([course_data["code"] for course_data in sample_courses])
+            ).all()
+        }
+
+        new_courses = []
         for course_data in sample_courses:
-            # Check if course already exists
-            existing_course = db.query(Course).filter(
-                Course.code == course_data["code"],
-                Course.department_id == cs_department.id
-            ).first()
-            
-            if existing_course:
-                print(f"   ✅ {course_data['code']} already exists")
+            if course_data["code"] in existing_codes:
                 continue
-            
+
             # Create new course
-            course = Course(
-                name=course_data["name"],
-                code=course_data["code"],
-                description=course_data["description"],
-                credits=course_data["credits"],
-                department_id=cs_department.id,
-                semester_id=current_semester.id,
-                lecturer_id=course_data["lecturer_id"],
-                max_capacity=30,
-                is_active=True
-            )
-            
-            db.add(course)
-            created_count += 1
-            print(f"   ✅ Created {course_data['code']}: {course_data['name']}")
-        
-        db.commit()
+            new_courses.append({
+                **course_data,
+                "department_id": cs_department_id,
+                "semester_id": current_semester_id,
+                "max_capacity": 30,
+                "is_active": True
+            })
+
+        if new_courses:
+            db.execute(insert(Course), new_courses)
+        # VERBOSE prints one line per course, otherwise one summary line per outcome
+        if VERBOSE:
+            for code in sorted(existing_codes):
+                print(f"   ✅ {code} already exists")
+            for course in new_courses:
+                print(f"   ✅ Created {course['code']}: {course['name']}")
+        else:
+            if existing_codes:
+                print(f"   ✅ Already exist: {', '.join(sorted(existing_codes))}")
+            if new_courses:
+                print(f"   ✅ Created: {', '.join(course['code'] for course in new_courses)}")
+        created_count = len(new_courses)
         print(f"\n🎉 Created {created_count} new courses")
         return True
-        
-    except Exception as e:
-        print(f"❌ Error creating courses: {e}")
-        db.rollback()
-        return False
-    finally:
-        db.close()
 
 def main():
     print("🔧 Program Assignment and Course Allocation Fix")
@@ -1,8 +1,16 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+_queue_listener = None
 
 def setup_logger():
+    global _queue_listener
+    if _queue_listener is not None:
+        return
+
     log_level = os.getenv("LOG_LEVEL", "INFO")
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
@@ -23,6 +31,14 @@ def setup_logger():
         file_handler.setFormatter(logging.Formatter(log_format))
         logging.getLogger().addHandler(file_handler)
     
+    # Hand records to a background thread so request paths never block on handler I/O
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    _queue_listener = QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    _queue_listener.start()
+    atexit.register(_queue_listener.stop)
+    
     # Reduce noise from third-party libraries
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
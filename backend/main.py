@@ -2,13 +2,40 @@ import os
 import json
 from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, Request, Response, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 from datetime import datetime, timezone, timedelta
 import uvicorn
-from typing import List, Dict, Any, Optional
+from typing import Annotated, List, Dict, Any, Optional
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+
+# orjson renders responses several times faster than the stdlib encoder; optional
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from enum import Enum
+    from fastapi.responses import JSONResponse
+
+    def _json_default(value: Any) -> Any:
+        if isinstance(value, Enum):
+            return value.value
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    class DefaultResponse(JSONResponse):
+        # Match ORJSONResponse for handlers that return raw datetimes and enums
+        def render(self, content: Any) -> bytes:
+            return json.dumps(
+                content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                default=_json_default
+            ).encode("utf-8")
 import re
+import hashlib
+import tempfile
+from contextlib import asynccontextmanager
 from routers.academic import MOCK_COURSES
 
 # Load environment variables from .env file
@@ -18,8 +45,8 @@ try:
 except ImportError:
     print("python-dotenv not installed. Using system environment variables only.")
 
-from database import get_db, engine
-from sqlalchemy import text
+from database import get_db, engine, create_tables, request_scope, SessionLocal
+from sqlalchemy import func, select, text
 from models import (
     Base, User, UserRole, Course, Enrollment, EnrollmentStatus,
     CourseMaterial, Lesson, Assignment, AssignmentSubmission,
@@ -27,20 +54,21 @@ from models import (
     Message, Notification, Department, Program, Semester, SemesterType,
     ProgramLecturer, ProgramCourse
 )
-from auth import AuthManager, get_current_user
+from auth import AuthManager, Claims, get_current_user, get_current_claims, require_admin, require_role, invalidate_cached_user
+from utils.cache import TTLCache, RedisTTLCache, redis_client
 from services.gemini_service import GeminiService
 from services.whisper_service import WhisperService
 from services.gemini_speech_service import GeminiSpeechService
 
 from services.quiz_service import QuizService
-from services.pdf_service import PDFService
+from services.pdf_service import PDFService, shutdown_process_pool
 
 # MasterLMS Services
 from services.academic_service import AcademicService
 from services.user_management_service import UserManagementService
 from services.discussion_service import DiscussionService
 from services.communication_service import CommunicationService
-from services.realtime_service import realtime_service, connection_manager
+from services.realtime_service import realtime_service, connection_manager, REDIS_URL
 
 # Import logger
 from logger import setup_logger, get_logger
@@ -48,7 +76,8 @@ from logger import setup_logger, get_logger
 # Import validation utilities
 from utils.validation import (
     InputValidator, validate_user_registration,
-    validate_course_creation, validate_assignment_creation
+    validate_course_creation, validate_assignment_creation,
+    text_field, optional_text_field, EmailField, OptionalEmailField, OptionalPhoneField, CodeField
 )
 
 # Setup logging
@@ -66,58 +95,165 @@ def validate_environment():
 # Call before app initialization
 validate_environment()
 
+# Arbitrary key shared by every worker for the startup advisory lock
+STARTUP_LOCK_KEY = 42
+
 # Create fresh database and seed data
 def initialize_fresh_database():
     try:
-        print("🗄️ Initializing fresh LMS database...")
+        logger.info("🗄️ Initializing fresh LMS database...")
 
         # Create all tables
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables created successfully")
+        create_tables()
+        logger.info("✅ Database tables created successfully")
+
+        if os.getenv("SEED_ON_START", "1") == "0":
+            logger.info("📊 SEED_ON_START=0, skipping seed data")
+            return
 
         # Check if database is empty (needs seeding)
         db = next(get_db())
         try:
-            user_count = db.query(User).count()
-            if user_count == 0:
-                print("📊 Database is empty, creating seed data...")
+            # Only emptiness matters; avoid a full COUNT(*) over users on every start
+            has_users = db.execute(text("SELECT 1 FROM users LIMIT 1")).scalar() is not None
+            if not has_users:
+                logger.info("📊 Database is empty, creating seed data...")
                 # Import and run fresh seed data
                 from fresh_seed_data import create_fresh_seed_data
                 create_fresh_seed_data()
             else:
-                print(f"📊 Database already has {user_count} users, skipping seed data")
+                logger.info("📊 Database already populated, skipping seed data")
         finally:
             db.close()
 
     except Exception as e:
-        print(f"❌ Database initialization failed: {e}")
+        logger.error("❌ Database initialization failed: %s", e)
         # If there's an error, try to create tables anyway
         try:
             Base.metadata.create_all(bind=engine)
-            print("✅ Tables created as fallback")
+            logger.info("✅ Tables created as fallback")
         except Exception as create_error:
-            print(f"❌ Failed to create tables: {create_error}")
-
-initialize_fresh_database()
-
-app = FastAPI(title="EduFlow API", version="1.0.0", description="AI-Powered Learning Management System (Demo Mode)")
+            logger.error("❌ Failed to create tables: %s", create_error)
+
+def initialize_database_once():
+    """Run initialize_fresh_database, serialized across workers on PostgreSQL"""
+    if engine.dialect.name != "postgresql":
+        initialize_fresh_database()
+        return
+
+    # Every worker runs the lifespan; the advisory lock makes the others wait
+    # until the first one has created the schema and seeded, then they skip seeding
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+        try:
+            initialize_fresh_database()
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY})
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Startup work is blocking; run it off the event loop instead of at import time
+    await run_in_threadpool(initialize_database_once)
+    await connection_manager.start()
+    yield
+    await connection_manager.stop()
+    shutdown_process_pool()
+    whisper_service.close()
+    if lookup_redis is not None:
+        lookup_redis.close()
+    engine.dispose()
+
+app = FastAPI(title="EduFlow API", version="1.0.0", description="AI-Powered Learning Management System (Demo Mode)", lifespan=lifespan, default_response_class=DefaultResponse)
 
 # Allow frontend origin(s)
-origins = [
+# CORS_ORIGINS is comma-separated; entries are trimmed and deduped once at boot.
+# Entries prefixed with "regex:" (e.g. regex:https://.*\.onrender\.com) are combined
+# into a single pattern that Starlette compiles once.
+DEFAULT_CORS_ORIGINS = ",".join([
     "https://elearningmanagement.onrender.com",  # Your frontend domain
     "http://localhost:5173"                      # For local dev (optional)
-]
+])
+cors_entries = {o.strip() for o in os.getenv("CORS_ORIGINS", DEFAULT_CORS_ORIGINS).split(",") if o.strip()}
+origins = tuple(sorted(o for o in cors_entries if not o.startswith("regex:")))
+origin_regex = "|".join(
+    f"(?:{o[len('regex:'):]})" for o in sorted(cors_entries) if o.startswith("regex:")
+) or None
+
+if not origins and not origin_regex and os.getenv("ENVIRONMENT") == "production":
+    raise EnvironmentError("CORS_ORIGINS must list at least one origin in production")
+
+# Turn unhandled exceptions into a JSON 500 so handlers don't each need a catch-all
+# try/except. This sits inside CORSMiddleware (unlike an Exception handler, which
+# Starlette runs in the outermost ServerErrorMiddleware) so error responses still
+# carry CORS headers. HTTPException is already handled further in and passes through.
+class UnhandledErrorMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if response_started:
+                raise
+            # The exception goes to the log only; its text can carry SQL or file paths
+            logger.exception("Unhandled error on %s %s", scope["method"], scope["path"])
+            response = DefaultResponse({"detail": "Internal server error"}, status_code=500)
+            await response(scope, receive, send)
+
+app.add_middleware(UnhandledErrorMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
+    allow_origin_regex=origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Give each request/websocket its own scope so get_db (and ScopedSession) hand out
+# one session per connection. Plain ASGI so it also covers websockets.
+class RequestSessionScopeMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(object())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
+
+app.add_middleware(RequestSessionScopeMiddleware)
+
 # Mount static files for video materials
-app.mount("/videos", StaticFiles(directory="uploads/videos"), name="videos")
+# Uploaded video names are unique (course + timestamp), so files never change in place
+# and browsers/CDNs may cache them for good. In production, prefer serving /videos/
+# straight from nginx (sendfile) and drop this mount.
+class ImmutableStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 206, 304):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.mount("/videos", ImmutableStaticFiles(directory="uploads/videos", check_dir=False), name="videos")
 
 # Initialize services
 auth_manager = AuthManager()
@@ -125,8 +261,8 @@ gemini_service = GeminiService()
 whisper_service = WhisperService()
 gemini_speech_service = GeminiSpeechService()
 
-quiz_service = QuizService()
-pdf_service = PDFService()
+quiz_service = QuizService(gemini_service)
+pdf_service = PDFService(gemini_service)
 
 # Initialize MasterLMS services
 academic_service = AcademicService()
@@ -135,7 +271,7 @@ discussion_service = DiscussionService()
 communication_service = CommunicationService()
 
 # Pydantic models for request/response
-from pydantic import BaseModel
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field
 
 class LoginRequest(BaseModel):
     email: str
@@ -149,114 +285,273 @@ class RegisterRequest(BaseModel):
 class AskRequest(BaseModel):
     question: str
 
+class QuizAnswer(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    questionId: int
+    isCorrect: bool = False
+
 class QuizAnswers(BaseModel):
-    answers: List[Dict[str, Any]]
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    answers: List[QuizAnswer]
+
+class ChatPdfRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    chat_session_id: int
+    message: str
 
 # Removed CheckoutRequest - no longer needed without Stripe
 
+# Request bodies for the admin/user endpoints; the field types apply InputValidator's rules
+def _lowercase(value: Any) -> Any:
+    return value.lower() if isinstance(value, str) else value
+
+class DepartmentCreate(BaseModel):
+    name: text_field('title')
+    code: CodeField
+    description: optional_text_field('description') = None
+    head_of_department: optional_text_field('name') = None
+
+class SemesterCreate(BaseModel):
+    name: text_field('title')
+    semester_type: Annotated[SemesterType, BeforeValidator(_lowercase)]
+    year: int = Field(ge=2020, le=2030)
+    start_date: datetime
+    end_date: datetime
+    registration_start: datetime
+    registration_end: datetime
+    is_current: bool = False
+
+class ProfileUpdate(BaseModel):
+    name: optional_text_field('name') = None
+    email: OptionalEmailField = None
+    phone: OptionalPhoneField = None
+    bio: optional_text_field('long_text') = None
+    profile_picture_url: optional_text_field('url') = None
+
+class UserCreate(BaseModel):
+    name: text_field('name')
+    email: EmailField
+    password: text_field('medium_text')
+    role: Annotated[UserRole, BeforeValidator(_lowercase)]
+
+class UserUpdate(BaseModel):
+    name: optional_text_field('name') = None
+    email: OptionalEmailField = None
+    role: Optional[Annotated[UserRole, BeforeValidator(_lowercase)]] = None
+    phone: OptionalPhoneField = None
+    bio: optional_text_field('long_text') = None
+
+class SemesterOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    semester_type: SemesterType
+    year: int
+    start_date: datetime
+    end_date: datetime
+    is_current: bool
+
+class SemesterCreatedResponse(BaseModel):
+    message: str
+    semester: SemesterOut
+
+class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    email: str
+    role: UserRole
+    created_at: datetime
+
+class UserCreatedResponse(BaseModel):
+    message: str
+    user: UserOut
+
+class AssignmentCreate(BaseModel):
+    title: text_field('title')
+    description: optional_text_field('description') = ""
+    instructions: optional_text_field('long_text') = ""
+    course_id: int = Field(ge=1)
+    # ISO 8601, with or without offset ("Z" included); defaults to a week from now
+    due_date: Optional[datetime] = None
+    max_points: int = Field(default=100, ge=1, le=1000)
+    assignment_type: optional_text_field('short_text') = None
+    is_published: bool = True
+
+class EnrollmentRow(BaseModel):
+    student_id: int
+    course_id: int
+    program_id: int
+
+class BulkEnrollmentCreate(BaseModel):
+    enrollments: List[EnrollmentRow] = Field(min_length=1, max_length=1000)
+
 class PaginationParams(BaseModel):
     page: int = 1
     limit: int = 20
 
+# InputValidator rules for the dict-bodied create_course endpoint (constant, so built once)
+_COURSE_VALIDATION_RULES = {
+    'name': {'type': 'string', 'required': True, 'field_type': 'title'},
+    'code': {'type': 'code', 'required': True},
+    'description': {'type': 'string', 'required': False, 'field_type': 'description'},
+    'credits': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 10},
+    'department_id': {'type': 'integer', 'required': True, 'min_val': 1},
+    'max_capacity': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 500},
+    'prerequisites': {'type': 'string', 'required': False, 'field_type': 'medium_text'},
+    'syllabus': {'type': 'string', 'required': False, 'field_type': 'long_text'}
+}
+
+# Course columns update_course accepts, with the type each value is converted to
+_COURSE_UPDATE_FIELDS = {
+    'name': str,
+    'code': str,
+    'description': str,
+    'credits': int,
+    'department_id': int,
+    'semester_id': int,
+    'lecturer_id': int,
+    'max_capacity': int,
+    'prerequisites': str,
+    'syllabus': str,
+    'is_active': bool
+}
+
+# Role gates, resolved from the token before the handler body runs
+require_student = require_role(UserRole.STUDENT)
+require_staff = require_role(UserRole.ADMIN, UserRole.LECTURER)
+
 # Authentication endpoints
-from routers import auth, academic
+from routers import auth
 app.include_router(auth.router, prefix="/api")
-app.include_router(academic.router, prefix="/api/academic")
+# routers/academic.py only holds mock versions of the /api/academic endpoints defined
+# below; it is not mounted, since routes registered first win and would shadow them
 
 # AI and learning endpoints
+# Answers to repeated questions are served from memory (per worker) for an hour;
+# failures are cached briefly so a Gemini outage isn't hammered by retries
+ask_cache = TTLCache(maxsize=4096, ttl=3600)
+ASK_ERROR_TTL = 30
+
+def ask_cache_key(question: str) -> str:
+    normalized = " ".join(question.split()).lower()
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
 @app.post("/api/ask")
 async def ask_question(request: AskRequest, _current_user: User = Depends(get_current_user)):
+    cache_key = ask_cache_key(request.question)
+    cached = ask_cache.get(cache_key)
+    if cached is not None:
+        if isinstance(cached, Exception):
+            raise HTTPException(status_code=500, detail=f"Failed to get AI response: {str(cached)}")
+        return cached
+
     try:
         response = await gemini_service.get_response(request.question)
+        ask_cache.set(cache_key, response)
         return response
     except Exception as e:
+        ask_cache.set(cache_key, e, ttl=ASK_ERROR_TTL)
         raise HTTPException(status_code=500, detail=f"Failed to get AI response: {str(e)}")
 
-@app.post("/api/voice")
+# Reject oversized uploads before reading them (overridable via MAX_UPLOAD_BYTES)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def check_upload_size(request: Request):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit")
+
+@app.post("/api/voice", dependencies=[Depends(check_upload_size)])
 async def transcribe_voice(audio: UploadFile = File(...), _current_user: User = Depends(get_current_user)):
+    temp_path = None
     try:
-        # Read audio file
-        audio_content = await audio.read()
+        # Stream the audio to a temp file in chunks instead of buffering it in memory
+        suffix = os.path.splitext(audio.filename or "")[1] or ".wav"
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+            temp_path = temp_file.name
+            written = 0
+            while chunk := await audio.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit")
+                temp_file.write(chunk)
 
         # Try Gemini speech service first, fallback to Whisper if needed
         try:
-            text = await gemini_speech_service.transcribe_audio(audio_content)
+            text = await gemini_speech_service.transcribe_audio_file(temp_path)
         except Exception as gemini_error:
-            print(f"Gemini speech service failed: {gemini_error}")
+            logger.warning("Gemini speech service failed: %s", gemini_error)
             # Fallback to Whisper service
-            text = await whisper_service.transcribe_audio(audio_content)
+            text = await whisper_service.transcribe_audio_file(temp_path)
 
         return {"text": text}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to transcribe audio: {str(e)}")
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
 
 # PDF endpoints
-@app.post("/api/upload-pdf")
+@app.post("/api/upload-pdf", dependencies=[Depends(check_upload_size)])
 async def upload_pdf(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Read file content
-        file_content = await file.read()
-
-        # Process PDF
-        result = await pdf_service.process_pdf_upload(
-            db, current_user.id, file.filename or "document.pdf", file_content  # type: ignore
-        )
-
-        if not result["success"]:
-            raise HTTPException(status_code=400, detail=result["errors"])
+    # Hand over the spooled file (rolls to disk when large) rather than reading it all
+    result = await pdf_service.process_pdf_upload(
+        db, current_user.id, file.filename or "document.pdf", file.file  # type: ignore
+    )
 
-        return result
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["errors"])
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to upload PDF: {str(e)}")
+    return result
 
 @app.post("/api/chat-pdf")
 async def chat_about_pdf(
-    request: dict,
+    request: ChatPdfRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        chat_session_id = request.get("chat_session_id")
-        message = request.get("message", "")
-
-        if not chat_session_id or not message:
-            raise HTTPException(status_code=400, detail="chat_session_id and message are required")
+    chat_session_id = request.chat_session_id
+    message = request.message
 
-        result = await pdf_service.chat_about_pdf(
-            db, current_user.id, chat_session_id, message  # type: ignore
-        )
+    if not chat_session_id or not message:
+        raise HTTPException(status_code=400, detail="chat_session_id and message are required")
 
-        return result
+    result = await pdf_service.chat_about_pdf(
+        db, current_user.id, chat_session_id, message  # type: ignore
+    )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to chat about PDF: {str(e)}")
+    return result
 
+# Plain def: FastAPI runs these in the threadpool, so sync DB work does not block the loop
 @app.get("/api/user-pdfs")
-async def get_user_pdfs(
+def get_user_pdfs(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        pdfs = pdf_service.get_user_pdfs(db, current_user.id)  # type: ignore
-        return {"pdfs": pdfs}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get PDFs: {str(e)}")
+    pdfs = pdf_service.get_user_pdfs(db, current_user.id)  # type: ignore
+    # Returned directly so datetimes are encoded by orjson, skipping jsonable_encoder
+    return DefaultResponse({"pdfs": pdfs})
 
 @app.get("/api/chat-sessions")
-async def get_chat_sessions(
+def get_chat_sessions(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        sessions = pdf_service.get_chat_sessions(db, current_user.id)  # type: ignore
-        return {"sessions": sessions}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get chat sessions: {str(e)}")
+    sessions = pdf_service.get_chat_sessions(db, current_user.id)  # type: ignore
+    return DefaultResponse({"sessions": sessions})
 
 # Quiz endpoints
 @app.get("/api/quiz")
@@ -266,23 +561,18 @@ async def get_quiz(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check if PDF-based quiz is requested
-        if chat_session_id:
-            questions = await quiz_service.generate_pdf_based_quiz(db, current_user.id, chat_session_id)  # type: ignore
-        else:
-            questions = quiz_service.generate_adaptive_quiz(db, current_user.id, difficulty)  # type: ignore
-        return {"questions": questions}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {str(e)}")
+    # Check if PDF-based quiz is requested
+    if chat_session_id:
+        questions = await quiz_service.generate_pdf_based_quiz(db, current_user.id, chat_session_id)  # type: ignore
+    else:
+        questions = await run_in_threadpool(quiz_service.generate_adaptive_quiz, db, current_user.id, difficulty)  # type: ignore
+    return {"questions": questions}
 
 @app.post("/api/submit-quiz")
-async def submit_quiz(request: QuizAnswers, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    try:
-        quiz_service.submit_quiz_results(db, current_user.id, request.answers)  # type: ignore
-        return {"message": "Quiz submitted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to submit quiz: {str(e)}")
+def submit_quiz(request: QuizAnswers, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    answers = [answer.model_dump() for answer in request.answers]
+    quiz_service.submit_quiz_results(db, current_user.id, answers)  # type: ignore
+    return {"message": "Quiz submitted successfully"}
 
 # Dashboard endpoint
 @app.get("/api/dashboard")
@@ -349,617 +639,502 @@ async def get_dashboard_data(role: str = "admin"):
 # MasterLMS Endpoints
 # ============================================================================
 
+# Read-mostly admin lookups are cached for a short TTL; writes that change a resource
+# clear its cache (and any lookup whose counts depend on it). With REDIS_URL set the
+# caches live in Redis, so every worker shares them and sees invalidations at once;
+# otherwise each worker keeps its own.
+lookup_redis = redis_client(REDIS_URL)
+
+def _lookup_cache(resource: str, maxsize: int, ttl: float):
+    if lookup_redis is not None:
+        return RedisTTLCache(lookup_redis, f"lookup:{resource}", ttl=ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
+lookup_caches = {
+    "departments": _lookup_cache("departments", maxsize=64, ttl=60),
+    "programs": _lookup_cache("programs", maxsize=256, ttl=60),
+    "semesters": _lookup_cache("semesters", maxsize=16, ttl=300),
+    "users": _lookup_cache("users", maxsize=64, ttl=60),
+    # Per-course assignment lists; submission counts may lag by up to the TTL
+    "assignments": _lookup_cache("assignments", maxsize=256, ttl=30),
+}
+
+def cached_lookup(resource: str, key, loader):
+    cache = lookup_caches[resource]
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value)
+    return value
+
+def _etag_entry(payload) -> Dict[str, Any]:
+    digest = hashlib.blake2b(json.dumps(payload, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+    return {"etag": f'"{digest}"', "payload": payload}
+
+def cached_lookup_response(request: Request, resource: str, key, loader):
+    """cached_lookup for GET endpoints with an ETag, answering a matching If-None-Match with 304.
+    The ETag hashes the payload once per cache fill, so it changes whenever a write invalidates it."""
+    entry = cached_lookup(resource, key, lambda: _etag_entry(loader()))
+    headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entry["etag"] in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return DefaultResponse(entry["payload"], headers=headers)
+
+def invalidate_lookups(*resources: str):
+    for resource in resources:
+        lookup_caches[resource].clear()
+
+def _is_enrolled(db: Session, student_id: int, course_id: int) -> bool:
+    # Existence check only: one id column, at most one row, no Enrollment object built
+    return db.query(Enrollment.id).filter(
+        Enrollment.student_id == student_id,
+        Enrollment.course_id == course_id,
+        Enrollment.status == EnrollmentStatus.ENROLLED
+    ).limit(1).scalar() is not None
+
+# Enum lookups by lowercase value: a dict miss is cheaper than raising and catching ValueError
+_ROLE_BY_NAME = {r.value: r for r in UserRole}
+
 # Academic Management Endpoints
+# The academic and user handlers only do sync DB work, so they are plain def and
+# FastAPI runs them in its threadpool instead of blocking the event loop.
 @app.get("/api/academic/departments")
-async def get_departments(
+def get_departments(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        departments = academic_service.get_departments(db)
-        return {"departments": departments}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get departments: {str(e)}")
+    return cached_lookup_response(
+        request, "departments", "active", lambda: {"departments": academic_service.get_departments(db)}
+    )
 
 @app.post("/api/academic/departments")
-async def create_department(
-    request: dict,
-    current_user: User = Depends(get_current_user),
+def create_department(
+    body: DepartmentCreate,
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Validate input data
-        validation_rules = {
-            'name': {'type': 'string', 'required': True, 'field_type': 'title'},
-            'code': {'type': 'code', 'required': True},
-            'description': {'type': 'string', 'required': False, 'field_type': 'description'},
-            'head_of_department': {'type': 'string', 'required': False, 'field_type': 'name'}
-        }
-        validated_data = InputValidator.validate_request_data(request, validation_rules)
-
-        department = academic_service.create_department(db, validated_data)
-        return {"message": "Department created successfully", "department": department}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create department: {str(e)}")
+    department = academic_service.create_department(db, body.model_dump())
+    invalidate_lookups("departments", "programs")
+    return {"message": "Department created successfully", "department": department}
 
 @app.put("/api/academic/departments/{department_id}")
-async def update_department(
+def update_department(
     department_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        department = academic_service.update_department(db, department_id, request)
-        return {"message": "Department updated successfully", "department": department}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update department: {str(e)}")
+    department = academic_service.update_department(db, department_id, request)
+    invalidate_lookups("departments", "programs")
+    return {"message": "Department updated successfully", "department": department}
 
 @app.get("/api/academic/departments/{department_id}/can-delete")
-async def check_department_deletion(
+def check_department_deletion(
     department_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        result = academic_service.can_delete_department(db, department_id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to check department deletion: {str(e)}")
+    result = academic_service.can_delete_department(db, department_id)
+    return result
 
 @app.delete("/api/academic/departments/{department_id}")
-async def delete_department(
+def delete_department(
     department_id: int,
     force: bool = False,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        academic_service.delete_department(db, department_id, force=force)
-        return {"message": "Department deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete department: {str(e)}")
+    academic_service.delete_department(db, department_id, force=force)
+    invalidate_lookups("departments", "programs", "users")
+    return {"message": "Department deleted successfully"}
 
 @app.get("/api/academic/departments/{department_id}")
-async def get_department_details(
+def get_department_details(
     department_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        department = academic_service.get_department_details(db, department_id)
-        return {"department": department}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get department details: {str(e)}")
+    department = academic_service.get_department_details(db, department_id)
+    return {"department": department}
 
 @app.post("/api/academic/departments/{department_id}/assign-lecturer")
-async def assign_lecturer_to_department(
+def assign_lecturer_to_department(
     department_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
+    lecturer_id = request.get("lecturer_id")
+    if not lecturer_id:
+        raise HTTPException(status_code=400, detail="lecturer_id is required")
 
-        lecturer_id = request.get("lecturer_id")
-        if not lecturer_id:
-            raise HTTPException(status_code=400, detail="lecturer_id is required")
-
-        result = academic_service.assign_lecturer_to_department(db, lecturer_id, department_id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to assign lecturer: {str(e)}")
+    result = academic_service.assign_lecturer_to_department(db, lecturer_id, department_id)
+    invalidate_lookups("departments", "users")
+    return result
 
 @app.get("/api/academic/programs")
-async def get_programs(
+def get_programs(
+    request: Request,
     department_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        programs = academic_service.get_programs(db, department_id)
-        return {"programs": programs}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get programs: {str(e)}")
+    return cached_lookup_response(
+        request, "programs", department_id, lambda: {"programs": academic_service.get_programs(db, department_id)}
+    )
 
 @app.post("/api/academic/programs")
-async def create_program(
+def create_program(
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        program = academic_service.create_program(db, request)
-        return {"message": "Program created successfully", "program": program}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create program: {str(e)}")
+    program = academic_service.create_program(db, request)
+    invalidate_lookups("programs", "departments")
+    return {"message": "Program created successfully", "program": program}
 
 @app.put("/api/academic/programs/{program_id}")
-async def update_program(
+def update_program(
     program_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        program = academic_service.update_program(db, program_id, request)
-        return {"message": "Program updated successfully", "program": program}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update program: {str(e)}")
+    program = academic_service.update_program(db, program_id, request)
+    invalidate_lookups("programs", "departments")
+    return {"message": "Program updated successfully", "program": program}
 
 @app.delete("/api/academic/programs/{program_id}")
-async def delete_program(
+def delete_program(
     program_id: int,
     force: bool = False,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        academic_service.delete_program(db, program_id, force=force)
-        return {"message": "Program deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete program: {str(e)}")
+    academic_service.delete_program(db, program_id, force=force)
+    invalidate_lookups("programs", "departments")
+    return {"message": "Program deleted successfully"}
 
 @app.get("/api/academic/courses")
-async def get_courses(
+def get_courses(
     semester_id: Optional[int] = None,
     department_id: Optional[int] = None,
     lecturer_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        courses = academic_service.get_courses(db, semester_id, department_id, lecturer_id)
-        return {"courses": courses}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get courses: {str(e)}")
+    courses = academic_service.get_courses(db, semester_id, department_id, lecturer_id)
+    return {"courses": courses}
 
 @app.get("/api/academic/semesters")
-async def get_semesters(
+def get_semesters(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        semesters = academic_service.get_semesters(db)
-        current_semester = academic_service.get_current_semester(db)
-        return {"semesters": semesters, "current_semester": current_semester}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get semesters: {str(e)}")
+    return cached_lookup_response(
+        request, "semesters", "all", lambda: academic_service.get_semesters_with_current(db)
+    )
 
-@app.post("/api/academic/semesters")
-async def create_semester(
-    request: dict,
-    current_user: User = Depends(get_current_user),
+@app.post("/api/academic/semesters", response_model=SemesterCreatedResponse)
+def create_semester(
+    body: SemesterCreate,
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Only allow admins to create semesters
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Validate input data
-        validation_rules = {
-            'name': {'type': 'string', 'required': True, 'field_type': 'title'},
-            'semester_type': {'type': 'string', 'required': True, 'field_type': 'short_text'},
-            'year': {'type': 'integer', 'required': True, 'min_val': 2020, 'max_val': 2030},
-            'start_date': {'type': 'string', 'required': True, 'field_type': 'short_text'},
-            'end_date': {'type': 'string', 'required': True, 'field_type': 'short_text'},
-            'registration_start': {'type': 'string', 'required': True, 'field_type': 'short_text'},
-            'registration_end': {'type': 'string', 'required': True, 'field_type': 'short_text'},
-            'is_current': {'type': 'boolean', 'required': False}
-        }
-        validated_data = InputValidator.validate_request_data(request, validation_rules)
-
-        # Parse dates
-        start_date = datetime.fromisoformat(validated_data.get("start_date"))
-        end_date = datetime.fromisoformat(validated_data.get("end_date"))
-        registration_start = datetime.fromisoformat(validated_data.get("registration_start"))
-        registration_end = datetime.fromisoformat(validated_data.get("registration_end"))
-
-        # Create semester
-        semester = Semester(
-            name=validated_data.get("name"),
-            semester_type=SemesterType(validated_data.get("semester_type").lower()),  # Use lowercase for enum
-            year=validated_data.get("year"),
-            start_date=start_date,
-            end_date=end_date,
-            registration_start=registration_start,
-            registration_end=registration_end,
-            is_current=validated_data.get("is_current", False)
-        )
+    semester = Semester(**body.model_dump())
 
-        db.add(semester)
-        db.commit()
-        db.refresh(semester)
+    db.add(semester)
+    db.commit()
+    invalidate_lookups("semesters")
 
-        return {
-            "message": "Semester created successfully",
-            "semester": {
-                "id": semester.id,
-                "name": semester.name,
-                "semester_type": semester.semester_type.value,
-                "year": semester.year,
-                "start_date": semester.start_date.isoformat(),
-                "end_date": semester.end_date.isoformat(),
-                "is_current": semester.is_current
-            }
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create semester: {str(e)}")
+    # Every field is set above and survives the commit (expire_on_commit=False), so no
+    # refresh is needed; the response model reads the ORM object directly
+    return {"message": "Semester created successfully", "semester": semester}
 
 @app.put("/api/academic/semesters/{semester_id}")
-async def update_semester(
+def update_semester(
     semester_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Only allow admins to update semesters
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
+    semester = db.get(Semester, semester_id)
+    if not semester:
+        raise HTTPException(status_code=404, detail="Semester not found")
 
-        semester = db.query(Semester).filter(Semester.id == semester_id).first()
-        if not semester:
-            raise HTTPException(status_code=404, detail="Semester not found")
+    # Update fields
+    if "name" in request:
+        semester.name = request["name"]
+    if "is_current" in request:
+        semester.is_current = request["is_current"]
 
-        # Update fields
-        if "name" in request:
-            semester.name = request["name"]
-        if "is_current" in request:
-            semester.is_current = request["is_current"]
-
-        db.commit()
-        return {"message": "Semester updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update semester: {str(e)}")
+    db.commit()
+    invalidate_lookups("semesters")
+    return {"message": "Semester updated successfully"}
 
 @app.get("/api/academic/overview")
-async def get_academic_overview(
-    current_user: User = Depends(get_current_user),
+def get_academic_overview(
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Only allow admins to view system overview
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        overview = academic_service.get_academic_overview(db)
-        return overview
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get academic overview: {str(e)}")
+    overview = academic_service.get_academic_overview(db)
+    return overview
 
 # User Management Endpoints
 @app.get("/api/users/profile")
-async def get_user_profile(
+def get_user_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        profile = user_management_service.get_user_profile(db, current_user.id)
-        return profile
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get user profile: {str(e)}")
+    profile = user_management_service.get_user_profile(db, current_user.id)
+    return profile
 
 @app.put("/api/users/profile")
-async def update_user_profile(
-    request: dict,
+def update_user_profile(
+    body: ProfileUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Validate input data
-        validation_rules = {
-            'name': {'type': 'string', 'required': False, 'field_type': 'name'},
-            'email': {'type': 'email', 'required': False},
-            'phone': {'type': 'phone', 'required': False},
-            'bio': {'type': 'string', 'required': False, 'field_type': 'long_text'},
-            'profile_picture_url': {'type': 'string', 'required': False, 'field_type': 'url'}
-        }
-        validated_data = InputValidator.validate_request_data(request, validation_rules)
-
-        # Users can only update their own profile
-        updated_profile = user_management_service.update_user(db, current_user.id, validated_data)
-        return updated_profile
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update profile: {str(e)}")
+    # Users can only update their own profile; omitted or blank fields are left unchanged
+    updated_profile = user_management_service.update_user(db, current_user.id, body.model_dump(exclude_none=True))
+    invalidate_lookups("users")
+    return updated_profile
 
 @app.post("/api/users/change-password")
-async def change_password(
+def change_password(
     request: dict,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        current_password = request.get("current_password")
-        new_password = request.get("new_password")
+    current_password = request.get("current_password")
+    new_password = request.get("new_password")
 
-        if not current_password or not new_password:
-            raise HTTPException(status_code=400, detail="Current password and new password are required")
+    if not current_password or not new_password:
+        raise HTTPException(status_code=400, detail="Current password and new password are required")
 
-        # Verify current password
-        if not auth_manager.verify_password(current_password, current_user.password_hash):
-            raise HTTPException(status_code=400, detail="Current password is incorrect")
+    # Verify current password
+    if not auth_manager.verify_password(current_password, current_user.password_hash):
+        raise HTTPException(status_code=400, detail="Current password is incorrect")
 
-        # Update password
-        new_password_hash = auth_manager.hash_password(new_password)
-        current_user.password_hash = new_password_hash
-        db.commit()
+    # Update password
+    new_password_hash = auth_manager.hash_password(new_password)
+    current_user.password_hash = new_password_hash
+    db.commit()
+    invalidate_cached_user(current_user.id)
 
-        return {"message": "Password changed successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to change password: {str(e)}")
+    return {"message": "Password changed successfully"}
 
 @app.put("/api/users/notification-preferences")
 async def update_notification_preferences(
     request: dict,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
-    try:
-        # For now, just return success - in a real app, you'd store these preferences
-        return {"message": "Notification preferences updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update notification preferences: {str(e)}")
+    # For now, just return success - in a real app, you'd store these preferences
+    return {"message": "Notification preferences updated successfully"}
 
 @app.put("/api/users/privacy-settings")
 async def update_privacy_settings(
     request: dict,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
-    try:
-        # For now, just return success - in a real app, you'd store these settings
-        return {"message": "Privacy settings updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update privacy settings: {str(e)}")
+    # For now, just return success - in a real app, you'd store these settings
+    return {"message": "Privacy settings updated successfully"}
 
 @app.get("/api/users/dashboard")
-async def get_user_dashboard(
-    current_user: User = Depends(get_current_user),
+def get_user_dashboard(
+    current_user: Claims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role == UserRole.STUDENT:
-            dashboard = user_management_service.get_student_dashboard(db, current_user.id)
-        elif current_user.role == UserRole.LECTURER:
-            dashboard = user_management_service.get_lecturer_dashboard(db, current_user.id)
-        else:
-            # Admin gets academic overview
-            dashboard = academic_service.get_academic_overview(db)
+    if current_user.role == UserRole.STUDENT:
+        dashboard = user_management_service.get_student_dashboard(db, current_user.id)
+    elif current_user.role == UserRole.LECTURER:
+        dashboard = user_management_service.get_lecturer_dashboard(db, current_user.id)
+    else:
+        # Admin gets academic overview
+        dashboard = academic_service.get_academic_overview(db)
 
-        return dashboard
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get dashboard: {str(e)}")
+    return dashboard
 
 @app.get("/api/users")
-async def get_all_users(
+def get_all_users(
     role: Optional[str] = None,
     unassigned: Optional[bool] = None,
-    current_user: User = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    response_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Only allow admins to view user lists
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        if role and unassigned:
-            # Get unassigned lecturers
-            if role.lower() == "lecturer":
-                users = db.query(User).filter(
+    if role and unassigned:
+        # Get unassigned lecturers
+        if role.lower() == "lecturer":
+            # Only the listed columns are needed, so skip building full User objects
+            rows = db.execute(
+                select(User.id, User.name, User.email, User.role, User.employee_id, User.is_active).where(
                     User.role == UserRole.LECTURER,
                     User.department_id.is_(None),
                     User.is_active == True
-                ).all()
+                )
+            ).all()
 
-                return {"users": [
-                    {
-                        "id": user.id,
-                        "name": user.name,
-                        "email": user.email,
-                        "role": user.role.value,
-                        "employee_id": user.employee_id,
-                        "is_active": user.is_active
-                    }
-                    for user in users
-                ]}
+            return {"users": [
+                {**row._mapping, "role": row.role.value}
+                for row in rows
+            ]}
 
-        users = user_management_service.get_all_users(db, active_only=True)
-        return {"users": users}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get users: {str(e)}")
+    if response_format == "ndjson":
+        # One JSON object per line, written as rows arrive instead of after the whole list is built
+        return StreamingResponse(_stream_users(db.get_bind(), limit, offset), media_type="application/x-ndjson")
+
+    users = user_management_service.get_all_users(db, active_only=True, limit=limit, offset=offset)
+    return {"users": users}
+
+# Same encoder the JSON responses use
+_render_json = DefaultResponse(content=None).render
+
+def _stream_users(bind, limit: Optional[int], offset: int):
+    # The request's session is closed as soon as the handler returns, so the stream
+    # opens its own on the same engine for as long as it runs (StreamingResponse
+    # iterates it in the threadpool)
+    with SessionLocal(bind=bind) as session:
+        for entry in user_management_service.iter_users(session, active_only=True, limit=limit, offset=offset):
+            yield _render_json(entry) + b"\n"
 
 @app.get("/api/users/by-role/{role}")
-async def get_users_by_role(
+def get_users_by_role(
     role: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Only allow admins to view user lists
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        try:
-            user_role = UserRole(role.lower())
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid role")
+    user_role = _ROLE_BY_NAME.get(role.lower())
+    if user_role is None:
+        raise HTTPException(status_code=400, detail="Invalid role")
 
-        users = user_management_service.get_users_by_role(db, user_role)
-        return {"users": users}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get users: {str(e)}")
+    users = cached_lookup("users", user_role, lambda: user_management_service.get_users_by_role(db, user_role))
+    return {"users": users}
 
-@app.post("/api/users")
-async def create_user(
-    request: dict,
-    current_user: User = Depends(get_current_user),
+@app.post("/api/users", response_model=UserCreatedResponse)
+def create_user(
+    body: UserCreate,
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     try:
-        # Only allow admins to create users
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Validate input data
-        validation_rules = {
-            'name': {'type': 'string', 'required': True, 'field_type': 'name'},
-            'email': {'type': 'email', 'required': True},
-            'password': {'type': 'string', 'required': True, 'field_type': 'medium_text'},
-            'role': {'type': 'string', 'required': True, 'field_type': 'short_text'}
-        }
-        validated_data = InputValidator.validate_request_data(request, validation_rules)
-
-        name = validated_data.get("name")
-        email = validated_data.get("email")
-        password = validated_data.get("password")
-        role = validated_data.get("role")
-
-        try:
-            user_role = UserRole(role.lower())
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid role")
-
-        user = auth_manager.create_user(db, name, email, password, user_role)
-        return {
-            "message": "User created successfully",
-            "user": {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "role": user.role.value,
-                "created_at": user.created_at.isoformat()
-            }
-        }
+        user = auth_manager.create_user(db, body.name, body.email, body.password, body.role)
     except ValueError as e:
+        # e.g. email already registered
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
+    invalidate_lookups("users", "departments")
+    return {"message": "User created successfully", "user": user}
 
 @app.put("/api/users/{user_id}")
-async def update_user(
+def update_user(
     user_id: int,
-    request: dict,
-    current_user: User = Depends(get_current_user),
+    body: UserUpdate,
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
+    # Omitted or blank fields are left unchanged
     try:
-        # Only allow admins to update users
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Validate input data
-        validation_rules = {
-            'name': {'type': 'string', 'required': False, 'field_type': 'name'},
-            'email': {'type': 'email', 'required': False},
-            'role': {'type': 'string', 'required': False, 'field_type': 'short_text'},
-            'phone': {'type': 'phone', 'required': False},
-            'bio': {'type': 'string', 'required': False, 'field_type': 'long_text'}
-        }
-        validated_data = InputValidator.validate_request_data(request, validation_rules)
-
-        user = user_management_service.update_user(db, user_id, validated_data)
-        return {"message": "User updated successfully", "user": user}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
+        user = user_management_service.update_user(db, user_id, body.model_dump(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    invalidate_lookups("users", "departments")
+    return {"message": "User updated successfully", "user": user}
 
 @app.get("/api/users/{user_id}")
-async def get_user_details(
+def get_user_details(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     try:
-        # Only allow admins to get user details
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
         user = user_management_service.get_user_by_id(db, user_id)
-        return {"user": user}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get user details: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"user": user}
 
 @app.put("/api/users/{user_id}/activate")
-async def activate_user(
+def activate_user(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     try:
-        # Only allow admins to activate users
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
         user_management_service.activate_user(db, user_id)
-        return {"message": "User activated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to activate user: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    invalidate_lookups("users", "departments")
+    return {"message": "User activated successfully"}
 
 @app.put("/api/users/{user_id}/deactivate")
-async def deactivate_user(
+def deactivate_user(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     try:
-        # Only allow admins to deactivate users
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
         user_management_service.deactivate_user(db, user_id)
-        return {"message": "User deactivated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to deactivate user: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    invalidate_lookups("users", "departments")
+    return {"message": "User deactivated successfully"}
 
 @app.delete("/api/users/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     try:
-        # Only allow admins to delete users
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
         user_management_service.delete_user(db, user_id)
-        return {"message": "User deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete user: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    invalidate_lookups("users", "departments")
+    return {"message": "User deleted successfully"}
 
 # ============================================================================
 # Enrollment Management API Endpoints
 # ============================================================================
 
 @app.get("/api/enrollments")
-async def get_all_enrollments():
-    return {"enrollments": MOCK_ENROLLMENTS}
+def get_all_enrollments(
+    current_user: Claims = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    # Plain column rows with student and course joined in SQL; no Enrollment/User/Course
+    # objects are built for what can be thousands of rows
+    rows = db.query(
+        Enrollment.id, Enrollment.student_id, User.name, Enrollment.course_id,
+        Course.name, Course.code, Enrollment.status, Enrollment.enrollment_date,
+        Enrollment.final_grade, Enrollment.is_active
+    ).join(
+        User, User.id == Enrollment.student_id
+    ).join(
+        Course, Course.id == Enrollment.course_id
+    ).order_by(Enrollment.id).all()
+
+    enrollments = [
+        {
+            "id": id,
+            "student_id": student_id,
+            "student_name": student_name,
+            "course_id": course_id,
+            "course_name": course_name,
+            "course_code": course_code,
+            "status": status.value,
+            "enrollment_date": enrollment_date,
+            "final_grade": final_grade,
+            "is_active": is_active
+        }
+        for (id, student_id, student_name, course_id, course_name, course_code,
+             status, enrollment_date, final_grade, is_active) in rows
+    ]
+
+    return {"enrollments": enrollments}
 
 @app.post("/api/enrollments")
 async def create_enrollment(request: dict):
@@ -967,38 +1142,43 @@ async def create_enrollment(request: dict):
     MOCK_ENROLLMENTS.append(new_enrollment)
     return {"enrollment": new_enrollment, "message": "Enrollment created successfully"}
 
+@app.post("/api/enrollments/bulk")
+def create_enrollments_bulk(
+    payload: BulkEnrollmentCreate,
+    current_user: Claims = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    # Pairs that are already enrolled are skipped, so retrying an import is safe
+    try:
+        return academic_service.bulk_enroll_students(db, [row.model_dump() for row in payload.enrollments])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.put("/api/enrollments/{enrollment_id}")
 async def update_enrollment(
     enrollment_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Only allow admins to update enrollments
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
+    enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+    if not enrollment:
+        raise HTTPException(status_code=404, detail="Enrollment not found")
 
-        enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
-        if not enrollment:
-            raise HTTPException(status_code=404, detail="Enrollment not found")
+    # Update status if provided
+    if "status" in request:
+        try:
+            status_value = request["status"].lower()  # Use lowercase for enum
+            enrollment.status = EnrollmentStatus(status_value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid enrollment status: {request['status']}")
 
-        # Update status if provided
-        if "status" in request:
-            try:
-                status_value = request["status"].lower()  # Use lowercase for enum
-                enrollment.status = EnrollmentStatus(status_value)
-            except ValueError:
-                raise HTTPException(status_code=400, detail=f"Invalid enrollment status: {request['status']}")
+    # Update grade if provided
+    if "final_grade" in request:
+        enrollment.final_grade = request["final_grade"]
 
-        # Update grade if provided
-        if "final_grade" in request:
-            enrollment.final_grade = request["final_grade"]
-
-        db.commit()
-        return {"message": "Enrollment updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update enrollment: {str(e)}")
+    db.commit()
+    return {"message": "Enrollment updated successfully"}
 
 @app.get("/api/submissions/{submission_id}")
 async def get_submission(submission_id: int):
@@ -1075,23 +1255,17 @@ async def get_student_enrollments():
 @app.post("/api/student/enroll")
 async def enroll_in_course(
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_student),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.STUDENT:
-            raise HTTPException(status_code=403, detail="Access denied")
+    course_id = request.get("course_id")
+    program_id = request.get("program_id")
 
-        course_id = request.get("course_id")
-        program_id = request.get("program_id")
+    if not course_id or not program_id:
+        raise HTTPException(status_code=400, detail="course_id and program_id are required")
 
-        if not course_id or not program_id:
-            raise HTTPException(status_code=400, detail="course_id and program_id are required")
-
-        result = academic_service.enroll_student(db, current_user.id, course_id, program_id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to enroll: {str(e)}")
+    result = academic_service.enroll_student(db, current_user.id, course_id, program_id)
+    return result
 
 # Lecturer-specific endpoints
 @app.get("/api/lecturer/courses")
@@ -1303,72 +1477,61 @@ async def get_lecturer_programs():
 @app.post("/api/courses")
 async def create_course(
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Validate input data
-        validation_rules = {
-            'name': {'type': 'string', 'required': True, 'field_type': 'title'},
-            'code': {'type': 'code', 'required': True},
-            'description': {'type': 'string', 'required': False, 'field_type': 'description'},
-            'credits': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 10},
-            'department_id': {'type': 'integer', 'required': True, 'min_val': 1},
-            'max_capacity': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 500},
-            'prerequisites': {'type': 'string', 'required': False, 'field_type': 'medium_text'},
-            'syllabus': {'type': 'string', 'required': False, 'field_type': 'long_text'}
-        }
-        validated_data = InputValidator.validate_request_data(request, validation_rules)
+    # Validate input data
+    validated_data = InputValidator.validate_request_data(request, _COURSE_VALIDATION_RULES)
+
+    # Check if course code already exists (only among active courses)
+    existing_course = db.query(Course.id).filter(
+        Course.code == validated_data.get("code").upper(),
+        Course.is_active == True
+    ).limit(1).scalar()
+    if existing_course is not None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Course code '{validated_data.get('code').upper()}' already exists in active courses"
+        )
 
-        # Check if course code already exists (only among active courses)
-        existing_course = db.query(Course).filter(
-            Course.code == validated_data.get("code").upper(),
-            Course.is_active == True
-        ).first()
-        if existing_course:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Course code '{validated_data.get('code').upper()}' already exists in active courses"
-            )
-
-        # Get current semester if not specified
-        current_semester = academic_service.get_current_semester(db)
-
-        course = Course(
-            name=validated_data.get("name"),
-            code=validated_data.get("code"),
-            description=validated_data.get("description", ""),
-            credits=validated_data.get("credits", 3),
-            department_id=validated_data.get("department_id"),
-            semester_id=request.get("semester_id", current_semester["id"]),
-            lecturer_id=current_user.id if current_user.role == UserRole.LECTURER else request.get("lecturer_id"),
-            max_capacity=validated_data.get("max_capacity", 30),
-            prerequisites=validated_data.get("prerequisites", ""),
-            syllabus=validated_data.get("syllabus", "")
+    # Default to the current semester; its id only changes on a semester write, which
+    # clears the "semesters" lookup cache
+    semester_id = request.get("semester_id")
+    if semester_id is None:
+        semester_id = cached_lookup(
+            "semesters", "current_id", lambda: academic_service.get_current_semester(db)["id"]
         )
 
-        db.add(course)
-        db.commit()
-        db.refresh(course)
+    course = Course(
+        name=validated_data.get("name"),
+        code=validated_data.get("code"),
+        description=validated_data.get("description", ""),
+        credits=validated_data.get("credits", 3),
+        department_id=validated_data.get("department_id"),
+        semester_id=semester_id,
+        lecturer_id=current_user.id if current_user.role == UserRole.LECTURER else request.get("lecturer_id"),
+        max_capacity=validated_data.get("max_capacity", 30),
+        prerequisites=validated_data.get("prerequisites", ""),
+        syllabus=validated_data.get("syllabus", "")
+    )
 
-        return {
-            "message": "Course created successfully",
-            "course": {
-                "id": course.id,
-                "name": course.name,
-                "code": course.code,
-                "description": course.description,
-                "credits": course.credits,
-                "department_id": course.department_id,
-                "lecturer_id": course.lecturer_id,
-                "max_capacity": course.max_capacity
-            }
+    db.add(course)
+    db.commit()
+    db.refresh(course)
+
+    return {
+        "message": "Course created successfully",
+        "course": {
+            "id": course.id,
+            "name": course.name,
+            "code": course.code,
+            "description": course.description,
+            "credits": course.credits,
+            "department_id": course.department_id,
+            "lecturer_id": course.lecturer_id,
+            "max_capacity": course.max_capacity
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create course: {str(e)}")
+    }
 
 @app.put("/api/courses/{course_id}")
 async def update_course(
@@ -1377,84 +1540,67 @@ async def update_course(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        # Check permissions
-        if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Update course fields with proper type conversion
-        allowed_fields = {
-            'name': str,
-            'code': str,
-            'description': str,
-            'credits': int,
-            'department_id': int,
-            'semester_id': int,
-            'lecturer_id': int,
-            'max_capacity': int,
-            'prerequisites': str,
-            'syllabus': str,
-            'is_active': bool
-        }
-
-        for field, value in request.items():
-            if field in allowed_fields and hasattr(course, field):
-                try:
-                    # Convert value to proper type
-                    if allowed_fields[field] == int:
-                        converted_value = int(value) if value is not None else None
-                    elif allowed_fields[field] == bool:
-                        converted_value = bool(value) if value is not None else None
-                    else:
-                        converted_value = str(value) if value is not None else None
+    # Check permissions against the owning lecturer alone, before loading the course
+    owner = db.query(Course.lecturer_id).filter(Course.id == course_id).first()
+    if owner is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if current_user.role == UserRole.LECTURER and owner.lecturer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Update course fields with proper type conversion
+    updates = {}
+    for field, value in request.items():
+        if field in _COURSE_UPDATE_FIELDS:
+            try:
+                # Convert value to proper type
+                if _COURSE_UPDATE_FIELDS[field] == int:
+                    converted_value = int(value) if value is not None else None
+                elif _COURSE_UPDATE_FIELDS[field] == bool:
+                    converted_value = bool(value) if value is not None else None
+                else:
+                    converted_value = str(value) if value is not None else None
                     
-                    setattr(course, field, converted_value)
-                except (ValueError, TypeError) as e:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail=f"Invalid value for field '{field}': {str(e)}"
-                    )
-
+                updates[getattr(Course, field)] = converted_value
+            except (ValueError, TypeError) as e:
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Invalid value for field '{field}': {str(e)}"
+                )
+
+    if updates:
+        # Single UPDATE statement; the course row is never loaded into the session
+        updated = db.query(Course).filter(Course.id == course_id).update(
+            updates, synchronize_session=False
+        )
+        if not updated:
+            raise HTTPException(status_code=404, detail="Course not found")
         db.commit()
-        return {"message": "Course updated successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update course: {str(e)}")
+    return {"message": "Course updated successfully"}
 
 @app.delete("/api/courses/{course_id}")
 async def delete_course(
     course_id: int,
     force: bool = False,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        if force:
-            # Force delete: deactivate all enrollments, assignments, materials, etc.
-            enrollments = db.query(Enrollment).filter(Enrollment.course_id == course_id).all()
-            for enrollment in enrollments:
-                enrollment.status = EnrollmentStatus.DROPPED
-                enrollment.is_active = False
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if force:
+        # Force delete: drop all enrollments in one UPDATE rather than loading each row
+        db.query(Enrollment).filter(Enrollment.course_id == course_id).update(
+            {Enrollment.status: EnrollmentStatus.DROPPED, Enrollment.is_active: False},
+            synchronize_session=False
+        )
 
-        course.is_active = False
-        db.commit()
-        return {"message": "Course deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete course: {str(e)}")
+    course.is_active = False
+    db.commit()
+    return {"message": "Course deleted successfully"}
 
 # ============================================================================
 # Assignment Management API Endpoints
@@ -1557,61 +1703,27 @@ async def get_assignments(
 
 @app.post("/api/assignments")
 async def create_assignment(
-    request: dict,
-    current_user: User = Depends(get_current_user),
+    body: AssignmentCreate,
+    current_user: Claims = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Validate input data
-        validation_rules = {
-            'title': {'type': 'string', 'required': True, 'field_type': 'title'},
-            'description': {'type': 'string', 'required': False, 'field_type': 'description'},
-            'instructions': {'type': 'string', 'required': False, 'field_type': 'long_text'},
-            'course_id': {'type': 'integer', 'required': True, 'min_val': 1},
-            'max_points': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 1000},
-            'assignment_type': {'type': 'string', 'required': False, 'field_type': 'short_text'}
-        }
-        validated_data = InputValidator.validate_request_data(request, validation_rules)
-
-        # Parse due_date properly
-        due_date_str = request.get("due_date")
-        if isinstance(due_date_str, str):
-            # Handle different datetime formats
-            try:
-                if due_date_str.endswith('Z'):
-                    due_date_str = due_date_str[:-1] + '+00:00'
-                due_date = datetime.fromisoformat(due_date_str)
-            except ValueError:
-                # Fallback: try to parse common formats
-                try:
-                    due_date = datetime.strptime(due_date_str, "%Y-%m-%dT%H:%M:%S")
-                except ValueError:
-                    # Last resort: use current time + 1 week
-                    due_date = datetime.now(timezone.utc) + timedelta(days=7)
-        else:
-            due_date = due_date_str
-
-        assignment = Assignment(
-            title=validated_data.get("title"),
-            description=validated_data.get("description", ""),
-            course_id=validated_data.get("course_id"),
-            due_date=due_date,
-            max_points=validated_data.get("max_points", 100),
-            assignment_type=validated_data.get("assignment_type", "homework"),
-            instructions=validated_data.get("instructions", ""),
-            is_published=request.get("is_published", True)
-        )
+    assignment = Assignment(
+        title=body.title,
+        description=body.description or "",
+        instructions=body.instructions or "",
+        course_id=body.course_id,
+        due_date=body.due_date or datetime.now(timezone.utc) + timedelta(days=7),
+        max_points=body.max_points,
+        assignment_type=body.assignment_type or "homework",
+        is_published=body.is_published
+    )
 
-        db.add(assignment)
-        db.commit()
-        db.refresh(assignment)
+    db.add(assignment)
+    db.commit()
+    db.refresh(assignment)
+    invalidate_lookups("assignments")
 
-        return {"message": "Assignment created successfully", "assignment_id": assignment.id}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create assignment: {str(e)}")
+    return {"message": "Assignment created successfully", "assignment_id": assignment.id}
 
 @app.get("/api/assignments/{assignment_id}/submissions")
 async def get_assignment_submissions_demo(assignment_id: int):
@@ -1771,67 +1883,59 @@ async def get_course_materials(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check if user has access to course
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        # Check enrollment or teaching access
-        has_access = False
-        if current_user.role == UserRole.ADMIN:
-            has_access = True
-        elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
-            has_access = True
-        elif current_user.role == UserRole.STUDENT:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.student_id == current_user.id,
-                Enrollment.course_id == course_id,
-                Enrollment.status == EnrollmentStatus.ENROLLED
-            ).first()
-            has_access = enrollment is not None
-
-        if not has_access:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        materials = db.query(CourseMaterial).filter(
-            CourseMaterial.course_id == course_id,
-            CourseMaterial.is_active == True
-        ).order_by(CourseMaterial.created_at.desc()).all()
-
-        material_list = []
-        for material in materials:
-            # Create file URL for access - use streaming for videos, download for others
-            if material.material_type == "video":
-                file_url = f"/api/materials/{material.id}/stream"
-            else:
-                file_url = f"/api/materials/{material.id}/download"
+    # Check if user has access to course
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    # Check enrollment or teaching access
+    has_access = False
+    if current_user.role == UserRole.ADMIN:
+        has_access = True
+    elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
+        has_access = True
+    elif current_user.role == UserRole.STUDENT:
+        has_access = _is_enrolled(db, current_user.id, course_id)
+
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    materials = db.query(CourseMaterial).filter(
+        CourseMaterial.course_id == course_id,
+        CourseMaterial.is_active == True
+    ).order_by(CourseMaterial.created_at.desc()).all()
+
+    material_list = []
+    for material in materials:
+        # Create file URL for access - use streaming for videos, download for others
+        if material.material_type == "video":
+            file_url = f"/api/materials/{material.id}/stream"
+        else:
+            file_url = f"/api/materials/{material.id}/download"
             
-            material_list.append({
-                "id": material.id,
-                "title": material.title,
-                "description": material.description,
-                "material_type": material.material_type,
-                "file_url": file_url,
-                "thumbnail_url": None,  # Can be added later if thumbnail support is implemented
-                "duration": None,  # Can be added later if video duration extraction is implemented
-                "file_name": material.file_name,
-                "file_size": material.file_size,
-                "file_type": material.file_type,
-                "uploaded_at": material.created_at.isoformat(),
-                "uploaded_by": material.uploaded_by.name if material.uploaded_by else "Unknown"
-            })
+        material_list.append({
+            "id": material.id,
+            "title": material.title,
+            "description": material.description,
+            "material_type": material.material_type,
+            "file_url": file_url,
+            "thumbnail_url": None,  # Can be added later if thumbnail support is implemented
+            "duration": None,  # Can be added later if video duration extraction is implemented
+            "file_name": material.file_name,
+            "file_size": material.file_size,
+            "file_type": material.file_type,
+            "uploaded_at": material.created_at.isoformat(),
+            "uploaded_by": material.uploaded_by.name if material.uploaded_by else "Unknown"
+        })
 
-        return {
-            "id": course.id,
-            "name": course.name,
-            "code": course.code,
-            "description": course.description,
-            "lecturer": course.lecturer.name if course.lecturer else "Unknown",
-            "materials": material_list
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get course materials: {str(e)}")
+    return {
+        "id": course.id,
+        "name": course.name,
+        "code": course.code,
+        "description": course.description,
+        "lecturer": course.lecturer.name if course.lecturer else "Unknown",
+        "materials": material_list
+    }
 
 @app.get("/api/materials/{material_id}/download")
 async def download_course_material(
@@ -1839,38 +1943,30 @@ async def download_course_material(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        material = db.query(CourseMaterial).filter(CourseMaterial.id == material_id).first()
-        if not material:
-            raise HTTPException(status_code=404, detail="Material not found")
-
-        # Check access permissions (same as get_course_materials)
-        course = material.course
-        has_access = False
-        if current_user.role == UserRole.ADMIN:
-            has_access = True
-        elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
-            has_access = True
-        elif current_user.role == UserRole.STUDENT:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.student_id == current_user.id,
-                Enrollment.course_id == course.id,
-                Enrollment.status == EnrollmentStatus.ENROLLED
-            ).first()
-            has_access = enrollment is not None
-
-        if not has_access:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Return file download response
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            path=material.file_path,
-            filename=material.file_name,
-            media_type=material.file_type
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to download material: {str(e)}")
+    material = db.query(CourseMaterial).filter(CourseMaterial.id == material_id).first()
+    if not material:
+        raise HTTPException(status_code=404, detail="Material not found")
+
+    # Check access permissions (same as get_course_materials)
+    course = material.course
+    has_access = False
+    if current_user.role == UserRole.ADMIN:
+        has_access = True
+    elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
+        has_access = True
+    elif current_user.role == UserRole.STUDENT:
+        has_access = _is_enrolled(db, current_user.id, course.id)
+
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Return file download response
+    from fastapi.responses import FileResponse
+    return FileResponse(
+        path=material.file_path,
+        filename=material.file_name,
+        media_type=material.file_type
+    )
 
 @app.delete("/api/materials/{material_id}")
 async def delete_course_material(
@@ -1878,29 +1974,26 @@ async def delete_course_material(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        material = db.query(CourseMaterial).filter(CourseMaterial.id == material_id).first()
-        if not material:
-            raise HTTPException(status_code=404, detail="Material not found")
+    material = db.query(CourseMaterial).filter(CourseMaterial.id == material_id).first()
+    if not material:
+        raise HTTPException(status_code=404, detail="Material not found")
 
-        # Check permissions
-        course = material.course
-        if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
+    # Check permissions
+    course = material.course
+    if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
+        raise HTTPException(status_code=403, detail="Access denied")
 
-        # Delete file from filesystem
-        if material.file_path and os.path.exists(material.file_path):
-            os.remove(material.file_path)
+    # Delete file from filesystem
+    if material.file_path and os.path.exists(material.file_path):
+        os.remove(material.file_path)
 
-        # Delete from database
-        db.delete(material)
-        db.commit()
+    # Delete from database
+    db.delete(material)
+    db.commit()
 
-        return {"message": "Material deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete material: {str(e)}")
+    return {"message": "Material deleted successfully"}
 
 @app.get("/api/courses/{course_id}/students")
 async def get_course_students(
@@ -1908,40 +2001,37 @@ async def get_course_students(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check permissions
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Get enrolled students
-        enrollments = db.query(Enrollment).filter(
-            Enrollment.course_id == course_id,
-            Enrollment.status == EnrollmentStatus.ENROLLED
-        ).all()
-
-        students = []
-        for enrollment in enrollments:
-            student = enrollment.student
-            students.append({
-                "id": student.id,
-                "student_id": student.student_id,
-                "name": student.name,
-                "email": student.email,
-                "enrollment_date": enrollment.enrollment_date.isoformat() if enrollment.enrollment_date else None,
-                "current_grade": enrollment.final_grade,
-                "attendance_rate": enrollment.attendance_percentage or 85.5,  # Use actual or mock data
-                "last_activity": "2024-01-15T10:30:00"  # Mock data
-            })
-
-        return {"students": students}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get course students: {str(e)}")
+    # Check permissions
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Get enrolled students
+    enrollments = db.query(Enrollment).filter(
+        Enrollment.course_id == course_id,
+        Enrollment.status == EnrollmentStatus.ENROLLED
+    ).all()
+
+    students = []
+    for enrollment in enrollments:
+        student = enrollment.student
+        students.append({
+            "id": student.id,
+            "student_id": student.student_id,
+            "name": student.name,
+            "email": student.email,
+            "enrollment_date": enrollment.enrollment_date.isoformat() if enrollment.enrollment_date else None,
+            "current_grade": enrollment.final_grade,
+            "attendance_rate": enrollment.attendance_percentage or 85.5,  # Use actual or mock data
+            "last_activity": "2024-01-15T10:30:00"  # Mock data
+        })
+
+    return {"students": students}
 
 @app.get("/api/courses/{course_id}/analytics")
 async def get_course_analytics(
@@ -1950,65 +2040,62 @@ async def get_course_analytics(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check permissions
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Get course statistics
-        enrollments = db.query(Enrollment).filter(
-            Enrollment.course_id == course_id,
-            Enrollment.status == EnrollmentStatus.ENROLLED
-        ).count()
-
-        assignments = db.query(Assignment).filter(Assignment.course_id == course_id).all()
-        quizzes = db.query(Quiz).filter(Quiz.course_id == course_id).all()
-
-        # Calculate average grade (mock calculation)
-        avg_grade = 82.5
-        completion_rate = 78.5
-
-        # Mock analytics data
-        analytics_data = {
-            "course_performance": [{
-                "course_id": course_id,
-                "course_name": course.name,
-                "course_code": course.code,
-                "total_students": enrollments,
-                "average_grade": avg_grade,
-                "completion_rate": completion_rate,
-                "assignment_count": len(assignments),
-                "quiz_count": len(quizzes)
-            }],
-            "student_engagement": [
-                {"date": "2024-01-01", "active_students": 35, "submissions": 28, "quiz_attempts": 42},
-                {"date": "2024-01-02", "active_students": 38, "submissions": 31, "quiz_attempts": 45},
-                {"date": "2024-01-03", "active_students": 42, "submissions": 35, "quiz_attempts": 48},
-                {"date": "2024-01-04", "active_students": 40, "submissions": 33, "quiz_attempts": 46},
-                {"date": "2024-01-05", "active_students": 44, "submissions": 37, "quiz_attempts": 50}
-            ],
-            "grade_distribution": [
-                {"grade_range": "A (90-100)", "count": 12},
-                {"grade_range": "B (80-89)", "count": 18},
-                {"grade_range": "C (70-79)", "count": 10},
-                {"grade_range": "D (60-69)", "count": 4},
-                {"grade_range": "F (0-59)", "count": 1}
-            ],
-            "assignment_performance": [
-                {"assignment_name": assignment.title, "average_score": 85.2, "submission_rate": 95.5}
-                for assignment in assignments[:4]  # Show first 4 assignments
-            ]
-        }
+    # Check permissions
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Get course statistics
+    enrollments = db.query(Enrollment).filter(
+        Enrollment.course_id == course_id,
+        Enrollment.status == EnrollmentStatus.ENROLLED
+    ).count()
+
+    assignments = db.query(Assignment).filter(Assignment.course_id == course_id).all()
+    quizzes = db.query(Quiz).filter(Quiz.course_id == course_id).all()
+
+    # Calculate average grade (mock calculation)
+    avg_grade = 82.5
+    completion_rate = 78.5
+
+    # Mock analytics data
+    analytics_data = {
+        "course_performance": [{
+            "course_id": course_id,
+            "course_name": course.name,
+            "course_code": course.code,
+            "total_students": enrollments,
+            "average_grade": avg_grade,
+            "completion_rate": completion_rate,
+            "assignment_count": len(assignments),
+            "quiz_count": len(quizzes)
+        }],
+        "student_engagement": [
+            {"date": "2024-01-01", "active_students": 35, "submissions": 28, "quiz_attempts": 42},
+            {"date": "2024-01-02", "active_students": 38, "submissions": 31, "quiz_attempts": 45},
+            {"date": "2024-01-03", "active_students": 42, "submissions": 35, "quiz_attempts": 48},
+            {"date": "2024-01-04", "active_students": 40, "submissions": 33, "quiz_attempts": 46},
+            {"date": "2024-01-05", "active_students": 44, "submissions": 37, "quiz_attempts": 50}
+        ],
+        "grade_distribution": [
+            {"grade_range": "A (90-100)", "count": 12},
+            {"grade_range": "B (80-89)", "count": 18},
+            {"grade_range": "C (70-79)", "count": 10},
+            {"grade_range": "D (60-69)", "count": 4},
+            {"grade_range": "F (0-59)", "count": 1}
+        ],
+        "assignment_performance": [
+            {"assignment_name": assignment.title, "average_score": 85.2, "submission_rate": 95.5}
+            for assignment in assignments[:4]  # Show first 4 assignments
+        ]
+    }
 
-        return analytics_data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get course analytics: {str(e)}")
+    return analytics_data
 
 # ============================================================================
 # Lesson Management Endpoints
@@ -2021,46 +2108,43 @@ async def create_lesson(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check permissions
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Parse lesson_date if provided
-        lesson_date = None
-        if request.get("lesson_date"):
-            from datetime import datetime
-            lesson_date = datetime.fromisoformat(request["lesson_date"])
-
-        # Create lesson
-        lesson = Lesson(
-            course_id=course_id,
-            title=request["title"],
-            description=request["description"],
-            lesson_date=lesson_date,
-            lesson_time=request.get("lesson_time"),
-            duration_minutes=request.get("duration_minutes", 60),
-            lesson_type=request.get("lesson_type", "lecture"),
-            created_by_id=current_user.id
-        )
+    # Check permissions
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if current_user.role == UserRole.LECTURER and course.lecturer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Parse lesson_date if provided
+    lesson_date = None
+    if request.get("lesson_date"):
+        from datetime import datetime
+        lesson_date = datetime.fromisoformat(request["lesson_date"])
+
+    # Create lesson
+    lesson = Lesson(
+        course_id=course_id,
+        title=request["title"],
+        description=request["description"],
+        lesson_date=lesson_date,
+        lesson_time=request.get("lesson_time"),
+        duration_minutes=request.get("duration_minutes", 60),
+        lesson_type=request.get("lesson_type", "lecture"),
+        created_by_id=current_user.id
+    )
 
-        db.add(lesson)
-        db.commit()
-        db.refresh(lesson)
+    db.add(lesson)
+    db.commit()
+    db.refresh(lesson)
 
-        return {
-            "message": "Lesson created successfully",
-            "lesson_id": lesson.id,
-            "title": lesson.title
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create lesson: {str(e)}")
+    return {
+        "message": "Lesson created successfully",
+        "lesson_id": lesson.id,
+        "title": lesson.title
+    }
 
 @app.get("/api/courses/{course_id}/lessons")
 async def get_course_lessons(
@@ -2068,66 +2152,58 @@ async def get_course_lessons(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check if user has access to course
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        # Check enrollment or teaching access
-        has_access = False
-        if current_user.role == UserRole.ADMIN:
-            has_access = True
-        elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
-            has_access = True
-        elif current_user.role == UserRole.STUDENT:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.student_id == current_user.id,
-                Enrollment.course_id == course_id,
-                Enrollment.status == EnrollmentStatus.ENROLLED
-            ).first()
-            has_access = enrollment is not None
-
-        if not has_access:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        lessons = db.query(Lesson).filter(
-            Lesson.course_id == course_id
-        ).order_by(Lesson.lesson_order, Lesson.created_at).all()
-
-        lesson_list = []
-        for lesson in lessons:
-            # Get lesson materials
-            materials = db.query(CourseMaterial).filter(
-                CourseMaterial.lesson_id == lesson.id,
-                CourseMaterial.is_active == True
-            ).all()
+    # Check if user has access to course
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    # Check enrollment or teaching access
+    has_access = False
+    if current_user.role == UserRole.ADMIN:
+        has_access = True
+    elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
+        has_access = True
+    elif current_user.role == UserRole.STUDENT:
+        has_access = _is_enrolled(db, current_user.id, course_id)
+
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    lessons = db.query(Lesson).filter(
+        Lesson.course_id == course_id
+    ).order_by(Lesson.lesson_order, Lesson.created_at).all()
+
+    lesson_list = []
+    for lesson in lessons:
+        # Get lesson materials
+        materials = db.query(CourseMaterial).filter(
+            CourseMaterial.lesson_id == lesson.id,
+            CourseMaterial.is_active == True
+        ).all()
 
-            material_list = []
-            for material in materials:
-                material_list.append({
-                    "id": material.id,
-                    "title": material.title,
-                    "file_name": material.file_name,
-                    "file_type": material.file_type,
-                    "file_size": material.file_size
-                })
-
-            lesson_list.append({
-                "id": lesson.id,
-                "title": lesson.title,
-                "description": lesson.description,
-                "lesson_date": lesson.lesson_date.isoformat() if lesson.lesson_date else None,
-                "lesson_time": lesson.lesson_time,
-                "duration_minutes": lesson.duration_minutes,
-                "lesson_type": lesson.lesson_type,
-                "is_published": lesson.is_published,
-                "materials": material_list
+        material_list = []
+        for material in materials:
+            material_list.append({
+                "id": material.id,
+                "title": material.title,
+                "file_name": material.file_name,
+                "file_type": material.file_type,
+                "file_size": material.file_size
             })
 
-        return {"lessons": lesson_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get course lessons: {str(e)}")
+        lesson_list.append({
+            "id": lesson.id,
+            "title": lesson.title,
+            "description": lesson.description,
+            "lesson_date": lesson.lesson_date.isoformat() if lesson.lesson_date else None,
+            "lesson_time": lesson.lesson_time,
+            "duration_minutes": lesson.duration_minutes,
+            "lesson_type": lesson.lesson_type,
+            "is_published": lesson.is_published,
+            "materials": material_list
+        })
+
+    return {"lessons": lesson_list}
 
 @app.put("/api/lessons/{lesson_id}")
 async def update_lesson(
@@ -2136,29 +2212,26 @@ async def update_lesson(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-        if not lesson:
-            raise HTTPException(status_code=404, detail="Lesson not found")
-
-        # Check permissions
-        if current_user.role == UserRole.LECTURER and lesson.course.lecturer_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Update lesson fields
-        for field, value in request.items():
-            if field == "lesson_date" and value:
-                from datetime import datetime
-                lesson.lesson_date = datetime.fromisoformat(value)
-            elif hasattr(lesson, field):
-                setattr(lesson, field, value)
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+
+    # Check permissions
+    if current_user.role == UserRole.LECTURER and lesson.course.lecturer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Update lesson fields
+    for field, value in request.items():
+        if field == "lesson_date" and value:
+            from datetime import datetime
+            lesson.lesson_date = datetime.fromisoformat(value)
+        elif hasattr(lesson, field):
+            setattr(lesson, field, value)
 
-        db.commit()
-        return {"message": "Lesson updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update lesson: {str(e)}")
+    db.commit()
+    return {"message": "Lesson updated successfully"}
 
 @app.delete("/api/lessons/{lesson_id}")
 async def delete_lesson(
@@ -2166,52 +2239,37 @@ async def delete_lesson(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-        if not lesson:
-            raise HTTPException(status_code=404, detail="Lesson not found")
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
 
-        # Check permissions
-        if current_user.role == UserRole.LECTURER and lesson.course.lecturer_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
+    # Check permissions
+    if current_user.role == UserRole.LECTURER and lesson.course.lecturer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    elif current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
+        raise HTTPException(status_code=403, detail="Access denied")
 
-        db.delete(lesson)
-        db.commit()
-        return {"message": "Lesson deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete lesson: {str(e)}")
+    db.delete(lesson)
+    db.commit()
+    return {"message": "Lesson deleted successfully"}
 
 @app.post("/api/lessons/{lesson_id}/complete")
 async def mark_lesson_complete(
     lesson_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_student),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.STUDENT:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-        if not lesson:
-            raise HTTPException(status_code=404, detail="Lesson not found")
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
 
-        # Check if student is enrolled in the course
-        enrollment = db.query(Enrollment).filter(
-            Enrollment.student_id == current_user.id,
-            Enrollment.course_id == lesson.course_id,
-            Enrollment.status == EnrollmentStatus.ENROLLED
-        ).first()
+    # Check if student is enrolled in the course
+    if not _is_enrolled(db, current_user.id, lesson.course_id):
+        raise HTTPException(status_code=403, detail="Not enrolled in this course")
 
-        if not enrollment:
-            raise HTTPException(status_code=403, detail="Not enrolled in this course")
-
-        # For now, just return success - in a full implementation,
-        # you'd track lesson completion in a separate table
-        return {"message": "Lesson marked as complete"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to mark lesson complete: {str(e)}")
+    # For now, just return success - in a full implementation,
+    # you'd track lesson completion in a separate table
+    return {"message": "Lesson marked as complete"}
 
 # ============================================================================
 # Assignment Submission File Upload
@@ -2225,79 +2283,71 @@ async def submit_assignment(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.STUDENT:
-            raise HTTPException(status_code=403, detail="Only students can submit assignments")
+    if current_user.role != UserRole.STUDENT:
+        raise HTTPException(status_code=403, detail="Only students can submit assignments")
 
-        assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-        if not assignment:
-            raise HTTPException(status_code=404, detail="Assignment not found")
-
-        # Check if student is enrolled in the course
-        enrollment = db.query(Enrollment).filter(
-            Enrollment.student_id == current_user.id,
-            Enrollment.course_id == assignment.course_id,
-            Enrollment.status == EnrollmentStatus.ENROLLED
-        ).first()
+    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
 
-        if not enrollment:
-            raise HTTPException(status_code=403, detail="Not enrolled in this course")
+    # Check if student is enrolled in the course
+    if not _is_enrolled(db, current_user.id, assignment.course_id):
+        raise HTTPException(status_code=403, detail="Not enrolled in this course")
 
-        # Check if assignment is still accepting submissions
-        if not assignment.is_published:
-            raise HTTPException(status_code=400, detail="Assignment is not published")
+    # Check if assignment is still accepting submissions
+    if not assignment.is_published:
+        raise HTTPException(status_code=400, detail="Assignment is not published")
 
-        # Create uploads directory
-        upload_dir = "uploads/assignments"
-        os.makedirs(upload_dir, exist_ok=True)
-
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{assignment_id}_{current_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-        file_path = os.path.join(upload_dir, unique_filename)
+    # Create uploads directory
+    upload_dir = "uploads/assignments"
+    os.makedirs(upload_dir, exist_ok=True)
 
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+    # Generate unique filename
+    file_extension = os.path.splitext(file.filename)[1]
+    unique_filename = f"{assignment_id}_{current_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
+    file_path = os.path.join(upload_dir, unique_filename)
 
-        # Check if submission already exists
-        existing_submission = db.query(AssignmentSubmission).filter(
-            AssignmentSubmission.assignment_id == assignment_id,
-            AssignmentSubmission.student_id == current_user.id
-        ).first()
-
-        if existing_submission:
-            # Update existing submission
-            existing_submission.file_path = file_path
-            existing_submission.file_name = file.filename
-            existing_submission.comments = comments
-            existing_submission.submitted_at = datetime.now(timezone.utc)
-            existing_submission.is_late = datetime.now(timezone.utc) > assignment.due_date
-            submission = existing_submission
-        else:
-            # Create new submission
-            submission = AssignmentSubmission(
-                assignment_id=assignment_id,
-                student_id=current_user.id,
-                file_path=file_path,
-                file_name=file.filename,
-                comments=comments,
-                is_late=datetime.now(timezone.utc) > assignment.due_date
-            )
-            db.add(submission)
+    # Save file
+    with open(file_path, "wb") as buffer:
+        content = await file.read()
+        buffer.write(content)
+
+    # Check if submission already exists
+    existing_submission = db.query(AssignmentSubmission).filter(
+        AssignmentSubmission.assignment_id == assignment_id,
+        AssignmentSubmission.student_id == current_user.id
+    ).first()
+
+    if existing_submission:
+        # Update existing submission
+        existing_submission.file_path = file_path
+        existing_submission.file_name = file.filename
+        existing_submission.comments = comments
+        existing_submission.submitted_at = datetime.now(timezone.utc)
+        existing_submission.is_late = datetime.now(timezone.utc) > assignment.due_date
+        submission = existing_submission
+    else:
+        # Create new submission
+        submission = AssignmentSubmission(
+            assignment_id=assignment_id,
+            student_id=current_user.id,
+            file_path=file_path,
+            file_name=file.filename,
+            comments=comments,
+            is_late=datetime.now(timezone.utc) > assignment.due_date
+        )
+        db.add(submission)
 
-        db.commit()
-        db.refresh(submission)
+    db.commit()
+    db.refresh(submission)
+    invalidate_lookups("assignments")
 
-        return {
-            "message": "Assignment submitted successfully",
-            "submission_id": submission.id,
-            "is_late": submission.is_late,
-            "submitted_at": submission.submitted_at.isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to submit assignment: {str(e)}")
+    return {
+        "message": "Assignment submitted successfully",
+        "submission_id": submission.id,
+        "is_late": submission.is_late,
+        "submitted_at": submission.submitted_at.isoformat()
+    }
 
 @app.get("/api/submissions/{submission_id}/download")
 async def download_submission(
@@ -2305,31 +2355,31 @@ async def download_submission(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        submission = db.query(AssignmentSubmission).filter(AssignmentSubmission.id == submission_id).first()
-        if not submission:
-            raise HTTPException(status_code=404, detail="Submission not found")
-
-        # Check permissions
-        has_access = False
-        if current_user.role == UserRole.ADMIN:
-            has_access = True
-        elif current_user.role == UserRole.LECTURER and submission.assignment.course.lecturer_id == current_user.id:
-            has_access = True
-        elif current_user.role == UserRole.STUDENT and submission.student_id == current_user.id:
-            has_access = True
-
-        if not has_access:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            path=submission.file_path,
-            filename=submission.file_name,
-            media_type="application/octet-stream"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to download submission: {str(e)}")
+    # The lecturer check reads submission.assignment.course, so load that chain with it
+    submission = db.query(AssignmentSubmission).options(
+        joinedload(AssignmentSubmission.assignment).joinedload(Assignment.course)
+    ).filter(AssignmentSubmission.id == submission_id).first()
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    # Check permissions
+    has_access = False
+    if current_user.role == UserRole.ADMIN:
+        has_access = True
+    elif current_user.role == UserRole.LECTURER and submission.assignment.course.lecturer_id == current_user.id:
+        has_access = True
+    elif current_user.role == UserRole.STUDENT and submission.student_id == current_user.id:
+        has_access = True
+
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    from fastapi.responses import FileResponse
+    return FileResponse(
+        path=submission.file_path,
+        filename=submission.file_name,
+        media_type="application/octet-stream"
+    )
 
 # ============================================================================
 # Discussion Forums API Endpoints
@@ -2341,11 +2391,8 @@ async def get_course_forums(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        forums = discussion_service.get_course_forums(db, course_id, current_user.id)
-        return {"forums": forums}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get forums: {str(e)}")
+    forums = discussion_service.get_course_forums(db, course_id, current_user.id)
+    return {"forums": forums}
 
 @app.post("/api/courses/{course_id}/forums")
 async def create_forum(
@@ -2354,17 +2401,14 @@ async def create_forum(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        title = request.get("title")
-        description = request.get("description", "")
+    title = request.get("title")
+    description = request.get("description", "")
 
-        if not title:
-            raise HTTPException(status_code=400, detail="Title is required")
+    if not title:
+        raise HTTPException(status_code=400, detail="Title is required")
 
-        result = discussion_service.create_forum(db, course_id, title, description, current_user.id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create forum: {str(e)}")
+    result = discussion_service.create_forum(db, course_id, title, description, current_user.id)
+    return result
 
 @app.get("/api/forums/{forum_id}/threads")
 async def get_forum_threads(
@@ -2374,11 +2418,8 @@ async def get_forum_threads(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = discussion_service.get_forum_threads(db, forum_id, current_user.id, page, limit)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get threads: {str(e)}")
+    result = discussion_service.get_forum_threads(db, forum_id, current_user.id, page, limit)
+    return result
 
 @app.post("/api/forums/{forum_id}/threads")
 async def create_thread(
@@ -2387,17 +2428,14 @@ async def create_thread(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        title = request.get("title")
-        content = request.get("content")
+    title = request.get("title")
+    content = request.get("content")
 
-        if not title or not content:
-            raise HTTPException(status_code=400, detail="Title and content are required")
+    if not title or not content:
+        raise HTTPException(status_code=400, detail="Title and content are required")
 
-        result = discussion_service.create_thread(db, forum_id, title, content, current_user.id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create thread: {str(e)}")
+    result = discussion_service.create_thread(db, forum_id, title, content, current_user.id)
+    return result
 
 @app.get("/api/threads/{thread_id}/posts")
 async def get_thread_posts(
@@ -2407,11 +2445,8 @@ async def get_thread_posts(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = discussion_service.get_thread_posts(db, thread_id, current_user.id, page, limit)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get posts: {str(e)}")
+    result = discussion_service.get_thread_posts(db, thread_id, current_user.id, page, limit)
+    return result
 
 @app.post("/api/threads/{thread_id}/posts")
 async def create_post(
@@ -2420,17 +2455,14 @@ async def create_post(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        content = request.get("content")
-        parent_post_id = request.get("parent_post_id")
+    content = request.get("content")
+    parent_post_id = request.get("parent_post_id")
 
-        if not content:
-            raise HTTPException(status_code=400, detail="Content is required")
+    if not content:
+        raise HTTPException(status_code=400, detail="Content is required")
 
-        result = discussion_service.create_post(db, thread_id, content, current_user.id, parent_post_id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create post: {str(e)}")
+    result = discussion_service.create_post(db, thread_id, content, current_user.id, parent_post_id)
+    return result
 
 @app.put("/api/threads/{thread_id}/pin")
 async def pin_thread(
@@ -2438,11 +2470,8 @@ async def pin_thread(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = discussion_service.pin_thread(db, thread_id, current_user.id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to pin thread: {str(e)}")
+    result = discussion_service.pin_thread(db, thread_id, current_user.id)
+    return result
 
 @app.put("/api/threads/{thread_id}/lock")
 async def lock_thread(
@@ -2450,11 +2479,8 @@ async def lock_thread(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = discussion_service.lock_thread(db, thread_id, current_user.id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to lock thread: {str(e)}")
+    result = discussion_service.lock_thread(db, thread_id, current_user.id)
+    return result
 
 # ============================================================================
 # Quiz Management Endpoints
@@ -2515,37 +2541,31 @@ async def get_lecturer_quizzes():
 @app.post("/api/quizzes")
 async def create_quiz(
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        quiz = Quiz(
-            title=request.get("title"),
-            description=request.get("description", ""),
-            course_id=request.get("course_id"),
-            created_by_id=current_user.id,
-            time_limit=request.get("time_limit", 30),
-            max_attempts=request.get("max_attempts", 3),
-            is_published=request.get("is_published", False)
-        )
+    quiz = Quiz(
+        title=request.get("title"),
+        description=request.get("description", ""),
+        course_id=request.get("course_id"),
+        created_by_id=current_user.id,
+        time_limit=request.get("time_limit", 30),
+        max_attempts=request.get("max_attempts", 3),
+        is_published=request.get("is_published", False)
+    )
 
-        db.add(quiz)
-        db.commit()
-        db.refresh(quiz)
+    db.add(quiz)
+    db.commit()
+    db.refresh(quiz)
 
-        return {
-            "message": "Quiz created successfully",
-            "quiz": {
-                "id": quiz.id,
-                "title": quiz.title,
-                "course_id": quiz.course_id
-            }
+    return {
+        "message": "Quiz created successfully",
+        "quiz": {
+            "id": quiz.id,
+            "title": quiz.title,
+            "course_id": quiz.course_id
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create quiz: {str(e)}")
+    }
 
 @app.get("/api/lecturer/assignments")
 async def get_lecturer_assignments():
@@ -2706,21 +2726,18 @@ async def send_message(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        recipient_id = request.get("recipient_id")
-        subject = request.get("subject")
-        content = request.get("content")
-        parent_message_id = request.get("parent_message_id")
+    recipient_id = request.get("recipient_id")
+    subject = request.get("subject")
+    content = request.get("content")
+    parent_message_id = request.get("parent_message_id")
 
-        if not recipient_id or not subject or not content:
-            raise HTTPException(status_code=400, detail="Recipient, subject, and content are required")
+    if not recipient_id or not subject or not content:
+        raise HTTPException(status_code=400, detail="Recipient, subject, and content are required")
 
-        result = communication_service.send_message(
-            db, current_user.id, recipient_id, subject, content, parent_message_id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send message: {str(e)}")
+    result = communication_service.send_message(
+        db, current_user.id, recipient_id, subject, content, parent_message_id
+    )
+    return result
 
 @app.get("/api/messages")
 async def get_messages(
@@ -2730,11 +2747,8 @@ async def get_messages(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = communication_service.get_user_messages(db, current_user.id, message_type, page, limit)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get messages: {str(e)}")
+    result = communication_service.get_user_messages(db, current_user.id, message_type, page, limit)
+    return result
 
 @app.get("/api/messages/{message_id}/thread")
 async def get_message_thread(
@@ -2742,11 +2756,8 @@ async def get_message_thread(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = communication_service.get_message_thread(db, message_id, current_user.id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get message thread: {str(e)}")
+    result = communication_service.get_message_thread(db, message_id, current_user.id)
+    return result
 
 @app.get("/api/notifications")
 async def get_notifications(
@@ -2755,11 +2766,8 @@ async def get_notifications(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        notifications = communication_service.get_user_notifications(db, current_user.id, unread_only, limit)
-        return {"notifications": notifications}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get notifications: {str(e)}")
+    notifications = communication_service.get_user_notifications(db, current_user.id, unread_only, limit)
+    return {"notifications": notifications}
 
 @app.put("/api/notifications/{notification_id}/read")
 async def mark_notification_read(
@@ -2767,22 +2775,16 @@ async def mark_notification_read(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = communication_service.mark_notification_read(db, notification_id, current_user.id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to mark notification as read: {str(e)}")
+    result = communication_service.mark_notification_read(db, notification_id, current_user.id)
+    return result
 
 @app.get("/api/notifications/unread-count")
 async def get_unread_count(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = communication_service.get_unread_count(db, current_user.id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get unread count: {str(e)}")
+    result = communication_service.get_unread_count(db, current_user.id)
+    return result
 
 # ============================================================================
 # Real-time WebSocket Endpoints
@@ -2824,26 +2826,20 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int, db: Session = D
 
         except WebSocketDisconnect:
             connection_manager.disconnect(websocket, user_id)
-            print(f"User {user_id} disconnected")
+            logger.info("User %s disconnected", user_id)
 
     except Exception as e:
-        print(f"WebSocket error for user {user_id}: {e}")
+        logger.error("WebSocket error for user %s: %s", user_id, e)
         connection_manager.disconnect(websocket, user_id)
 
 @app.get("/api/realtime/stats")
 async def get_realtime_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Get real-time connection statistics (admin only)"""
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        stats = realtime_service.get_connection_stats()
-        return stats
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get realtime stats: {str(e)}")
+    stats = realtime_service.get_connection_stats()
+    return stats
 
 # ============================================================================
 # Student Assessment Endpoints
@@ -2851,29 +2847,20 @@ async def get_realtime_stats(
 
 @app.get("/api/student/courses")
 async def get_student_courses(
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_student),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.STUDENT:
-            raise HTTPException(status_code=403, detail="Access denied")
+    # Get courses the student is enrolled in; only three course columns are returned,
+    # so select them as plain rows instead of hydrating Enrollment and Course objects
+    rows = db.query(Course.id, Course.name, Course.code).join(
+        Enrollment, Enrollment.course_id == Course.id
+    ).filter(
+        Enrollment.student_id == current_user.id
+    ).all()
 
-        # Get courses the student is enrolled in
-        enrollments = db.query(Enrollment).filter(
-            Enrollment.student_id == current_user.id
-        ).all()
-
-        courses = []
-        for enrollment in enrollments:
-            courses.append({
-                "id": enrollment.course.id,
-                "name": enrollment.course.name,
-                "code": enrollment.course.code
-            })
+    courses = [{"id": id, "name": name, "code": code} for id, name, code in rows]
 
-        return {"courses": courses}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get student courses: {str(e)}")
+    return {"courses": courses}
 
 @app.get("/api/student/enrolled-courses")
 async def get_student_enrolled_courses():
@@ -3113,27 +3100,24 @@ async def get_quiz_attempts(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Get student's attempts for this quiz
-        attempts = db.query(StudentQuizAttempt).filter(
-            StudentQuizAttempt.quiz_id == quiz_id,
-            StudentQuizAttempt.user_id == current_user.id
-        ).order_by(StudentQuizAttempt.completed_at.desc()).all()
-
-        attempt_list = []
-        for i, attempt in enumerate(attempts):
-            attempt_list.append({
-                "id": attempt.id,
-                "attempt_number": i + 1,
-                "score": attempt.score,
-                "total_points": attempt.total_points,
-                "completed_at": attempt.completed_at.isoformat(),
-                "time_taken": attempt.time_taken
-            })
-
-        return {"attempts": attempt_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get quiz attempts: {str(e)}")
+    # Get student's attempts for this quiz
+    attempts = db.query(StudentQuizAttempt).filter(
+        StudentQuizAttempt.quiz_id == quiz_id,
+        StudentQuizAttempt.user_id == current_user.id
+    ).order_by(StudentQuizAttempt.completed_at.desc()).all()
+
+    attempt_list = []
+    for i, attempt in enumerate(attempts):
+        attempt_list.append({
+            "id": attempt.id,
+            "attempt_number": i + 1,
+            "score": attempt.score,
+            "total_points": attempt.total_points,
+            "completed_at": attempt.completed_at.isoformat(),
+            "time_taken": attempt.time_taken
+        })
+
+    return {"attempts": attempt_list}
 
 @app.post("/api/quizzes/{quiz_id}/start")
 async def start_quiz(
@@ -3141,37 +3125,34 @@ async def start_quiz(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-        if not quiz:
-            raise HTTPException(status_code=404, detail="Quiz not found")
-
-        # Check if student can take the quiz
-        attempts = db.query(StudentQuizAttempt).filter(
-            StudentQuizAttempt.quiz_id == quiz_id,
-            StudentQuizAttempt.user_id == current_user.id
-        ).count()
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    # Check if student can take the quiz
+    attempts = db.query(StudentQuizAttempt).filter(
+        StudentQuizAttempt.quiz_id == quiz_id,
+        StudentQuizAttempt.user_id == current_user.id
+    ).count()
+
+    if attempts >= quiz.max_attempts:
+        raise HTTPException(status_code=400, detail="Maximum attempts reached")
+
+    # Create new attempt
+    attempt = StudentQuizAttempt(
+        quiz_id=quiz_id,
+        user_id=current_user.id,
+        started_at=datetime.now(),
+        score=0,
+        total_points=0,
+        time_taken=0
+    )
 
-        if attempts >= quiz.max_attempts:
-            raise HTTPException(status_code=400, detail="Maximum attempts reached")
-
-        # Create new attempt
-        attempt = StudentQuizAttempt(
-            quiz_id=quiz_id,
-            user_id=current_user.id,
-            started_at=datetime.now(),
-            score=0,
-            total_points=0,
-            time_taken=0
-        )
+    db.add(attempt)
+    db.commit()
+    db.refresh(attempt)
 
-        db.add(attempt)
-        db.commit()
-        db.refresh(attempt)
-
-        return {"attempt_id": attempt.id, "message": "Quiz started successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start quiz: {str(e)}")
+    return {"attempt_id": attempt.id, "message": "Quiz started successfully"}
 
 # ============================================================================
 # Additional Student Endpoints
@@ -3280,69 +3261,60 @@ async def get_student_semesters():
 
 @app.get("/api/student/submissions")
 async def get_student_submissions(
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_student),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.STUDENT:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Get all submissions by the student
-        submissions = db.query(AssignmentSubmission).filter(
-            AssignmentSubmission.student_id == current_user.id
-        ).all()
-
-        submission_list = []
-        for submission in submissions:
-            assignment = submission.assignment
-            submission_list.append({
-                "id": submission.id,
-                "assignment_title": assignment.title,
-                "course_name": assignment.course.name,
-                "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
-                "grade": submission.grade,
-                "max_points": assignment.max_points,
-                "feedback": submission.feedback,
-                "file_path": submission.file_url,
-                "status": "Graded" if submission.grade is not None else "Submitted"
-            })
-
-        return {"submissions": submission_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get student submissions: {str(e)}")
+    # Get all submissions by the student; assignments and their courses come in two
+    # IN queries (each course loaded once however many submissions share it)
+    submissions = db.query(AssignmentSubmission).options(
+        selectinload(AssignmentSubmission.assignment).selectinload(Assignment.course)
+    ).filter(
+        AssignmentSubmission.student_id == current_user.id
+    ).all()
+
+    submission_list = []
+    for submission in submissions:
+        assignment = submission.assignment
+        submission_list.append({
+            "id": submission.id,
+            "assignment_title": assignment.title,
+            "course_name": assignment.course.name,
+            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+            "grade": submission.grade,
+            "max_points": assignment.max_points,
+            "feedback": submission.feedback,
+            "file_path": submission.file_url,
+            "status": "Graded" if submission.grade is not None else "Submitted"
+        })
+
+    return {"submissions": submission_list}
 
 @app.get("/api/student/quiz-attempts")
 async def get_student_quiz_attempts(
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_student),
     db: Session = Depends(get_db)
 ):
-    try:
-        if current_user.role != UserRole.STUDENT:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Get all quiz attempts by the student
-        attempts = db.query(StudentQuizAttempt).filter(
-            StudentQuizAttempt.user_id == current_user.id
-        ).all()
-
-        attempt_list = []
-        for attempt in attempts:
-            quiz = attempt.quiz
-            attempt_list.append({
-                "id": attempt.id,
-                "quiz_title": quiz.title,
-                "course_name": quiz.course.name,
-                "started_at": attempt.started_at.isoformat() if attempt.started_at else None,
-                "completed_at": attempt.completed_at.isoformat() if attempt.completed_at else None,
-                "score": attempt.score,
-                "total_points": attempt.total_points,
-                "time_taken": attempt.time_taken,
-                "status": "Completed" if attempt.completed_at else "In Progress"
-            })
-
-        return {"attempts": attempt_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get quiz attempts: {str(e)}")
+    # Get all quiz attempts by the student
+    attempts = db.query(StudentQuizAttempt).filter(
+        StudentQuizAttempt.user_id == current_user.id
+    ).all()
+
+    attempt_list = []
+    for attempt in attempts:
+        quiz = attempt.quiz
+        attempt_list.append({
+            "id": attempt.id,
+            "quiz_title": quiz.title,
+            "course_name": quiz.course.name,
+            "started_at": attempt.started_at.isoformat() if attempt.started_at else None,
+            "completed_at": attempt.completed_at.isoformat() if attempt.completed_at else None,
+            "score": attempt.score,
+            "total_points": attempt.total_points,
+            "time_taken": attempt.time_taken,
+            "status": "Completed" if attempt.completed_at else "In Progress"
+        })
+
+    return {"attempts": attempt_list}
 
 # ============================================================================
 
@@ -3373,12 +3345,7 @@ async def get_course_details(
         elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
             has_access = True
         elif current_user.role == UserRole.STUDENT:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.student_id == current_user.id,
-                Enrollment.course_id == course_id,
-                Enrollment.status == EnrollmentStatus.ENROLLED
-            ).first()
-            has_access = enrollment is not None
+            has_access = _is_enrolled(db, current_user.id, course_id)
 
         if not has_access:
             raise HTTPException(status_code=403, detail="Access denied")
@@ -3472,14 +3439,10 @@ async def get_course_details(
 @app.get("/api/academic/programs/{program_id}")
 async def get_program_details(
     program_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
     try:
-        # Check permissions
-        if current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
         program = db.query(Program).filter(Program.id == program_id).first()
         if not program:
             raise HTTPException(status_code=404, detail="Program not found")
@@ -3509,13 +3472,13 @@ async def get_program_details(
             "name": program.name,
             "code": program.code,
             "description": program.description,
-            "program_type": program.program_type.value if hasattr(program.program_type, 'value') else str(program.program_type),
+            "program_type": program.program_type,
             "department_name": program.department.name,
             "department_id": program.department_id,
             "duration_years": program.duration_years,
             "total_credits": program.total_credits,
             "is_active": program.is_active,
-            "created_at": program.created_at.isoformat(),
+            "created_at": program.created_at,
             "statistics": program_stats
         }
 
@@ -3533,227 +3496,197 @@ async def get_program_details(
 @app.get("/api/academic/programs/{program_id}/lecturers")
 async def get_program_lecturers(
     program_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
     """Get all lecturers assigned to a specific program"""
-    try:
-        if current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Check if program exists
-        program = db.query(Program).filter(Program.id == program_id).first()
-        if not program:
-            raise HTTPException(status_code=404, detail="Program not found")
-
-        # Get lecturer assignments
-        assignments = db.query(ProgramLecturer).filter(
-            ProgramLecturer.program_id == program_id,
-            ProgramLecturer.is_active == True
-        ).all()
-
-        lecturer_list = []
-        for assignment in assignments:
-            lecturer = assignment.lecturer
-            lecturer_list.append({
-                "id": assignment.id,
-                "lecturer_id": lecturer.id,
-                "lecturer_name": lecturer.name,
-                "lecturer_email": lecturer.email,
-                "role": assignment.role,
-                "assigned_at": assignment.assigned_at.isoformat(),
-                "assigned_by": assignment.assigned_by.name if assignment.assigned_by else "System"
-            })
-
-        return {"lecturers": lecturer_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get program lecturers: {str(e)}")
+    # Check if program exists
+    program = db.query(Program).filter(Program.id == program_id).first()
+    if not program:
+        raise HTTPException(status_code=404, detail="Program not found")
+
+    # Get lecturer assignments
+    assignments = db.query(ProgramLecturer).filter(
+        ProgramLecturer.program_id == program_id,
+        ProgramLecturer.is_active == True
+    ).all()
+
+    lecturer_list = []
+    for assignment in assignments:
+        lecturer = assignment.lecturer
+        lecturer_list.append({
+            "id": assignment.id,
+            "lecturer_id": lecturer.id,
+            "lecturer_name": lecturer.name,
+            "lecturer_email": lecturer.email,
+            "role": assignment.role,
+            "assigned_at": assignment.assigned_at.isoformat(),
+            "assigned_by": assignment.assigned_by.name if assignment.assigned_by else "System"
+        })
+
+    return {"lecturers": lecturer_list}
 
 @app.post("/api/academic/programs/{program_id}/lecturers")
 async def assign_lecturer_to_program(
     program_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Assign a lecturer to a program"""
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        lecturer_id = request.get("lecturer_id")
-        role = request.get("role", "lecturer")
-
-        if not lecturer_id:
-            raise HTTPException(status_code=400, detail="lecturer_id is required")
-
-        # Check if program exists
-        program = db.query(Program).filter(Program.id == program_id).first()
-        if not program:
-            raise HTTPException(status_code=404, detail="Program not found")
-
-        # Check if lecturer exists and is a lecturer
-        lecturer = db.query(User).filter(
-            User.id == lecturer_id,
-            User.role == UserRole.LECTURER
-        ).first()
-        if not lecturer:
-            raise HTTPException(status_code=404, detail="Lecturer not found")
-
-        # Check if assignment already exists (including inactive ones)
-        existing = db.query(ProgramLecturer).filter(
-            ProgramLecturer.program_id == program_id,
-            ProgramLecturer.lecturer_id == lecturer_id
-        ).first()
+    lecturer_id = request.get("lecturer_id")
+    role = request.get("role", "lecturer")
+
+    if not lecturer_id:
+        raise HTTPException(status_code=400, detail="lecturer_id is required")
+
+    # Check if program exists
+    program = db.query(Program).filter(Program.id == program_id).first()
+    if not program:
+        raise HTTPException(status_code=404, detail="Program not found")
+
+    # Check if lecturer exists and is a lecturer
+    lecturer = db.query(User).filter(
+        User.id == lecturer_id,
+        User.role == UserRole.LECTURER
+    ).first()
+    if not lecturer:
+        raise HTTPException(status_code=404, detail="Lecturer not found")
+
+    # Check if assignment already exists (including inactive ones)
+    existing = db.query(ProgramLecturer).filter(
+        ProgramLecturer.program_id == program_id,
+        ProgramLecturer.lecturer_id == lecturer_id
+    ).first()
         
-        if existing:
-            if existing.is_active:
-                raise HTTPException(status_code=400, detail="Lecturer is already assigned to this program")
-            else:
-                # Reactivate existing assignment
-                existing.is_active = True
-                existing.role = role
-                existing.assigned_by_id = current_user.id
-                existing.assigned_at = datetime.now(timezone.utc)
-                db.commit()
+    if existing:
+        if existing.is_active:
+            raise HTTPException(status_code=400, detail="Lecturer is already assigned to this program")
+        else:
+            # Reactivate existing assignment
+            existing.is_active = True
+            existing.role = role
+            existing.assigned_by_id = current_user.id
+            existing.assigned_at = datetime.now(timezone.utc)
+            db.commit()
                 
-                return {
-                    "message": "Lecturer assignment reactivated successfully",
-                    "assignment": {
-                        "id": existing.id,
-                        "lecturer_name": lecturer.name,
-                        "program_name": program.name,
-                        "role": existing.role
-                    }
+            return {
+                "message": "Lecturer assignment reactivated successfully",
+                "assignment": {
+                    "id": existing.id,
+                    "lecturer_name": lecturer.name,
+                    "program_name": program.name,
+                    "role": existing.role
                 }
+            }
 
-        # Create new assignment
-        assignment = ProgramLecturer(
-            program_id=program_id,
-            lecturer_id=lecturer_id,
-            assigned_by_id=current_user.id,
-            role=role
-        )
+    # Create new assignment
+    assignment = ProgramLecturer(
+        program_id=program_id,
+        lecturer_id=lecturer_id,
+        assigned_by_id=current_user.id,
+        role=role
+    )
 
-        db.add(assignment)
-        db.commit()
-        db.refresh(assignment)
+    db.add(assignment)
+    db.commit()
+    db.refresh(assignment)
 
-        return {
-            "message": "Lecturer assigned to program successfully",
-            "assignment": {
-                "id": assignment.id,
-                "lecturer_name": lecturer.name,
-                "program_name": program.name,
-                "role": assignment.role
-            }
+    return {
+        "message": "Lecturer assigned to program successfully",
+        "assignment": {
+            "id": assignment.id,
+            "lecturer_name": lecturer.name,
+            "program_name": program.name,
+            "role": assignment.role
         }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to assign lecturer: {str(e)}")
+    }
 
 @app.put("/api/academic/programs/{program_id}/lecturers/{assignment_id}")
 async def update_lecturer_assignment(
     program_id: int,
     assignment_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Update lecturer assignment details"""
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        assignment = db.query(ProgramLecturer).filter(
-            ProgramLecturer.id == assignment_id,
-            ProgramLecturer.program_id == program_id
-        ).first()
-        if not assignment:
-            raise HTTPException(status_code=404, detail="Assignment not found")
-
-        # Update fields
-        if "role" in request:
-            assignment.role = request["role"]
-        if "is_active" in request:
-            assignment.is_active = request["is_active"]
-
-        db.commit()
-        return {"message": "Assignment updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update assignment: {str(e)}")
+    assignment = db.query(ProgramLecturer).filter(
+        ProgramLecturer.id == assignment_id,
+        ProgramLecturer.program_id == program_id
+    ).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+
+    # Update fields
+    if "role" in request:
+        assignment.role = request["role"]
+    if "is_active" in request:
+        assignment.is_active = request["is_active"]
+
+    db.commit()
+    return {"message": "Assignment updated successfully"}
 
 @app.delete("/api/academic/programs/{program_id}/lecturers/{assignment_id}")
 async def remove_lecturer_from_program(
     program_id: int,
     assignment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Remove lecturer assignment from program"""
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
+    assignment = db.query(ProgramLecturer).filter(
+        ProgramLecturer.id == assignment_id,
+        ProgramLecturer.program_id == program_id
+    ).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
 
-        assignment = db.query(ProgramLecturer).filter(
-            ProgramLecturer.id == assignment_id,
-            ProgramLecturer.program_id == program_id
-        ).first()
-        if not assignment:
-            raise HTTPException(status_code=404, detail="Assignment not found")
+    # Soft delete by setting is_active to False
+    assignment.is_active = False
+    db.commit()
 
-        # Soft delete by setting is_active to False
-        assignment.is_active = False
-        db.commit()
-
-        return {"message": "Lecturer removed from program successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to remove lecturer: {str(e)}")
+    return {"message": "Lecturer removed from program successfully"}
 
 @app.get("/api/academic/lecturers/{lecturer_id}/programs")
 async def get_lecturer_programs_detailed(
     lecturer_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
     """Get all programs assigned to a specific lecturer"""
-    try:
-        if current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Check if lecturer exists
-        lecturer = db.query(User).filter(
-            User.id == lecturer_id,
-            User.role == UserRole.LECTURER
-        ).first()
-        if not lecturer:
-            raise HTTPException(status_code=404, detail="Lecturer not found")
-
-        # Get program assignments
-        assignments = db.query(ProgramLecturer).filter(
-            ProgramLecturer.lecturer_id == lecturer_id,
-            ProgramLecturer.is_active == True
-        ).all()
-
-        program_list = []
-        for assignment in assignments:
-            program = assignment.program
-            program_list.append({
-                "id": program.id,
-                "name": program.name,
-                "code": program.code,
-                "description": program.description,
-                "department": program.department.name,
-                "duration_years": program.duration_years,
-                "total_credits": program.total_credits,
-                "role": assignment.role,
-                "assigned_at": assignment.assigned_at.isoformat()
-            })
+    # Check if lecturer exists
+    lecturer = db.query(User).filter(
+        User.id == lecturer_id,
+        User.role == UserRole.LECTURER
+    ).first()
+    if not lecturer:
+        raise HTTPException(status_code=404, detail="Lecturer not found")
+
+    # Get program assignments, with each program and its department in the same query
+    assignments = db.query(ProgramLecturer).options(
+        joinedload(ProgramLecturer.program).joinedload(Program.department)
+    ).filter(
+        ProgramLecturer.lecturer_id == lecturer_id,
+        ProgramLecturer.is_active == True
+    ).all()
+
+    program_list = []
+    for assignment in assignments:
+        program = assignment.program
+        program_list.append({
+            "id": program.id,
+            "name": program.name,
+            "code": program.code,
+            "description": program.description,
+            "department": program.department.name,
+            "duration_years": program.duration_years,
+            "total_credits": program.total_credits,
+            "role": assignment.role,
+            "assigned_at": assignment.assigned_at
+        })
 
-        return {"programs": program_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get lecturer programs: {str(e)}")
+    return {"programs": program_list}
 
 # ============================================================================
 
@@ -3761,68 +3694,72 @@ async def get_lecturer_programs_detailed(
 # Course-specific endpoints for assignments and submissions
 # ============================================================================
 
+def _course_assignment_list(db: Session, course_id: int) -> List[Dict[str, Any]]:
+    # Get assignments for this course
+    assignments = db.query(Assignment).filter(
+        Assignment.course_id == course_id
+    ).order_by(Assignment.due_date.desc()).all()
+
+    # Common for new courses; nothing to count
+    if not assignments:
+        return []
+
+    # Submission and graded counts for every assignment in one grouped query
+    # (COUNT(grade) skips NULLs, i.e. ungraded submissions)
+    counts = {
+        assignment_id: (total, graded)
+        for assignment_id, total, graded in db.query(
+            AssignmentSubmission.assignment_id,
+            func.count(AssignmentSubmission.id),
+            func.count(AssignmentSubmission.grade)
+        ).filter(
+            AssignmentSubmission.assignment_id.in_([assignment.id for assignment in assignments])
+        ).group_by(AssignmentSubmission.assignment_id).all()
+    }
+
+    assignment_list = []
+    for assignment in assignments:
+        submission_count, graded_count = counts.get(assignment.id, (0, 0))
+
+        assignment_list.append({
+            "id": assignment.id,
+            "title": assignment.title,
+            "description": assignment.description,
+            "due_date": assignment.due_date,
+            "max_points": assignment.max_points,
+            "assignment_type": assignment.assignment_type,
+            "is_published": assignment.is_published,
+            "submission_count": submission_count,
+            "graded_count": graded_count,
+            "created_at": assignment.created_at
+        })
+    return assignment_list
+
 @app.get("/api/courses/{course_id}/assignments")
 async def get_course_assignments(
     course_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check permissions
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        has_access = False
-        if current_user.role == UserRole.ADMIN:
-            has_access = True
-        elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
-            has_access = True
-        elif current_user.role == UserRole.STUDENT:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.student_id == current_user.id,
-                Enrollment.course_id == course_id,
-                Enrollment.status == EnrollmentStatus.ENROLLED
-            ).first()
-            has_access = enrollment is not None
-
-        if not has_access:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Get assignments for this course
-        assignments = db.query(Assignment).filter(
-            Assignment.course_id == course_id
-        ).order_by(Assignment.due_date.desc()).all()
-
-        assignment_list = []
-        for assignment in assignments:
-            # Count submissions
-            submission_count = db.query(AssignmentSubmission).filter(
-                AssignmentSubmission.assignment_id == assignment.id
-            ).count()
-
-            # Count graded submissions
-            graded_count = db.query(AssignmentSubmission).filter(
-                AssignmentSubmission.assignment_id == assignment.id,
-                AssignmentSubmission.grade.isnot(None)
-            ).count()
-
-            assignment_list.append({
-                "id": assignment.id,
-                "title": assignment.title,
-                "description": assignment.description,
-                "due_date": assignment.due_date.isoformat(),
-                "max_points": assignment.max_points,
-                "assignment_type": assignment.assignment_type,
-                "is_published": assignment.is_published,
-                "submission_count": submission_count,
-                "graded_count": graded_count,
-                "created_at": assignment.created_at.isoformat()
-            })
-
-        return {"assignments": assignment_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get course assignments: {str(e)}")
+    # Check permissions
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    has_access = False
+    if current_user.role == UserRole.ADMIN:
+        has_access = True
+    elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
+        has_access = True
+    elif current_user.role == UserRole.STUDENT:
+        has_access = _is_enrolled(db, current_user.id, course_id)
+
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # The list is the same for everyone with access, so it can be shared per course
+    assignment_list = cached_lookup("assignments", course_id, lambda: _course_assignment_list(db, course_id))
+    return {"assignments": assignment_list}
 
 @app.get("/api/courses/{course_id}/submissions")
 async def get_course_submissions(
@@ -3830,60 +3767,50 @@ async def get_course_submissions(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Check permissions
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        has_access = False
-        if current_user.role == UserRole.ADMIN:
-            has_access = True
-        elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
-            has_access = True
-        elif current_user.role == UserRole.STUDENT:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.student_id == current_user.id,
-                Enrollment.course_id == course_id,
-                Enrollment.status == EnrollmentStatus.ENROLLED
-            ).first()
-            has_access = enrollment is not None
-
-        if not has_access:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Get all assignments for this course
-        assignments = db.query(Assignment).filter(
-            Assignment.course_id == course_id
-        ).all()
-
-        assignment_ids = [assignment.id for assignment in assignments]
-
-        # Get all submissions for these assignments
-        submissions = db.query(AssignmentSubmission).filter(
-            AssignmentSubmission.assignment_id.in_(assignment_ids)
-        ).all()
-
-        submission_list = []
-        for submission in submissions:
-            assignment = submission.assignment
-            student = submission.student
+    # Check permissions
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    has_access = False
+    if current_user.role == UserRole.ADMIN:
+        has_access = True
+    elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
+        has_access = True
+    elif current_user.role == UserRole.STUDENT:
+        has_access = _is_enrolled(db, current_user.id, course_id)
+
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Get all submissions for this course's assignments; student and assignment are
+    # read for every row, so load them in the same statement (the assignment from the
+    # join used for filtering)
+    submissions = db.query(AssignmentSubmission).join(AssignmentSubmission.assignment).options(
+        joinedload(AssignmentSubmission.student),
+        contains_eager(AssignmentSubmission.assignment)
+    ).filter(
+        Assignment.course_id == course_id
+    ).all()
+
+    submission_list = []
+    for submission in submissions:
+        assignment = submission.assignment
+        student = submission.student
             
-            submission_list.append({
-                "id": submission.id,
-                "student_name": student.name,
-                "student_email": student.email,
-                "assignment_title": assignment.title,
-                "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
-                "grade": submission.grade,
-                "feedback": submission.feedback,
-                "is_late": submission.is_late,
-                "file_name": submission.file_name
-            })
+        submission_list.append({
+            "id": submission.id,
+            "student_name": student.name,
+            "student_email": student.email,
+            "assignment_title": assignment.title,
+            "submitted_at": submission.submitted_at,
+            "grade": submission.grade,
+            "feedback": submission.feedback,
+            "is_late": submission.is_late,
+            "file_name": submission.file_name
+        })
 
-        return {"submissions": submission_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get course submissions: {str(e)}")
+    return {"submissions": submission_list}
 
 # ============================================================================
 
@@ -3891,29 +3818,22 @@ async def get_course_submissions(
 async def update_course_content(
     course_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    try:
-        # Only allow admins to update course content
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
 
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        # Update course content
-        course_content = request.get("course_content", {})
+    # Update course content
+    course_content = request.get("course_content", {})
         
-        # Store content as JSON in the syllabus field (or create a new field)
-        # For now, we'll use the syllabus field to store the rich content
-        course.syllabus = json.dumps(course_content)
+    # Store content as JSON in the syllabus field (or create a new field)
+    # For now, we'll use the syllabus field to store the rich content
+    course.syllabus = json.dumps(course_content)
 
-        db.commit()
-        return {"message": "Course content updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update course content: {str(e)}")
+    db.commit()
+    return {"message": "Course content updated successfully"}
 
 # ============================================================================
 # Program Course Allocation Management
@@ -3922,197 +3842,167 @@ async def update_course_content(
 @app.get("/api/academic/programs/{program_id}/courses")
 async def get_program_courses(
     program_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_staff),
     db: Session = Depends(get_db)
 ):
     """Get all courses allocated to a specific program"""
-    try:
-        if current_user.role not in [UserRole.ADMIN, UserRole.LECTURER]:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Check if program exists
-        program = db.query(Program).filter(Program.id == program_id).first()
-        if not program:
-            raise HTTPException(status_code=404, detail="Program not found")
-
-        # Get actual course allocations from ProgramCourse table
-        allocations = db.query(ProgramCourse).filter(
-            ProgramCourse.program_id == program_id,
-            ProgramCourse.is_active == True
-        ).all()
-
-        course_list = []
-        for allocation in allocations:
-            course = allocation.course
-            course_list.append({
-                "id": allocation.id,
-                "course_id": course.id,
-                "program_id": program_id,
-                "course_name": course.name,
-                "course_code": course.code,
-                "credits": course.credits,
-                "allocated_at": allocation.allocated_at.isoformat(),
-                "is_required": allocation.is_required,
-                "semester_order": allocation.semester_order
-            })
+    # Check if program exists
+    program = db.query(Program).filter(Program.id == program_id).first()
+    if not program:
+        raise HTTPException(status_code=404, detail="Program not found")
+
+    # Get actual course allocations from ProgramCourse table
+    allocations = db.query(ProgramCourse).filter(
+        ProgramCourse.program_id == program_id,
+        ProgramCourse.is_active == True
+    ).all()
+
+    course_list = []
+    for allocation in allocations:
+        course = allocation.course
+        course_list.append({
+            "id": allocation.id,
+            "course_id": course.id,
+            "program_id": program_id,
+            "course_name": course.name,
+            "course_code": course.code,
+            "credits": course.credits,
+            "allocated_at": allocation.allocated_at.isoformat(),
+            "is_required": allocation.is_required,
+            "semester_order": allocation.semester_order
+        })
 
-        return {"courses": course_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get program courses: {str(e)}")
+    return {"courses": course_list}
 
 @app.post("/api/academic/programs/{program_id}/courses")
 async def allocate_course_to_program(
     program_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Allocate a course to a program"""
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        course_id = request.get("course_id")
-        is_required = request.get("is_required", True)
-        semester_order = request.get("semester_order", 1)
-
-        if not course_id:
-            raise HTTPException(status_code=400, detail="course_id is required")
-
-        # Check if program exists
-        program = db.query(Program).filter(Program.id == program_id).first()
-        if not program:
-            raise HTTPException(status_code=404, detail="Program not found")
-
-        # Check if course exists
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        # Check if course is already allocated to this program (including inactive ones)
-        existing_allocation = db.query(ProgramCourse).filter(
-            ProgramCourse.program_id == program_id,
-            ProgramCourse.course_id == course_id
-        ).first()
+    course_id = request.get("course_id")
+    is_required = request.get("is_required", True)
+    semester_order = request.get("semester_order", 1)
+
+    if not course_id:
+        raise HTTPException(status_code=400, detail="course_id is required")
+
+    # Check if program exists
+    program = db.query(Program).filter(Program.id == program_id).first()
+    if not program:
+        raise HTTPException(status_code=404, detail="Program not found")
+
+    # Check if course exists
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    # Check if course is already allocated to this program (including inactive ones)
+    existing_allocation = db.query(ProgramCourse).filter(
+        ProgramCourse.program_id == program_id,
+        ProgramCourse.course_id == course_id
+    ).first()
         
-        if existing_allocation:
-            if existing_allocation.is_active:
-                raise HTTPException(status_code=400, detail="Course is already allocated to this program")
-            else:
-                # Reactivate existing allocation
-                existing_allocation.is_active = True
-                existing_allocation.is_required = is_required
-                existing_allocation.semester_order = semester_order
-                existing_allocation.allocated_by_id = current_user.id
-                existing_allocation.allocated_at = datetime.now(timezone.utc)
-                db.commit()
+    if existing_allocation:
+        if existing_allocation.is_active:
+            raise HTTPException(status_code=400, detail="Course is already allocated to this program")
+        else:
+            # Reactivate existing allocation
+            existing_allocation.is_active = True
+            existing_allocation.is_required = is_required
+            existing_allocation.semester_order = semester_order
+            existing_allocation.allocated_by_id = current_user.id
+            existing_allocation.allocated_at = datetime.now(timezone.utc)
+            db.commit()
                 
-                return {
-                    "message": "Course allocation reactivated successfully",
-                    "allocation": {
-                        "id": existing_allocation.id,
-                        "course_id": course_id,
-                        "program_id": program_id,
-                        "course_name": course.name,
-                        "is_required": is_required,
-                        "semester_order": semester_order
-                    }
+            return {
+                "message": "Course allocation reactivated successfully",
+                "allocation": {
+                    "id": existing_allocation.id,
+                    "course_id": course_id,
+                    "program_id": program_id,
+                    "course_name": course.name,
+                    "is_required": is_required,
+                    "semester_order": semester_order
                 }
+            }
 
-        # Create new allocation
-        allocation = ProgramCourse(
-            program_id=program_id,
-            course_id=course_id,
-            is_required=is_required,
-            semester_order=semester_order,
-            allocated_by_id=current_user.id
-        )
+    # Create new allocation
+    allocation = ProgramCourse(
+        program_id=program_id,
+        course_id=course_id,
+        is_required=is_required,
+        semester_order=semester_order,
+        allocated_by_id=current_user.id
+    )
 
-        db.add(allocation)
-        db.commit()
-        db.refresh(allocation)
+    db.add(allocation)
+    db.commit()
+    db.refresh(allocation)
 
-        return {
-            "message": "Course allocated to program successfully",
-            "allocation": {
-                "id": allocation.id,
-                "course_id": course_id,
-                "program_id": program_id,
-                "course_name": course.name,
-                "is_required": is_required,
-                "semester_order": semester_order
-            }
+    return {
+        "message": "Course allocated to program successfully",
+        "allocation": {
+            "id": allocation.id,
+            "course_id": course_id,
+            "program_id": program_id,
+            "course_name": course.name,
+            "is_required": is_required,
+            "semester_order": semester_order
         }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to allocate course: {str(e)}")
+    }
 
 @app.put("/api/academic/programs/{program_id}/courses/{allocation_id}")
 async def update_course_allocation(
     program_id: int,
     allocation_id: int,
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Update course allocation details"""
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Check if allocation exists
-        allocation = db.query(ProgramCourse).filter(
-            ProgramCourse.id == allocation_id,
-            ProgramCourse.program_id == program_id
-        ).first()
-        if not allocation:
-            raise HTTPException(status_code=404, detail="Course allocation not found")
-
-        # Update fields
-        if "is_required" in request:
-            allocation.is_required = request["is_required"]
-        if "semester_order" in request:
-            allocation.semester_order = request["semester_order"]
-        if "is_active" in request:
-            allocation.is_active = request["is_active"]
-
-        db.commit()
-        return {"message": "Course allocation updated successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update course allocation: {str(e)}")
+    # Check if allocation exists
+    allocation = db.query(ProgramCourse).filter(
+        ProgramCourse.id == allocation_id,
+        ProgramCourse.program_id == program_id
+    ).first()
+    if not allocation:
+        raise HTTPException(status_code=404, detail="Course allocation not found")
+
+    # Update fields
+    if "is_required" in request:
+        allocation.is_required = request["is_required"]
+    if "semester_order" in request:
+        allocation.semester_order = request["semester_order"]
+    if "is_active" in request:
+        allocation.is_active = request["is_active"]
+
+    db.commit()
+    return {"message": "Course allocation updated successfully"}
 
 @app.delete("/api/academic/programs/{program_id}/courses/{allocation_id}")
 async def remove_course_allocation(
     program_id: int,
     allocation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Remove course allocation from program"""
-    try:
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
+    # Check if allocation exists
+    allocation = db.query(ProgramCourse).filter(
+        ProgramCourse.id == allocation_id,
+        ProgramCourse.program_id == program_id
+    ).first()
+    if not allocation:
+        raise HTTPException(status_code=404, detail="Course allocation not found")
 
-        # Check if allocation exists
-        allocation = db.query(ProgramCourse).filter(
-            ProgramCourse.id == allocation_id,
-            ProgramCourse.program_id == program_id
-        ).first()
-        if not allocation:
-            raise HTTPException(status_code=404, detail="Course allocation not found")
+    # Soft delete by setting is_active to False
+    allocation.is_active = False
+    db.commit()
 
-        # Soft delete by setting is_active to False
-        allocation.is_active = False
-        db.commit()
-
-        return {"message": "Course allocation removed successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to remove course allocation: {str(e)}")
+    return {"message": "Course allocation removed successfully"}
 
 @app.get("/api/materials/{material_id}/stream")
 async def stream_material(
@@ -4122,263 +4012,231 @@ async def stream_material(
     db: Session = Depends(get_db)
 ):
     """Stream material file for video playback with range request support"""
-    try:
-        material = db.query(CourseMaterial).filter(CourseMaterial.id == material_id).first()
-        if not material:
-            raise HTTPException(status_code=404, detail="Material not found")
-
-        # Check access permissions (same as get_course_materials)
-        course = material.course
-        has_access = False
-        if current_user.role == UserRole.ADMIN:
-            has_access = True
-        elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
-            has_access = True
-        elif current_user.role == UserRole.STUDENT:
-            enrollment = db.query(Enrollment).filter(
-                Enrollment.student_id == current_user.id,
-                Enrollment.course_id == course.id,
-                Enrollment.status == EnrollmentStatus.ENROLLED
-            ).first()
-            has_access = enrollment is not None
-
-        if not has_access:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        # Return file for streaming with range request support
-        if os.path.exists(material.file_path):
-            file_size = os.path.getsize(material.file_path)
+    material = db.query(CourseMaterial).filter(CourseMaterial.id == material_id).first()
+    if not material:
+        raise HTTPException(status_code=404, detail="Material not found")
+
+    # Check access permissions (same as get_course_materials)
+    course = material.course
+    has_access = False
+    if current_user.role == UserRole.ADMIN:
+        has_access = True
+    elif current_user.role == UserRole.LECTURER and course.lecturer_id == current_user.id:
+        has_access = True
+    elif current_user.role == UserRole.STUDENT:
+        has_access = _is_enrolled(db, current_user.id, course.id)
+
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Return file for streaming with range request support
+    if os.path.exists(material.file_path):
+        file_size = os.path.getsize(material.file_path)
             
-            # Handle range requests for video streaming
-            range_header = request.headers.get('range')
-            if range_header:
-                try:
-                    # Parse range header (e.g., "bytes=0-1023")
-                    range_match = re.match(r'bytes=(\d+)-(\d*)', range_header)
-                    if range_match:
-                        start = int(range_match.group(1))
-                        end = int(range_match.group(2)) if range_match.group(2) else file_size - 1
+        # Handle range requests for video streaming
+        range_header = request.headers.get('range')
+        if range_header:
+            try:
+                # Parse range header (e.g., "bytes=0-1023")
+                range_match = re.match(r'bytes=(\d+)-(\d*)', range_header)
+                if range_match:
+                    start = int(range_match.group(1))
+                    end = int(range_match.group(2)) if range_match.group(2) else file_size - 1
                         
-                        if start >= file_size:
-                            raise HTTPException(status_code=416, detail="Range not satisfiable")
+                    if start >= file_size:
+                        raise HTTPException(status_code=416, detail="Range not satisfiable")
                         
-                        # Read the requested range
-                        with open(material.file_path, 'rb') as f:
-                            f.seek(start)
-                            data = f.read(end - start + 1)
+                    # Read the requested range
+                    with open(material.file_path, 'rb') as f:
+                        f.seek(start)
+                        data = f.read(end - start + 1)
                         
-                        # Return partial content response
-                        headers = {
-                            'Content-Range': f'bytes {start}-{end}/{file_size}',
-                            'Accept-Ranges': 'bytes',
-                            'Content-Length': str(len(data)),
-                            'Content-Type': material.file_type,
-                        }
+                    # Return partial content response
+                    headers = {
+                        'Content-Range': f'bytes {start}-{end}/{file_size}',
+                        'Accept-Ranges': 'bytes',
+                        'Content-Length': str(len(data)),
+                        'Content-Type': material.file_type,
+                    }
                         
-                        return Response(
-                            content=data,
-                            status_code=206,
-                            headers=headers
-                        )
-                except (ValueError, IndexError):
-                    pass
+                    return Response(
+                        content=data,
+                        status_code=206,
+                        headers=headers
+                    )
+            except (ValueError, IndexError):
+                pass
             
-            # Return full file if no range request or invalid range
-            return FileResponse(
-                path=material.file_path,
-                filename=material.file_name,
-                media_type=material.file_type,
-                headers={'Accept-Ranges': 'bytes'}
-            )
-        else:
-            raise HTTPException(status_code=404, detail="File not found")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to stream material: {str(e)}")
+        # Return full file if no range request or invalid range
+        return FileResponse(
+            path=material.file_path,
+            filename=material.file_name,
+            media_type=material.file_type,
+            headers={'Accept-Ranges': 'bytes'}
+        )
+    else:
+        raise HTTPException(status_code=404, detail="File not found")
 
 @app.get("/api/debug/enrollments")
 async def debug_enrollments(
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Debug endpoint to check enrollment data"""
-    try:
-        # Check if user is admin
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Get all enrollments
-        all_enrollments = db.query(Enrollment).all()
-        
-        # Get all students
-        all_students = db.query(User).filter(User.role == UserRole.STUDENT).all()
-        
-        # Get all courses
-        all_courses = db.query(Course).all()
-        
-        # Get all programs
-        all_programs = db.query(Program).all()
-        
-        # Get all semesters
-        all_semesters = db.query(Semester).all()
-        
-        debug_data = {
-            "total_enrollments": len(all_enrollments),
-            "total_students": len(all_students),
-            "total_courses": len(all_courses),
-            "total_programs": len(all_programs),
-            "total_semesters": len(all_semesters),
-            "enrollments": [
-                {
-                    "id": e.id,
-                    "student_id": e.student_id,
-                    "course_id": e.course_id,
-                    "program_id": e.program_id,
-                    "status": e.status.value,
-                    "enrollment_date": e.enrollment_date.isoformat(),
-                    "is_active": e.is_active
-                }
-                for e in all_enrollments
-            ],
-            "students": [
-                {
-                    "id": s.id,
-                    "name": s.name,
-                    "email": s.email,
-                    "role": s.role.value
-                }
-                for s in all_students
-            ],
-            "courses": [
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "code": c.code,
-                    "semester_id": c.semester_id,
-                    "lecturer_id": c.lecturer_id
-                }
-                for c in all_courses
-            ]
-        }
-        
-        return debug_data
-    except Exception as e:
-        logger.error(f"Debug endpoint error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Debug error: {str(e)}")
+    # Get all enrollments
+    all_enrollments = db.query(Enrollment).all()
+    
+    # Get all students
+    all_students = db.query(User).filter(User.role == UserRole.STUDENT).all()
+    
+    # Get all courses
+    all_courses = db.query(Course).all()
+    
+    # Get all programs
+    all_programs = db.query(Program).all()
+    
+    # Get all semesters
+    all_semesters = db.query(Semester).all()
+    
+    debug_data = {
+        "total_enrollments": len(all_enrollments),
+        "total_students": len(all_students),
+        "total_courses": len(all_courses),
+        "total_programs": len(all_programs),
+        "total_semesters": len(all_semesters),
+        "enrollments": [
+            {
+                "id": e.id,
+                "student_id": e.student_id,
+                "course_id": e.course_id,
+                "program_id": e.program_id,
+                "status": e.status.value,
+                "enrollment_date": e.enrollment_date.isoformat(),
+                "is_active": e.is_active
+            }
+            for e in all_enrollments
+        ],
+        "students": [
+            {
+                "id": s.id,
+                "name": s.name,
+                "email": s.email,
+                "role": s.role.value
+            }
+            for s in all_students
+        ],
+        "courses": [
+            {
+                "id": c.id,
+                "name": c.name,
+                "code": c.code,
+                "semester_id": c.semester_id,
+                "lecturer_id": c.lecturer_id
+            }
+            for c in all_courses
+        ]
+    }
+    
+    return debug_data
 
 @app.get("/api/debug/course-materials/{course_id}")
 async def debug_course_materials(
     course_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Debug endpoint to check course materials and file paths"""
-    try:
-        # Check if user is admin
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Get course
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            return {"error": "Course not found"}
-        
-        # Get all materials for this course
-        materials = db.query(CourseMaterial).filter(
-            CourseMaterial.course_id == course_id,
-            CourseMaterial.is_active == True
-        ).all()
+    # Get course
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        return {"error": "Course not found"}
+    
+    # Get all materials for this course
+    materials = db.query(CourseMaterial).filter(
+        CourseMaterial.course_id == course_id,
+        CourseMaterial.is_active == True
+    ).all()
+    
+    debug_data = {
+        "course": {
+            "id": course.id,
+            "name": course.name,
+            "code": course.code,
+            "lecturer_id": course.lecturer_id
+        },
+        "total_materials": len(materials),
+        "video_materials": [],
+        "document_materials": [],
+        "file_paths_exist": {}
+    }
+    
+    for material in materials:
+        file_exists = os.path.exists(material.file_path) if material.file_path else False
+        file_size = os.path.getsize(material.file_path) if file_exists else 0
         
-        debug_data = {
-            "course": {
-                "id": course.id,
-                "name": course.name,
-                "code": course.code,
-                "lecturer_id": course.lecturer_id
-            },
-            "total_materials": len(materials),
-            "video_materials": [],
-            "document_materials": [],
-            "file_paths_exist": {}
+        material_data = {
+            "id": material.id,
+            "title": material.title,
+            "material_type": material.material_type,
+            "file_name": material.file_name,
+            "file_path": material.file_path,
+            "file_exists": file_exists,
+            "file_size": file_size,
+            "file_type": material.file_type,
+            "uploaded_at": material.created_at.isoformat(),
+            "uploaded_by": material.uploaded_by.name if material.uploaded_by else "Unknown"
         }
         
-        for material in materials:
-            file_exists = os.path.exists(material.file_path) if material.file_path else False
-            file_size = os.path.getsize(material.file_path) if file_exists else 0
-            
-            material_data = {
-                "id": material.id,
-                "title": material.title,
-                "material_type": material.material_type,
-                "file_name": material.file_name,
-                "file_path": material.file_path,
-                "file_exists": file_exists,
-                "file_size": file_size,
-                "file_type": material.file_type,
-                "uploaded_at": material.created_at.isoformat(),
-                "uploaded_by": material.uploaded_by.name if material.uploaded_by else "Unknown"
-            }
-            
-            if material.material_type == "video":
-                debug_data["video_materials"].append(material_data)
-            else:
-                debug_data["document_materials"].append(material_data)
-            
-            debug_data["file_paths_exist"][material.id] = file_exists
+        if material.material_type == "video":
+            debug_data["video_materials"].append(material_data)
+        else:
+            debug_data["document_materials"].append(material_data)
         
-        return debug_data
-    except Exception as e:
-        logger.error(f"Debug course materials error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Debug error: {str(e)}")
+        debug_data["file_paths_exist"][material.id] = file_exists
+    
+    return debug_data
 
 @app.post("/api/test/create-sample-video/{course_id}")
 async def create_sample_video(
     course_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Create a sample video material for testing"""
-    try:
-        # Check if user is admin
-        if current_user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Check if course exists
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-        
-        # Create a sample video file path (this would normally be uploaded)
-        sample_video_path = "uploads/videos/sample_video.mp4"
-        
-        # Create the uploads/videos directory if it doesn't exist
-        os.makedirs("uploads/videos", exist_ok=True)
-        
-        # Create a sample video material record
-        material = CourseMaterial(
-            course_id=course_id,
-            title="Sample Video for Testing",
-            description="This is a sample video material created for testing the video player functionality.",
-            file_name="sample_video.mp4",
-            file_path=sample_video_path,
-            file_size=1024 * 1024,  # 1MB placeholder
-            file_type="video/mp4",
-            material_type="video",
-            uploaded_by_id=current_user.id
-        )
-        
-        db.add(material)
-        db.commit()
-        db.refresh(material)
-        
-        return {
-            "message": "Sample video material created successfully",
-            "material_id": material.id,
-            "file_path": material.file_path,
-            "note": "This is a placeholder. You need to upload an actual video file to test playback."
-        }
-    except Exception as e:
-        logger.error(f"Create sample video error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    # Check if course exists
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    # Create a sample video file path (this would normally be uploaded)
+    sample_video_path = "uploads/videos/sample_video.mp4"
+    
+    # Create the uploads/videos directory if it doesn't exist
+    os.makedirs("uploads/videos", exist_ok=True)
+    
+    # Create a sample video material record
+    material = CourseMaterial(
+        course_id=course_id,
+        title="Sample Video for Testing",
+        description="This is a sample video material created for testing the video player functionality.",
+        file_name="sample_video.mp4",
+        file_path=sample_video_path,
+        file_size=1024 * 1024,  # 1MB placeholder
+        file_type="video/mp4",
+        material_type="video",
+        uploaded_by_id=current_user.id
+    )
+    
+    db.add(material)
+    db.commit()
+    db.refresh(material)
+    
+    return {
+        "message": "Sample video material created successfully",
+        "material_id": material.id,
+        "file_path": material.file_path,
+        "note": "This is a placeholder. You need to upload an actual video file to test playback."
+    }
 
 # ============================================================================
 # Predefined Users for Portfolio Demo
@@ -4613,14 +4471,26 @@ async def create_discussion_reply(discussion_id: int, request: dict):
     return {"reply": {"id": 999, **request}, "message": "Reply created successfully"}
 
 if __name__ == "__main__":
-    # Database is initialized automatically in initialize_fresh_database()
-    # No need for additional seeding here
+    # Database is initialized in the lifespan handler (set SEED_ON_START=0 to skip seeding)
+
+    # WEB_CONCURRENCY follows the uvicorn/gunicorn convention; default is 2 * cores + 1.
+    # Startup init is only serialized across workers on PostgreSQL (advisory lock in the
+    # lifespan handler); on SQLite the workers would race create_all and the seeder.
+    reload = os.getenv("RELOAD", "1") == "1"
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+    if engine.dialect.name != "postgresql":
+        workers = 1
 
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=reload,
+        workers=1 if reload else workers,  # Reload mode only supports a single process
+        loop="auto",  # uvloop when installed (not on Windows), asyncio otherwise
+        http="httptools",
+        proxy_headers=True,
+        limit_concurrency=1000
     )
 
 
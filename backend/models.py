@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float, Enum, func, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float, Enum, func, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime, timezone
 import enum
@@ -62,6 +62,7 @@ class User(Base):
     student_enrollments = relationship("Enrollment", foreign_keys="Enrollment.student_id", back_populates="student")
     lecturer_courses = relationship("Course", back_populates="lecturer")
     program_assignments = relationship("ProgramLecturer", foreign_keys="ProgramLecturer.lecturer_id", back_populates="lecturer")
+    department = relationship("Department", foreign_keys=[department_id], back_populates="lecturers")
 
     notifications = relationship("Notification", back_populates="user")
 
@@ -279,7 +280,7 @@ class Department(Base):
     # Relationships
     programs = relationship("Program", back_populates="department")
     courses = relationship("Course", back_populates="department")
-    lecturers = relationship("User", foreign_keys="User.department_id", backref="department")
+    lecturers = relationship("User", foreign_keys="User.department_id", back_populates="department")
 
 class Program(Base):
     __tablename__ = "programs"
@@ -301,6 +302,11 @@ class Program(Base):
     lecturer_assignments = relationship("ProgramLecturer", back_populates="program")
     course_allocations = relationship("ProgramCourse", back_populates="program")
 
+    # Indexes for efficient queries
+    __table_args__ = (
+        Index('ix_programs_department_code', 'department_id', 'code'),
+    )
+
 class Semester(Base):
     __tablename__ = "semesters"
 
@@ -348,6 +354,11 @@ class Course(Base):
     quizzes = relationship("Quiz", back_populates="course")
     program_allocations = relationship("ProgramCourse", back_populates="course")
 
+    # Indexes for efficient queries
+    __table_args__ = (
+        Index('ix_courses_department_active', 'department_id', 'is_active'),
+    )
+
 class Enrollment(Base):
     __tablename__ = "enrollments"
 
@@ -374,6 +385,7 @@ class Assignment(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
+    instructions = Column(Text, nullable=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     due_date = Column(DateTime, nullable=False)
     max_points = Column(Float, nullable=False, default=100.0)
@@ -602,6 +614,8 @@ class ProgramLecturer(Base):
     # Unique constraint to prevent duplicate assignments
     __table_args__ = (
         UniqueConstraint('program_id', 'lecturer_id', name='unique_program_lecturer'),
+        # The unique constraint covers program-first lookups; this one serves lecturer-first ones
+        Index('ix_program_lecturers_lecturer_active', 'lecturer_id', 'is_active'),
     )
 
 class ProgramCourse(Base):
@@ -624,4 +638,5 @@ class ProgramCourse(Base):
     # Unique constraint to prevent duplicate allocations
     __table_args__ = (
         UniqueConstraint('program_id', 'course_id', name='unique_program_course'),
+        Index('ix_program_courses_course', 'course_id'),
     )
@@ -4,8 +4,8 @@ Handles academic operations like departments, programs, courses, enrollments
 """
 
 from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, and_, or_, insert
 from datetime import datetime, timezone
 
 from models import (
@@ -95,7 +95,7 @@ class AcademicService:
 
     def update_department(self, db: Session, department_id: int, data: dict) -> Dict[str, Any]:
         """Update an existing department"""
-        department = db.query(Department).filter(Department.id == department_id).first()
+        department = db.get(Department, department_id)
         if not department:
             raise ValueError("Department not found")
 
@@ -133,7 +133,7 @@ class AcademicService:
 
     def can_delete_department(self, db: Session, department_id: int) -> Dict[str, Any]:
         """Check if a department can be safely deleted"""
-        department = db.query(Department).filter(Department.id == department_id).first()
+        department = db.get(Department, department_id)
         if not department:
             return {"can_delete": False, "reason": "Department not found"}
 
@@ -160,7 +160,7 @@ class AcademicService:
 
     def delete_department(self, db: Session, department_id: int, force: bool = False) -> None:
         """Delete a department (soft delete by setting is_active to False)"""
-        department = db.query(Department).filter(Department.id == department_id).first()
+        department = db.get(Department, department_id)
         if not department:
             raise ValueError("Department not found")
 
@@ -201,7 +201,7 @@ class AcademicService:
 
     def get_department_details(self, db: Session, department_id: int) -> Dict[str, Any]:
         """Get detailed department information including lecturers"""
-        department = db.query(Department).filter(Department.id == department_id).first()
+        department = db.get(Department, department_id)
         if not department:
             raise ValueError("Department not found")
 
@@ -269,7 +269,7 @@ class AcademicService:
         if not lecturer:
             raise ValueError("Lecturer not found")
 
-        department = db.query(Department).filter(Department.id == department_id).first()
+        department = db.get(Department, department_id)
         if not department:
             raise ValueError("Department not found")
 
@@ -378,7 +378,7 @@ class AcademicService:
 
     def update_program(self, db: Session, program_id: int, data: dict) -> Dict[str, Any]:
         """Update an existing program"""
-        program = db.query(Program).filter(Program.id == program_id).first()
+        program = db.get(Program, program_id)
         if not program:
             raise ValueError("Program not found")
 
@@ -453,7 +453,7 @@ class AcademicService:
 
     def delete_program(self, db: Session, program_id: int, force: bool = False) -> None:
         """Delete a program (soft delete by setting is_active to False)"""
-        program = db.query(Program).filter(Program.id == program_id).first()
+        program = db.get(Program, program_id)
         if not program:
             raise ValueError("Program not found")
 
@@ -467,11 +467,11 @@ class AcademicService:
             if active_enrollments > 0:
                 raise ValueError("Cannot delete program with active enrollments")
         else:
-            # Force delete: deactivate all enrollments in this program
-            enrollments = db.query(Enrollment).filter(Enrollment.program_id == program_id).all()
-            for enrollment in enrollments:
-                enrollment.status = EnrollmentStatus.DROPPED
-                enrollment.is_active = False
+            # Force delete: deactivate all enrollments in this program with one UPDATE
+            db.query(Enrollment).filter(Enrollment.program_id == program_id).update(
+                {Enrollment.status: EnrollmentStatus.DROPPED, Enrollment.is_active: False},
+                synchronize_session=False
+            )
 
         program.is_active = False
         db.commit()
@@ -519,7 +519,7 @@ class AcademicService:
 
     def get_course_details(self, db: Session, course_id: int, user_id: int = None) -> Dict[str, Any]:
         """Get detailed course information"""
-        course = db.query(Course).filter(Course.id == course_id).first()
+        course = db.get(Course, course_id)
         if not course:
             raise ValueError("Course not found")
 
@@ -574,15 +574,15 @@ class AcademicService:
     def enroll_student(self, db: Session, student_id: int, course_id: int, program_id: int) -> Dict[str, Any]:
         """Enroll a student in a course"""
         # Check if student is already enrolled
-        existing_enrollment = db.query(Enrollment).filter(
+        existing_enrollment = db.query(Enrollment.id).filter(
             and_(Enrollment.student_id == student_id, Enrollment.course_id == course_id)
-        ).first()
+        ).limit(1).scalar()
 
-        if existing_enrollment:
+        if existing_enrollment is not None:
             raise ValueError("Student is already enrolled in this course")
 
         # Check course capacity
-        course = db.query(Course).filter(Course.id == course_id).first()
+        course = db.get(Course, course_id)
         if not course:
             raise ValueError("Course not found")
 
@@ -610,19 +610,109 @@ class AcademicService:
             "enrollment_date": enrollment.enrollment_date.isoformat()
         }
 
+    def bulk_enroll_students(self, db: Session, rows: List[Dict[str, int]]) -> Dict[str, Any]:
+        """Enroll many (student_id, course_id, program_id) rows in one INSERT.
+
+        Raises ValueError (nothing inserted) if any row names an unknown student, course or
+        program. Pairs already enrolled, repeated in the request or over the course's
+        capacity are skipped and reported in skipped_rows.
+        """
+        skipped_rows = []
+
+        def skip(row, reason):
+            skipped_rows.append({"student_id": row["student_id"], "course_id": row["course_id"], "reason": reason})
+
+        # Drop duplicates within the request (first row for a pair wins)
+        pending = {}
+        for row in rows:
+            pair = (row["student_id"], row["course_id"])
+            if pair in pending:
+                skip(row, "duplicate in request")
+            else:
+                pending[pair] = row
+
+        student_ids = {student_id for student_id, _ in pending}
+        course_ids = {course_id for _, course_id in pending}
+        program_ids = {row["program_id"] for row in pending.values()}
+
+        # Validate every referenced id with one IN query per table
+        students = {id for (id,) in db.query(User.id).filter(
+            User.id.in_(student_ids), User.role == UserRole.STUDENT
+        )}
+        programs = {id for (id,) in db.query(Program.id).filter(Program.id.in_(program_ids))}
+        capacity = dict(db.query(Course.id, Course.max_capacity).filter(Course.id.in_(course_ids)).all())
+
+        errors = (
+            [f"student {id} not found or not a student" for id in sorted(student_ids - students)]
+            + [f"course {id} not found" for id in sorted(course_ids - capacity.keys())]
+            + [f"program {id} not found" for id in sorted(program_ids - programs)]
+        )
+        if errors:
+            raise ValueError("Invalid enrollment rows: " + "; ".join(errors))
+
+        # Same capacity rule as enroll_student, from one grouped count
+        enrolled = dict(db.query(Enrollment.course_id, func.count(Enrollment.id)).filter(
+            Enrollment.course_id.in_(course_ids),
+            Enrollment.status == EnrollmentStatus.ENROLLED
+        ).group_by(Enrollment.course_id).all())
+        open_seats = {course_id: max_capacity - enrolled.get(course_id, 0) for course_id, max_capacity in capacity.items()}
+
+        # One query for the pairs that already exist, instead of one per row
+        existing = {tuple(pair) for pair in db.query(Enrollment.student_id, Enrollment.course_id).filter(
+            Enrollment.student_id.in_(student_ids),
+            Enrollment.course_id.in_(course_ids)
+        )}
+
+        new_rows = []
+        for pair, row in pending.items():
+            if pair in existing:
+                skip(row, "already enrolled")
+            elif open_seats[row["course_id"]] <= 0:
+                skip(row, "course at full capacity")
+            else:
+                open_seats[row["course_id"]] -= 1
+                new_rows.append({
+                    "student_id": row["student_id"],
+                    "course_id": row["course_id"],
+                    "program_id": row["program_id"],
+                    "status": EnrollmentStatus.ENROLLED
+                })
+
+        created_ids = []
+        if new_rows:
+            # Multi-row INSERT (batched by the engine's insertmanyvalues_page_size) that
+            # returns the new ids in the same round trip; no per-object flush or refresh
+            created_ids = db.scalars(
+                insert(Enrollment).returning(Enrollment.id, sort_by_parameter_order=True), new_rows
+            ).all()
+            db.commit()
+
+        return {
+            "success": True,
+            "created": len(new_rows),
+            "ids": created_ids,
+            "skipped": len(skipped_rows),
+            "skipped_rows": skipped_rows,
+            "message": f"Enrolled {len(new_rows)} student(s)"
+        }
+
     def get_student_enrollments(self, db: Session, student_id: int, semester_id: int = None) -> List[Dict[str, Any]]:
         """Get student's enrollments"""
         try:
             # First check if the student exists
-            student = db.query(User).filter(User.id == student_id).first()
+            student = db.get(User, student_id)
             if not student:
                 print(f"Student with ID {student_id} not found")
                 return []
             
             print(f"Found student: {student.name} (ID: {student_id})")
             
-            # Build the query
-            query = db.query(Enrollment).filter(Enrollment.student_id == student_id)
+            # Build the query; course, semester and lecturer are read for every row, so load
+            # them in the same statement (all many-to-one)
+            query = db.query(Enrollment).options(
+                joinedload(Enrollment.course).joinedload(Course.semester),
+                joinedload(Enrollment.course).joinedload(Course.lecturer)
+            ).filter(Enrollment.student_id == student_id)
             
             if semester_id:
                 print(f"Filtering by semester_id: {semester_id}")
@@ -750,6 +840,48 @@ class AcademicService:
             for semester in semesters
         ]
 
+    def get_semesters_with_current(self, db: Session, limit: int = 10) -> Dict[str, Any]:
+        """Semester list and current semester from one semesters query (plus one course count)"""
+        semesters = db.query(Semester).order_by(Semester.start_date.desc()).all()
+        if not semesters:
+            # get_current_semester creates the default semester when none exist
+            return {"semesters": [], "current_semester": self.get_current_semester(db)}
+
+        course_counts = dict(
+            db.query(Course.semester_id, func.count(Course.id)).group_by(Course.semester_id).all()
+        )
+        # Same rule as get_current_semester: flagged semester, else the most recent one
+        current = next((semester for semester in semesters if semester.is_current), semesters[0])
+
+        return {
+            "semesters": [
+                {
+                    "id": semester.id,
+                    "name": semester.name,
+                    "semester_type": semester.semester_type.value,
+                    "year": semester.year,
+                    "start_date": semester.start_date.isoformat(),
+                    "end_date": semester.end_date.isoformat(),
+                    "is_current": semester.is_current,
+                    "is_active": semester.is_active,
+                    "course_count": course_counts.get(semester.id, 0)
+                }
+                for semester in semesters[:limit]
+            ],
+            "current_semester": {
+                "id": current.id,
+                "name": current.name,
+                "semester_type": current.semester_type.value,
+                "year": current.year,
+                "start_date": current.start_date.isoformat(),
+                "end_date": current.end_date.isoformat(),
+                "registration_start": current.registration_start.isoformat(),
+                "registration_end": current.registration_end.isoformat(),
+                "is_current": current.is_current,
+                "course_count": course_counts.get(current.id, 0)
+            }
+        }
+
     # ============================================================================
     # Academic Analytics
     # ============================================================================
@@ -757,11 +889,15 @@ class AcademicService:
     def get_academic_overview(self, db: Session) -> Dict[str, Any]:
         """Get academic system overview statistics"""
         try:
-            total_students = db.query(User).filter(User.role == UserRole.STUDENT).count()
-            total_lecturers = db.query(User).filter(User.role == UserRole.LECTURER).count()
-            total_courses = db.query(Course).filter(Course.is_active == True).count()
-            total_departments = db.query(Department).filter(Department.is_active == True).count()
-            total_programs = db.query(Program).filter(Program.is_active == True).count()
+            # The counts are independent, so fetch them together in a single round trip
+            counts = db.query(
+                db.query(func.count(User.id)).filter(User.role == UserRole.STUDENT).scalar_subquery(),
+                db.query(func.count(User.id)).filter(User.role == UserRole.LECTURER).scalar_subquery(),
+                db.query(func.count(Course.id)).filter(Course.is_active == True).scalar_subquery(),
+                db.query(func.count(Department.id)).filter(Department.is_active == True).scalar_subquery(),
+                db.query(func.count(Program.id)).filter(Program.is_active == True).scalar_subquery()
+            ).one()
+            total_students, total_lecturers, total_courses, total_departments, total_programs = counts
 
             current_semester = self.get_current_semester(db)
 
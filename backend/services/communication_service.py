@@ -5,7 +5,7 @@ Handles announcements, messaging, and notifications
 
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc
+from sqlalchemy import func, and_, or_, desc, select
 from datetime import datetime, timezone
 
 from models import (
@@ -72,12 +72,11 @@ class CommunicationService:
 
         # Filter by target audience
         if user.role == UserRole.STUDENT:
-            # Get student's enrolled courses
-            enrolled_courses = db.query(Enrollment).filter(
+            # Student's enrolled courses, as a subquery rather than a separate round trip
+            course_ids = select(Enrollment.course_id).where(
                 Enrollment.student_id == user_id,
                 Enrollment.status == EnrollmentStatus.ENROLLED
-            ).all()
-            course_ids = [enrollment.course_id for enrollment in enrolled_courses]
+            )
 
             query = query.filter(
                 or_(
@@ -89,9 +88,8 @@ class CommunicationService:
                 )
             )
         elif user.role == UserRole.LECTURER:
-            # Get lecturer's courses
-            lecturer_courses = db.query(Course).filter(Course.lecturer_id == user_id).all()
-            course_ids = [course.id for course in lecturer_courses]
+            # Lecturer's courses, as a subquery rather than a separate round trip
+            course_ids = select(Course.id).where(Course.lecturer_id == user_id)
 
             query = query.filter(
                 or_(
@@ -1,9 +1,21 @@
 import os
 import re
 import json
+import random
+import asyncio
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from typing import Dict, Any, Optional, List
 
+# Cap in-flight Gemini calls per worker so bursts queue here instead of tripping rate limits
+GEMINI_SEMAPHORE = asyncio.Semaphore(int(os.getenv("GEMINI_CONCURRENCY", "16")))
+GEMINI_MAX_ATTEMPTS = 3
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+)
+
 class GeminiService:
     def __init__(self):
         api_key = os.getenv("GEMINI_API_KEY")
@@ -47,12 +59,24 @@ class GeminiService:
         For math equations, use LaTeX notation with $ symbols.
         """
 
+    async def _generate(self, prompt: str):
+        """generate_content with a concurrency cap and jittered retries on 429/5xx"""
+        async with GEMINI_SEMAPHORE:
+            for attempt in range(GEMINI_MAX_ATTEMPTS):
+                try:
+                    # The client is blocking; keep it off the event loop
+                    return await asyncio.to_thread(self.model.generate_content, prompt)
+                except RETRYABLE_ERRORS:
+                    if attempt == GEMINI_MAX_ATTEMPTS - 1:
+                        raise
+                    await asyncio.sleep((2 ** attempt) + random.random())
+
     async def get_response(self, question: str) -> Dict[str, Any]:
         try:
             # Enhance the prompt with the system prompt
             enhanced_prompt = f"{self.system_prompt}\n\nStudent question: {question}"
 
-            response = self.model.generate_content(enhanced_prompt)
+            response = await self._generate(enhanced_prompt)
             response_text = response.text
 
             # Parse response for code snippets and chart suggestions
@@ -151,7 +175,7 @@ class GeminiService:
             Make it suitable for a learning platform - educational but engaging.
             """
 
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             return response.text
 
         except Exception:
@@ -184,7 +208,7 @@ class GeminiService:
             Keep it encouraging and actionable.
             """
 
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             return response.text
 
         except Exception:
@@ -1,9 +1,16 @@
 import os
 import io
+import asyncio
+import logging
 import tempfile
 from typing import Optional
 import google.generativeai as genai
 
+logger = logging.getLogger(__name__)
+
+# Cap concurrent transcription calls per worker
+SPEECH_SEMAPHORE = asyncio.Semaphore(int(os.getenv("SPEECH_CONCURRENCY", "4")))
+
 class GeminiSpeechService:
     def __init__(self):
         api_key = os.getenv("GEMINI_API_KEY")
@@ -20,40 +27,55 @@ class GeminiSpeechService:
         """
         Transcribe audio content using Google Gemini API.
         """
+        # Create a temporary file to store the audio
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_file.write(audio_content)
+            temp_file_path = temp_file.name
+
+        try:
+            return await self.transcribe_audio_file(temp_file_path)
+        finally:
+            # Clean up temporary file
+            os.unlink(temp_file_path)
+
+    async def transcribe_audio_file(self, file_path: str) -> str:
+        """
+        Transcribe an audio file already on disk using Google Gemini API.
+        """
         try:
-            # Create a temporary file to store the audio
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_content)
-                temp_file_path = temp_file.name
+            # The Gemini client is blocking; run it in a thread to keep the event loop free
+            transcription = await self._transcribe_limited(file_path)
             
-            try:
-                # Upload the audio file to Gemini
-                audio_file = genai.upload_file(temp_file_path)
-                
-                # Create prompt for transcription
-                prompt = """
-                Please transcribe the audio content accurately. 
-                Return only the transcribed text without any additional commentary.
-                If the audio is unclear or inaudible, return: "I couldn't understand the audio clearly. Please try speaking more clearly."
-                """
-                
-                # Generate transcription
-                response = self.model.generate_content([prompt, audio_file])
-                transcription = response.text.strip()
-                
-                # Clean up the uploaded file from Gemini
-                genai.delete_file(audio_file.name)
-                
-                return transcription
-                
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_file_path)
+            return transcription
                 
         except Exception as e:
-            print(f"Gemini Speech API error: {e}")
-            return await self._fallback_transcription(audio_content)
+            logger.warning("Gemini Speech API error: %s", e)
+            return await self._fallback_transcription(b"")
     
+    async def _transcribe_limited(self, file_path: str) -> str:
+        async with SPEECH_SEMAPHORE:
+            return await asyncio.to_thread(self._transcribe_file, file_path)
+
+    def _transcribe_file(self, file_path: str) -> str:
+        # Upload the audio file to Gemini
+        audio_file = genai.upload_file(file_path)
+        
+        # Create prompt for transcription
+        prompt = """
+        Please transcribe the audio content accurately. 
+        Return only the transcribed text without any additional commentary.
+        If the audio is unclear or inaudible, return: "I couldn't understand the audio clearly. Please try speaking more clearly."
+        """
+        
+        # Generate transcription
+        response = self.model.generate_content([prompt, audio_file])
+        transcription = response.text.strip()
+        
+        # Clean up the uploaded file from Gemini
+        genai.delete_file(audio_file.name)
+        
+        return transcription
+
     async def _fallback_transcription(self, audio_content: bytes) -> str:
         """
         Fallback transcription method when API is unavailable.
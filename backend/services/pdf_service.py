@@ -1,16 +1,63 @@
 import os
 import io
+import shutil
+import asyncio
+import tempfile
 import PyPDF2
-from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, BinaryIO, Union
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, raiseload
 from datetime import datetime, timezone
 
+from database import STRICT_LOADING
 from models import PDFDocument, ChatSession, ChatMessage
 from services.gemini_service import GeminiService
 
+# PDF parsing is CPU-bound, so it runs in worker processes (created on first use)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _process_pool
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+def extract_pdf_text(source: Union[bytes, str, BinaryIO]) -> str:
+    """Extract text from PDF bytes, a file path or a seekable file object
+
+    Module-level so it can be sent to the process pool.
+    """
+    try:
+        pdf_file = io.BytesIO(source) if isinstance(source, bytes) else source
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        
+        text_content = ""
+        for page in pdf_reader.pages:
+            text_content += page.extract_text() + "\n"
+        
+        # Clean up the text
+        text_content = text_content.strip()
+        
+        if not text_content:
+            raise ValueError("No text content found in PDF")
+        
+        return text_content
+        
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
 class PDFService:
-    def __init__(self):
-        self.gemini_service = GeminiService()
+    def __init__(self, gemini_service: Optional[GeminiService] = None):
+        # Share the app's GeminiService (and its model client) when one is passed in
+        self.gemini_service = gemini_service or GeminiService()
         self.max_file_size = 10 * 1024 * 1024  # 10MB limit
         self.allowed_extensions = {'.pdf'}
 
@@ -34,34 +81,46 @@ class PDFService:
             "errors": errors
         }
 
-    def extract_text_from_pdf(self, pdf_content: bytes) -> str:
-        """Extract text content from PDF bytes"""
+    def extract_text_from_pdf(self, pdf_content: Union[bytes, BinaryIO]) -> str:
+        """Extract text content from PDF bytes or a seekable file object"""
+        return extract_pdf_text(pdf_content)
+
+    async def _extract_text_in_pool(self, pdf_content: Union[bytes, BinaryIO]) -> str:
+        """Run text extraction in the process pool so parsing doesn't block the event loop"""
+        loop = asyncio.get_running_loop()
+        if isinstance(pdf_content, bytes):
+            return await loop.run_in_executor(get_process_pool(), extract_pdf_text, pdf_content)
+
+        # Copy the (possibly in-memory) upload to a named file so only its path is pickled
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
+            shutil.copyfileobj(pdf_content, temp_file, 1024 * 1024)
+            temp_path = temp_file.name
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_content = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text_content += page.extract_text() + "\n"
-            
-            # Clean up the text
-            text_content = text_content.strip()
-            
-            if not text_content:
-                raise ValueError("No text content found in PDF")
-            
-            return text_content
-            
-        except Exception as e:
-            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+            return await loop.run_in_executor(get_process_pool(), extract_pdf_text, temp_path)
+        finally:
+            os.unlink(temp_path)
+
+    def _content_size(self, file_content: Union[bytes, BinaryIO]) -> int:
+        """Size of the upload without reading a file object into memory"""
+        if isinstance(file_content, bytes):
+            return len(file_content)
+        file_content.seek(0, os.SEEK_END)
+        size = file_content.tell()
+        file_content.seek(0)
+        return size
 
     async def process_pdf_upload(self, db: Session, user_id: int, filename: str, 
-                                file_content: bytes) -> Dict[str, Any]:
-        """Process uploaded PDF and generate summary"""
+                                file_content: Union[bytes, BinaryIO]) -> Dict[str, Any]:
+        """Process uploaded PDF and generate summary
+
+        file_content may be raw bytes or a seekable file object (e.g. UploadFile.file),
+        which is parsed in place instead of being buffered in memory.
+        """
         try:
+            file_size = self._content_size(file_content)
+
             # Validate file
-            validation = self.validate_pdf_file(filename, len(file_content))
+            validation = self.validate_pdf_file(filename, file_size)
             if not validation["valid"]:
                 return {
                     "success": False,
@@ -69,7 +128,7 @@ class PDFService:
                 }
             
             # Extract text from PDF
-            extracted_text = self.extract_text_from_pdf(file_content)
+            extracted_text = await self._extract_text_in_pool(file_content)
             
             # Truncate text if too long (for AI processing)
             max_text_length = 50000  # Limit for AI processing
@@ -83,7 +142,7 @@ class PDFService:
             pdf_document = PDFDocument(
                 user_id=user_id,
                 filename=filename,
-                file_size=len(file_content),
+                file_size=file_size,
                 content_text=extracted_text,
                 summary=summary,
                 upload_date=datetime.now(timezone.utc)
@@ -246,16 +305,19 @@ class PDFService:
             }
 
     def get_user_pdfs(self, db: Session, user_id: int) -> list:
-        """Get list of user's uploaded PDFs"""
-        pdfs = db.query(PDFDocument).filter(
+        """Get list of user's uploaded PDFs (datetimes are left for the JSON encoder)"""
+        query = db.query(PDFDocument).filter(
             PDFDocument.user_id == user_id
-        ).order_by(PDFDocument.upload_date.desc()).all()
+        ).order_by(PDFDocument.upload_date.desc())
+        if STRICT_LOADING:
+            query = query.options(raiseload("*"))
+        pdfs = query.all()
         
         return [
             {
                 "id": pdf.id,
                 "filename": pdf.filename,
-                "upload_date": pdf.upload_date.isoformat(),
+                "upload_date": pdf.upload_date,
                 "file_size": pdf.file_size,
                 "has_summary": bool(pdf.summary)
             }
@@ -263,19 +325,31 @@ class PDFService:
         ]
 
     def get_chat_sessions(self, db: Session, user_id: int) -> list:
-        """Get user's chat sessions"""
-        sessions = db.query(ChatSession).filter(
+        """Get user's chat sessions (datetimes are left for the JSON encoder)"""
+        # PDF joined in and message counts grouped in one query, instead of two lazy loads per session
+        query = db.query(ChatSession).options(
+            joinedload(ChatSession.pdf_document)
+        ).filter(
             ChatSession.user_id == user_id
-        ).order_by(ChatSession.last_activity.desc()).all()
+        ).order_by(ChatSession.last_activity.desc())
+        if STRICT_LOADING:
+            query = query.options(raiseload("*"))
+        sessions = query.all()
+
+        message_counts = dict(
+            db.query(ChatMessage.chat_session_id, func.count(ChatMessage.id)).filter(
+                ChatMessage.chat_session_id.in_([session.id for session in sessions])
+            ).group_by(ChatMessage.chat_session_id).all()
+        ) if sessions else {}
         
         return [
             {
                 "id": session.id,
                 "session_name": session.session_name,
                 "pdf_filename": session.pdf_document.filename if session.pdf_document else None,
-                "created_date": session.created_date.isoformat(),
-                "last_activity": session.last_activity.isoformat(),
-                "message_count": len(session.chat_messages)
+                "created_date": session.created_date,
+                "last_activity": session.last_activity,
+                "message_count": message_counts.get(session.id, 0)
             }
             for session in sessions
         ]
@@ -1,17 +1,18 @@
 import random
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, Integer
-from typing import List, Dict, Any
+from sqlalchemy import func, desc, insert, Integer
+from typing import List, Dict, Any, Optional
 
 from models import Question, QuizAttempt, UserProgress, Achievement, ChatSession, ChatMessage, PDFDocument
 from services.gemini_service import GeminiService
 
 class QuizService:
-    def __init__(self):
+    def __init__(self, gemini_service: Optional[GeminiService] = None):
         self.questions_per_quiz = 5
         self.difficulty_weights = {"easy": 0.3, "medium": 0.5, "hard": 0.2}
-        self.gemini_service = GeminiService()
+        # Share the app's GeminiService (and its model client) when one is passed in
+        self.gemini_service = gemini_service or GeminiService()
 
     def generate_adaptive_quiz(self, db: Session, user_id: int, difficulty: str | None = None) -> List[Dict[str, Any]]:
         """
@@ -372,23 +373,21 @@ IMPORTANT: Return ONLY the JSON array, no other text or formatting."""
         Submit quiz results and update user progress.
         """
         try:
-            correct_count = 0
-
-            for answer in answers:
-                question_id = answer.get('questionId')
-                is_correct = answer.get('isCorrect', False)
-
-                if is_correct:
-                    correct_count += 1
-
-                # Record the attempt
-                attempt = QuizAttempt(
-                    user_id=user_id,
-                    question_id=question_id,
-                    is_correct=is_correct,
-                    timestamp=datetime.now(timezone.utc)
-                )
-                db.add(attempt)
+            now = datetime.now(timezone.utc)
+
+            # Record every attempt with one executemany INSERT instead of an ORM object per answer
+            rows = [
+                {
+                    "user_id": user_id,
+                    "question_id": answer.get('questionId'),
+                    "is_correct": bool(answer.get('isCorrect', False)),
+                    "timestamp": now
+                }
+                for answer in answers
+            ]
+            correct_count = sum(1 for row in rows if row["is_correct"])
+            if rows:
+                db.execute(insert(QuizAttempt), rows)
 
             # Update user progress
             self._update_user_progress(db, user_id, answers)
@@ -411,12 +410,17 @@ IMPORTANT: Return ONLY the JSON array, no other text or formatting."""
             # Group answers by topic
             topic_stats = {}
 
+            # Look up all answered questions' topics in one query
+            question_ids = {answer.get('questionId') for answer in answers}
+            topics_by_question = dict(
+                db.query(Question.id, Question.topic).filter(Question.id.in_(question_ids)).all()
+            ) if question_ids else {}
+
             for answer in answers:
-                question = db.query(Question).filter(Question.id == answer.get('questionId')).first()
-                if not question:
+                topic = topics_by_question.get(answer.get('questionId'))
+                if topic is None:
                     continue
 
-                topic = question.topic
                 if topic not in topic_stats:
                     topic_stats[topic] = {'total': 0, 'correct': 0}
 
@@ -424,12 +428,18 @@ IMPORTANT: Return ONLY the JSON array, no other text or formatting."""
                 if answer.get('isCorrect', False):
                     topic_stats[topic]['correct'] += 1
 
+            # Fetch the existing progress rows for all touched topics at once
+            progress_by_topic = {
+                progress.topic: progress
+                for progress in db.query(UserProgress).filter(
+                    UserProgress.user_id == user_id,
+                    UserProgress.topic.in_(list(topic_stats))
+                ).all()
+            } if topic_stats else {}
+
             # Update progress for each topic
             for topic, stats in topic_stats.items():
-                progress = db.query(UserProgress).filter(
-                    UserProgress.user_id == user_id,
-                    UserProgress.topic == topic
-                ).first()
+                progress = progress_by_topic.get(topic)
 
                 if not progress:
                     progress = UserProgress(
@@ -3,6 +3,7 @@ Real-time Service for MasterLMS
 Handles WebSocket connections, live updates, and real-time notifications
 """
 
+import os
 import json
 import asyncio
 from typing import Dict, List, Set, Any, Optional
@@ -11,12 +12,85 @@ from sqlalchemy.orm import Session
 
 from models import User, UserRole, Course, Enrollment, EnrollmentStatus
 
+# orjson is several times faster than json for message framing; optional
+try:
+    import orjson
+
+    def dumps(message: Any) -> str:
+        return orjson.dumps(message).decode()
+except ImportError:
+    dumps = json.dumps
+
+# With REDIS_URL set, messages are published to Redis and every worker delivers them
+# to the sockets it holds, so fan-out works across uvicorn workers. Optional.
+REDIS_URL = os.getenv("REDIS_URL")
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+CHANNEL_PREFIX = "ws:"
+
 class ConnectionManager:
     def __init__(self):
-        # Store active connections by user_id
+        # Store active connections by user_id (sockets held by this worker only)
         self.active_connections: Dict[int, Set[Any]] = {}
         # Store user sessions with metadata
         self.user_sessions: Dict[int, Dict[str, Any]] = {}
+        # Redis pub/sub (None when running single-process)
+        self.redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Connect to Redis and start relaying published messages to local sockets"""
+        if not REDIS_URL or aioredis is None or self.redis is not None:
+            return
+        self.redis = aioredis.from_url(REDIS_URL, decode_responses=True)
+        pubsub = self.redis.pubsub()
+        await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    async def _listen(self, pubsub):
+        async for item in pubsub.listen():
+            if item["type"] != "pmessage":
+                continue
+            target = item["channel"][len(CHANNEL_PREFIX):]
+            payload = item["data"]
+            try:
+                if target == "broadcast":
+                    for user_id in list(self.active_connections):
+                        await self._deliver_local(payload, user_id)
+                elif target.startswith("role:"):
+                    role = target[len("role:"):]
+                    for user_id, session in list(self.user_sessions.items()):
+                        if session["role"] == role:
+                            await self._deliver_local(payload, user_id)
+                elif target.startswith("user:"):
+                    await self._deliver_local(payload, int(target[len("user:"):]))
+            except Exception as e:
+                print(f"Failed to relay {item['channel']}: {e}")
+
+    async def _deliver_local(self, payload: str, user_id: int):
+        """Send an encoded message to this worker's sockets for a user"""
+        if user_id in self.active_connections:
+            disconnected = set()
+            for websocket in list(self.active_connections[user_id]):
+                try:
+                    await websocket.send_text(payload)
+                except:
+                    disconnected.add(websocket)
+            
+            # Clean up disconnected websockets
+            for websocket in disconnected:
+                self.active_connections[user_id].discard(websocket)
     
     async def connect(self, websocket: Any, user_id: int, user_role: str):
         """Accept a new WebSocket connection"""
@@ -51,21 +125,19 @@ class ConnectionManager:
     
     async def send_personal_message(self, message: Dict[str, Any], user_id: int):
         """Send a message to a specific user"""
-        if user_id in self.active_connections:
-            disconnected = set()
-            for websocket in self.active_connections[user_id]:
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except:
-                    disconnected.add(websocket)
-            
-            # Clean up disconnected websockets
-            for websocket in disconnected:
-                self.active_connections[user_id].discard(websocket)
+        # Encode once for all of the user's connections
+        payload = dumps(message)
+        if self.redis is not None:
+            await self.redis.publish(f"{CHANNEL_PREFIX}user:{user_id}", payload)
+        else:
+            await self._deliver_local(payload, user_id)
     
     async def send_to_role(self, message: Dict[str, Any], role: str):
         """Send a message to all users with a specific role"""
-        for user_id, session in self.user_sessions.items():
+        if self.redis is not None:
+            await self.redis.publish(f"{CHANNEL_PREFIX}role:{role}", dumps(message))
+            return
+        for user_id, session in list(self.user_sessions.items()):
             if session["role"] == role:
                 await self.send_personal_message(message, user_id)
     
@@ -90,8 +162,12 @@ class ConnectionManager:
     
     async def broadcast(self, message: Dict[str, Any]):
         """Send a message to all connected users"""
-        for user_id in self.active_connections:
-            await self.send_personal_message(message, user_id)
+        if self.redis is not None:
+            await self.redis.publish(f"{CHANNEL_PREFIX}broadcast", dumps(message))
+            return
+        payload = dumps(message)
+        for user_id in list(self.active_connections):
+            await self._deliver_local(payload, user_id)
     
     def get_online_users(self) -> List[Dict[str, Any]]:
         """Get list of currently online users"""
@@ -280,7 +356,7 @@ class RealtimeService:
             
             if message_type == "ping":
                 # Respond to ping with pong
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(dumps({
                     "type": "pong",
                     "timestamp": datetime.now(timezone.utc).isoformat()
                 }))
@@ -301,13 +377,13 @@ class RealtimeService:
             
         except json.JSONDecodeError:
             # Invalid JSON message
-            await websocket.send_text(json.dumps({
+            await websocket.send_text(dumps({
                 "type": "error",
                 "message": "Invalid JSON format"
             }))
         except Exception as e:
             # General error handling
-            await websocket.send_text(json.dumps({
+            await websocket.send_text(dumps({
                 "type": "error",
                 "message": f"Error processing message: {str(e)}"
             }))
@@ -3,16 +3,22 @@ User Management Service for MasterLMS
 Handles user operations, role management, and user-specific functionality
 """
 
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from typing import Iterator, List, Dict, Any, Optional
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, and_, or_, select
 from datetime import datetime, timezone
 
 from models import (
     User, UserRole, Enrollment, Course, EnrollmentStatus,
     Assignment, AssignmentSubmission, GradeReport, Announcement
 )
-from auth import AuthManager
+from auth import AuthManager, invalidate_cached_user
+
+# Columns read by _user_summary; list queries select just these instead of whole User rows
+USER_SUMMARY_COLUMNS = (
+    User.id, User.name, User.email, User.role, User.student_id,
+    User.employee_id, User.phone, User.is_active, User.created_at
+)
 
 class UserManagementService:
     def __init__(self):
@@ -22,54 +28,72 @@ class UserManagementService:
     # User Management
     # ============================================================================
 
-    def get_all_users(self, db: Session, active_only: bool = False) -> List[Dict[str, Any]]:
-        """Get all users"""
-        query = db.query(User)
+    def _user_summary(self, user) -> Dict[str, Any]:
+        """Common user fields shared by the list and update responses (datetimes are left for the JSON encoder).
 
-        if active_only:
-            query = query.filter(User.is_active == True)
+        Accepts a User or a USER_SUMMARY_COLUMNS row.
+        """
+        return {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "role": user.role.value,
+            "student_id": user.student_id,
+            "employee_id": user.employee_id,
+            "phone": user.phone,
+            "is_active": user.is_active,
+            "created_at": user.created_at
+        }
 
-        users = query.order_by(User.name).all()
+    def get_all_users(self, db: Session, active_only: bool = False,
+                      limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get all users (optionally one page of them)"""
+        return list(self.iter_users(db, active_only, limit, offset))
 
-        return [
-            {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "role": user.role.value,
-                "student_id": user.student_id,
-                "employee_id": user.employee_id,
-                "phone": user.phone,
-                "is_active": user.is_active,
-                "created_at": user.created_at.isoformat(),
-                "enrollment_count": self._get_user_enrollment_count(db, user.id) if user.role == UserRole.STUDENT else 0,
-                "current_gpa": self._get_user_gpa(db, user.id) if user.role == UserRole.STUDENT else None
-            }
-            for user in users
-        ]
+    def iter_users(self, db: Session, active_only: bool = False,
+                   limit: Optional[int] = None, offset: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield user list entries one at a time, fetching rows from the database in batches"""
+        # id breaks ties between equal names so pages don't overlap
+        query = select(*USER_SUMMARY_COLUMNS).order_by(User.name, User.id)
+
+        if active_only:
+            query = query.where(User.is_active == True)
+        if limit is not None:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+
+        # Student stats are looked up once per batch of rows, not once per row
+        for batch in db.execute(query.execution_options(yield_per=500)).partitions():
+            student_ids = [user.id for user in batch if user.role == UserRole.STUDENT]
+            enrollment_counts = self._get_enrollment_counts(db, student_ids)
+            gpas = self._get_user_gpas(db, student_ids)
+
+            for user in batch:
+                yield {
+                    **self._user_summary(user),
+                    "enrollment_count": enrollment_counts.get(user.id, 0),
+                    "current_gpa": gpas.get(user.id)
+                }
 
     def get_users_by_role(self, db: Session, role: UserRole, active_only: bool = True) -> List[Dict[str, Any]]:
         """Get users filtered by role"""
-        query = db.query(User).filter(User.role == role)
+        query = select(*USER_SUMMARY_COLUMNS).where(User.role == role)
 
         if active_only:
-            query = query.filter(User.is_active == True)
+            query = query.where(User.is_active == True)
+
+        users = db.execute(query.order_by(User.name)).all()
 
-        users = query.order_by(User.name).all()
+        student_ids = [user.id for user in users] if role == UserRole.STUDENT else []
+        enrollment_counts = self._get_enrollment_counts(db, student_ids)
+        gpas = self._get_user_gpas(db, student_ids)
 
         return [
             {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "role": user.role.value,
-                "student_id": user.student_id,
-                "employee_id": user.employee_id,
-                "phone": user.phone,
-                "is_active": user.is_active,
-                "created_at": user.created_at.isoformat(),
-                "enrollment_count": self._get_user_enrollment_count(db, user.id) if role == UserRole.STUDENT else 0,
-                "current_gpa": self._get_user_gpa(db, user.id) if role == UserRole.STUDENT else None
+                **self._user_summary(user),
+                "enrollment_count": enrollment_counts.get(user.id, 0),
+                "current_gpa": gpas.get(user.id)
             }
             for user in users
         ]
@@ -106,15 +130,7 @@ class UserManagementService:
 
         return [
             {
-                "id": student.id,
-                "name": student.name,
-                "email": student.email,
-                "role": student.role.value,
-                "student_id": student.student_id,
-                "employee_id": student.employee_id,
-                "phone": student.phone,
-                "is_active": student.is_active,
-                "created_at": student.created_at.isoformat(),
+                **self._user_summary(student),
                 "enrollment_count": self._get_user_enrollment_count(db, student.id),
                 "current_gpa": self._get_user_gpa(db, student.id)
             }
@@ -123,7 +139,7 @@ class UserManagementService:
 
     def get_user_profile(self, db: Session, user_id: int) -> Dict[str, Any]:
         """Get detailed user profile"""
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise ValueError("User not found")
 
@@ -264,8 +280,8 @@ class UserManagementService:
         from models import Assignment, Enrollment
         from datetime import datetime, timezone
 
-        # Get assignments from enrolled courses
-        assignments = db.query(Assignment).join(
+        # Get assignments from enrolled courses (courses fetched in one IN query)
+        assignments = db.query(Assignment).options(selectinload(Assignment.course)).join(
             Enrollment, Assignment.course_id == Enrollment.course_id
         ).filter(
             Enrollment.student_id == student_id,
@@ -289,13 +305,11 @@ class UserManagementService:
 
     def _get_student_announcements(self, db: Session, student_id: int, limit: int = 5) -> List[Dict[str, Any]]:
         """Get recent announcements for a student"""
-        # Get student's enrolled courses
-        enrolled_courses = db.query(Course).join(Enrollment).filter(
+        # Student's enrolled courses, as a subquery of the announcements query
+        course_ids = select(Enrollment.course_id).where(
             Enrollment.student_id == student_id,
             Enrollment.status == 'enrolled'
-        ).all()
-
-        course_ids = [course.id for course in enrolled_courses]
+        )
 
         # Get announcements (general + course-specific)
         announcements = db.query(Announcement).filter(
@@ -395,17 +409,14 @@ class UserManagementService:
 
     def _get_pending_submissions(self, db: Session, lecturer_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Get pending assignment submissions for lecturer's courses"""
-        # Get lecturer's courses
-        lecturer_courses = db.query(Course).filter(
+        # Ungraded submissions in the lecturer's active courses, scoped by joining the
+        # course rather than fetching the course ids first
+        pending_submissions = db.query(AssignmentSubmission).options(
+            selectinload(AssignmentSubmission.assignment).selectinload(Assignment.course),
+            selectinload(AssignmentSubmission.student)
+        ).join(Assignment).join(Course, Course.id == Assignment.course_id).filter(
             Course.lecturer_id == lecturer_id,
-            Course.is_active == True
-        ).all()
-
-        course_ids = [course.id for course in lecturer_courses]
-
-        # Get assignments with pending submissions
-        pending_submissions = db.query(AssignmentSubmission).join(Assignment).filter(
-            Assignment.course_id.in_(course_ids),
+            Course.is_active == True,
             AssignmentSubmission.grade.is_(None)
         ).order_by(AssignmentSubmission.submitted_at.desc()).limit(limit).all()
 
@@ -450,15 +461,31 @@ class UserManagementService:
 
     def _get_user_enrollment_count(self, db: Session, user_id: int) -> int:
         """Get enrollment count for a user (students only)"""
-        return db.query(Enrollment).filter(
-            Enrollment.student_id == user_id,
-            Enrollment.status == 'enrolled'
-        ).count()
+        return self._get_enrollment_counts(db, [user_id]).get(user_id, 0)
+
+    def _get_enrollment_counts(self, db: Session, user_ids: List[int]) -> Dict[int, int]:
+        """Get enrollment counts for many users in one GROUP BY query; users without enrollments are left out"""
+        if not user_ids:
+            return {}
+
+        rows = db.execute(
+            select(Enrollment.student_id, func.count(Enrollment.id))
+            .where(
+                Enrollment.student_id.in_(user_ids),
+                Enrollment.status == EnrollmentStatus.ENROLLED
+            )
+            .group_by(Enrollment.student_id)
+        ).all()
+        return dict(rows)
 
     def _get_user_gpa(self, db: Session, user_id: int) -> Optional[float]:
         """Get current GPA for a user (students only)"""
-        # For now, return None - this can be enhanced later with actual GPA calculation
-        return None
+        return self._get_user_gpas(db, [user_id]).get(user_id)
+
+    def _get_user_gpas(self, db: Session, user_ids: List[int]) -> Dict[int, Optional[float]]:
+        """Get current GPAs for many users (students only)"""
+        # For now, no GPAs - this can be enhanced later with one GROUP BY over the ids
+        return {}
 
     def _get_student_announcements(self, db: Session, student_id: int) -> List[Dict[str, Any]]:
         """Get recent announcements for a student"""
@@ -467,7 +494,7 @@ class UserManagementService:
 
     def update_user(self, db: Session, user_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update user information"""
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise ValueError("User not found")
 
@@ -500,22 +527,13 @@ class UserManagementService:
 
         db.commit()
         db.refresh(user)
+        invalidate_cached_user(user.id)
 
-        return {
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "role": user.role.value,
-            "student_id": user.student_id,
-            "employee_id": user.employee_id,
-            "phone": user.phone,
-            "is_active": user.is_active,
-            "created_at": user.created_at.isoformat()
-        }
+        return self._user_summary(user)
 
     def get_user_by_id(self, db: Session, user_id: int) -> Dict[str, Any]:
         """Get user details by ID"""
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise ValueError("User not found")
 
@@ -535,32 +553,35 @@ class UserManagementService:
 
     def activate_user(self, db: Session, user_id: int) -> bool:
         """Activate a user"""
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise ValueError("User not found")
 
         user.is_active = True
         db.commit()
+        invalidate_cached_user(user.id)
         return True
 
     def deactivate_user(self, db: Session, user_id: int) -> bool:
         """Deactivate a user"""
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise ValueError("User not found")
 
         user.is_active = False
         db.commit()
+        invalidate_cached_user(user.id)
         return True
 
     def delete_user(self, db: Session, user_id: int) -> bool:
         """Delete a user (soft delete by setting is_active to False)"""
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise ValueError("User not found")
 
         # Soft delete - set is_active to False instead of actually deleting
         user.is_active = False
         db.commit()
+        invalidate_cached_user(user.id)
 
         return True
@@ -1,45 +1,75 @@
 import os
 import io
+import asyncio
+import logging
 import tempfile
 from typing import Optional
+import httpx
 import openai
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
+# Cap concurrent transcription calls per worker
+WHISPER_SEMAPHORE = asyncio.Semaphore(int(os.getenv("WHISPER_CONCURRENCY", "4")))
+
 class WhisperService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY", "default_key")
-        self.client = OpenAI(api_key=self.api_key)
+        # One pooled HTTP client for the life of the process so keep-alive connections
+        # (and their TLS sessions) are reused across transcriptions
+        self.http_client = httpx.Client(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+        )
+        self.client = OpenAI(api_key=self.api_key, http_client=self.http_client)
+
+    def close(self):
+        self.http_client.close()
     
     async def transcribe_audio(self, audio_content: bytes) -> str:
         """
         Transcribe audio content using OpenAI Whisper API.
         """
+        # Create a temporary file to store the audio
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_file.write(audio_content)
+            temp_file_path = temp_file.name
+
         try:
-            # Create a temporary file to store the audio
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_content)
-                temp_file_path = temp_file.name
-            
-            try:
-                # Transcribe using OpenAI Whisper
-                with open(temp_file_path, "rb") as audio_file:
-                    transcript = self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        response_format="text"
-                    )
-                
-                return transcript.strip()
-                
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_file_path)
-                
+            return await self.transcribe_audio_file(temp_file_path)
+        finally:
+            # Clean up temporary file
+            os.unlink(temp_file_path)
+
+    async def transcribe_audio_file(self, file_path: str) -> str:
+        """
+        Transcribe an audio file already on disk using OpenAI Whisper API.
+        """
+        try:
+            # The OpenAI client is blocking; run it in a thread to keep the event loop free
+            transcript = await self._transcribe_limited(file_path)
+
+            return transcript.strip()
+
         except Exception as e:
             # Fallback: return error message or attempt local processing
-            print(f"Whisper API error: {e}")
-            return await self._fallback_transcription(audio_content)
+            logger.warning("Whisper API error: %s", e)
+            return await self._fallback_transcription(b"")
     
+    async def _transcribe_limited(self, file_path: str) -> str:
+        async with WHISPER_SEMAPHORE:
+            return await asyncio.to_thread(self._transcribe_file, file_path)
+
+    def _transcribe_file(self, file_path: str) -> str:
+        # Transcribe using OpenAI Whisper
+        with open(file_path, "rb") as audio_file:
+            return self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                response_format="text"
+            )
+
     async def _fallback_transcription(self, audio_content: bytes) -> str:
         """
         Fallback transcription method when API is unavailable.
@@ -0,0 +1,82 @@
+"""
+Shared test setup: in-memory database, dependency override and test client
+"""
+
+import os
+
+# Fail on accidental lazy loads (N+1) anywhere in the suite. database.py reads the flag
+# at import, so it has to be set here, before any test module imports the app.
+os.environ.setdefault("STRICT_LOADING", "1")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app, lookup_caches
+from database import get_db
+from models import Base, User, UserRole
+from auth import AuthManager, _user_status_cache
+
+# Create in-memory database for testing
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+def override_get_db():
+    """Override database dependency for testing"""
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    """Empty schema and empty lookup/user caches for every test"""
+    # Set per test, not at import: test modules that install their own override when
+    # imported must not redirect the app for every other module
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.create_all(bind=engine)
+    for cache in lookup_caches.values():
+        cache.clear()
+    _user_status_cache.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def make_user(db):
+    """Create a user; returns it with Authorization headers for a token carrying its role"""
+    auth_manager = AuthManager()
+
+    def _make_user(email: str, role: UserRole = UserRole.STUDENT, name: str = "Test User"):
+        user = User(
+            name=name,
+            email=email,
+            password_hash=auth_manager.hash_password("testpass123"),
+            role=role
+        )
+        db.add(user)
+        db.commit()
+        token = auth_manager.create_access_token(user.id, role)
+        return user, {"Authorization": f"Bearer {token}"}
+
+    return _make_user
@@ -0,0 +1,39 @@
+"""
+Tests for the academic lookup endpoints
+"""
+
+from models import Department, UserRole
+
+class TestDepartmentLookup:
+    """Cached department list with ETag revalidation"""
+
+    def test_matching_etag_returns_304(self, client, db, make_user):
+        _, headers = make_user("admin@example.com", UserRole.ADMIN)
+        db.add(Department(name="Computer Science", code="CS"))
+        db.commit()
+
+        first = client.get("/api/academic/departments", headers=headers)
+        assert first.status_code == 200
+        assert [d["code"] for d in first.json()["departments"]] == ["CS"]
+        etag = first.headers["ETag"]
+
+        second = client.get("/api/academic/departments", headers={**headers, "If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        assert second.content == b""
+
+    def test_write_changes_etag(self, client, make_user):
+        _, headers = make_user("admin@example.com", UserRole.ADMIN)
+
+        etag = client.get("/api/academic/departments", headers=headers).headers["ETag"]
+
+        response = client.post("/api/academic/departments", headers=headers, json={
+            "name": "Mathematics",
+            "code": "MATH"
+        })
+        assert response.status_code == 200
+
+        after = client.get("/api/academic/departments", headers={**headers, "If-None-Match": etag})
+        assert after.status_code == 200
+        assert after.headers["ETag"] != etag
+        assert [d["code"] for d in after.json()["departments"]] == ["MATH"]
@@ -0,0 +1,58 @@
+"""
+Tests for the assignment endpoints
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import Assignment, Course, Department, Semester, SemesterType, UserRole
+
+class TestCreateAssignment:
+    """POST /api/assignments"""
+
+    @pytest.fixture(autouse=True)
+    def setup_course(self, db, client, make_user):
+        """Setup test data"""
+        self.db = db
+        self.client = client
+        _, self.headers = make_user("lecturer@example.com", UserRole.LECTURER)
+
+        now = datetime.now()
+        department = Department(name="Computer Science", code="CS")
+        semester = Semester(
+            name="Fall", semester_type=SemesterType.FALL, year=now.year,
+            start_date=now, end_date=now + timedelta(days=120),
+            registration_start=now - timedelta(days=30), registration_end=now + timedelta(days=14)
+        )
+        db.add_all([department, semester])
+        db.flush()
+        self.course = Course(name="Algorithms", code="CS201", department_id=department.id, semester_id=semester.id)
+        db.add(self.course)
+        db.commit()
+
+    def test_stores_instructions(self):
+        response = self.client.post("/api/assignments", headers=self.headers, json={
+            "title": "Sorting",
+            "description": "Implement merge sort",
+            "instructions": "Submit a single .py file",
+            "course_id": self.course.id,
+            "due_date": "2030-01-15T23:59:00Z"
+        })
+
+        assert response.status_code == 200
+        assignment = self.db.get(Assignment, response.json()["assignment_id"])
+        assert assignment.description == "Implement merge sort"
+        assert assignment.instructions == "Submit a single .py file"
+
+    def test_missing_text_fields_default_to_empty(self):
+        response = self.client.post("/api/assignments", headers=self.headers, json={
+            "title": "Sorting",
+            "course_id": self.course.id
+        })
+
+        assert response.status_code == 200
+        assignment = self.db.get(Assignment, response.json()["assignment_id"])
+        assert assignment.description == ""
+        assert assignment.instructions == ""
+        assert assignment.assignment_type == "homework"
@@ -0,0 +1,110 @@
+"""
+Tests for the bulk enrollment endpoint
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import Course, Department, Enrollment, Program, ProgramType, Semester, SemesterType, UserRole
+
+class TestBulkEnrollment:
+    """POST /api/enrollments/bulk"""
+
+    @pytest.fixture(autouse=True)
+    def setup_catalog(self, db, client, make_user):
+        """Setup test data"""
+        self.db = db
+        self.client = client
+        _, self.admin_headers = make_user("admin@example.com", UserRole.ADMIN)
+        self.alice, _ = make_user("alice@example.com", name="Alice")
+        self.bob, _ = make_user("bob@example.com", name="Bob")
+        self.lecturer, _ = make_user("lecturer@example.com", UserRole.LECTURER)
+
+        now = datetime.now()
+        department = Department(name="Computer Science", code="CS")
+        semester = Semester(
+            name="Fall", semester_type=SemesterType.FALL, year=now.year,
+            start_date=now, end_date=now + timedelta(days=120),
+            registration_start=now - timedelta(days=30), registration_end=now + timedelta(days=14)
+        )
+        db.add_all([department, semester])
+        db.flush()
+        self.program = Program(name="BSc CS", code="CS-BS", program_type=ProgramType.BACHELOR, department_id=department.id)
+        self.course = Course(name="Algorithms", code="CS201", department_id=department.id, semester_id=semester.id, max_capacity=30)
+        self.small_course = Course(name="Seminar", code="CS490", department_id=department.id, semester_id=semester.id, max_capacity=1)
+        db.add_all([self.program, self.course, self.small_course])
+        db.commit()
+
+    def row(self, student, course):
+        return {"student_id": student.id, "course_id": course.id, "program_id": self.program.id}
+
+    def post(self, rows):
+        return self.client.post("/api/enrollments/bulk", headers=self.admin_headers, json={"enrollments": rows})
+
+    def test_creates_rows_and_returns_ids(self):
+        response = self.post([self.row(self.alice, self.course), self.row(self.bob, self.course)])
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert data["skipped"] == 0
+        stored = {e.id: e.student_id for e in self.db.query(Enrollment).all()}
+        assert [stored[id] for id in data["ids"]] == [self.alice.id, self.bob.id]
+
+    def test_skips_duplicates_existing_pairs_and_full_courses(self):
+        assert self.post([self.row(self.alice, self.course)]).json()["created"] == 1
+
+        response = self.post([
+            self.row(self.alice, self.course),        # already enrolled
+            self.row(self.bob, self.course),
+            self.row(self.bob, self.course),          # repeated in the request
+            self.row(self.alice, self.small_course),
+            self.row(self.bob, self.small_course),    # capacity 1, already taken by alice
+        ])
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert len(data["ids"]) == 2
+        assert sorted(r["reason"] for r in data["skipped_rows"]) == [
+            "already enrolled", "course at full capacity", "duplicate in request"
+        ]
+        assert self.db.query(Enrollment).count() == 3
+
+    def test_unknown_or_non_student_ids_are_rejected(self):
+        response = self.post([
+            self.row(self.alice, self.course),
+            self.row(self.lecturer, self.course),
+            {"student_id": self.bob.id, "course_id": 9999, "program_id": self.program.id},
+        ])
+
+        assert response.status_code == 400
+        detail = response.json()["detail"]
+        assert f"student {self.lecturer.id}" in detail
+        assert "course 9999" in detail
+        assert self.db.query(Enrollment).count() == 0
+
+    def test_requires_admin(self, make_user):
+        _, student_headers = make_user("carol@example.com")
+        response = self.client.post("/api/enrollments/bulk", headers=student_headers, json={
+            "enrollments": [self.row(self.alice, self.course)]
+        })
+
+        assert response.status_code == 403
+
+    def test_list_returns_joined_rows(self):
+        self.post([self.row(self.bob, self.small_course), self.row(self.alice, self.course)])
+
+        response = self.client.get("/api/enrollments", headers=self.admin_headers)
+
+        assert response.status_code == 200
+        enrollments = response.json()["enrollments"]
+        assert [(e["student_name"], e["course_code"], e["status"]) for e in enrollments] == [
+            ("Bob", "CS490", "enrolled"),
+            ("Alice", "CS201", "enrolled"),
+        ]
+
+    def test_list_requires_admin(self, make_user):
+        _, student_headers = make_user("carol@example.com")
+        assert self.client.get("/api/enrollments", headers=student_headers).status_code == 403
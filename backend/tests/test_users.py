@@ -0,0 +1,138 @@
+"""
+Tests for the admin user management endpoints
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import (
+    Course, Department, Enrollment, EnrollmentStatus, Program, ProgramType,
+    Semester, SemesterType, UserRole
+)
+
+class TestMissingUser:
+    """Unknown user ids answer 404, not 500"""
+
+    @pytest.mark.parametrize("method, path", [
+        ("get", "/api/users/9999"),
+        ("put", "/api/users/9999/activate"),
+        ("put", "/api/users/9999/deactivate"),
+        ("delete", "/api/users/9999"),
+    ])
+    def test_unknown_user_is_404(self, client, make_user, method, path):
+        _, headers = make_user("admin@example.com", UserRole.ADMIN)
+
+        response = client.request(method.upper(), path, headers=headers)
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "User not found"
+
+    def test_update_unknown_user_is_404(self, client, make_user):
+        _, headers = make_user("admin@example.com", UserRole.ADMIN)
+
+        response = client.put("/api/users/9999", headers=headers, json={"name": "Nobody"})
+
+        assert response.status_code == 404
+
+class TestUserList:
+    """GET /api/users pagination and NDJSON streaming"""
+
+    @pytest.fixture(autouse=True)
+    def setup_users(self, db, client, make_user):
+        """Setup test data"""
+        self.client = client
+        # The admin is listed too, as "Test User", after the students
+        _, self.admin_headers = make_user("admin@example.com", UserRole.ADMIN)
+        self.carol, _ = make_user("carol@example.com", name="Carol")
+        self.alice, _ = make_user("alice@example.com", name="Alice")
+        self.bob, _ = make_user("bob@example.com", name="Bob")
+
+        now = datetime.now()
+        department = Department(name="Computer Science", code="CS")
+        semester = Semester(
+            name="Fall", semester_type=SemesterType.FALL, year=now.year,
+            start_date=now, end_date=now + timedelta(days=120),
+            registration_start=now - timedelta(days=30), registration_end=now + timedelta(days=14)
+        )
+        db.add_all([department, semester])
+        db.flush()
+        program = Program(name="BSc CS", code="CS-BS", program_type=ProgramType.BACHELOR, department_id=department.id)
+        courses = [
+            Course(name=f"Course {n}", code=f"CS10{n}", department_id=department.id, semester_id=semester.id)
+            for n in range(3)
+        ]
+        db.add(program)
+        db.add_all(courses)
+        db.flush()
+        db.add_all([
+            Enrollment(student_id=self.alice.id, course_id=courses[0].id, program_id=program.id),
+            Enrollment(student_id=self.alice.id, course_id=courses[1].id, program_id=program.id),
+            Enrollment(student_id=self.alice.id, course_id=courses[2].id, program_id=program.id,
+                       status=EnrollmentStatus.DROPPED),
+            Enrollment(student_id=self.bob.id, course_id=courses[0].id, program_id=program.id),
+        ])
+        db.commit()
+
+    def get(self, **params):
+        return self.client.get("/api/users", headers=self.admin_headers, params=params)
+
+    def test_pages_follow_name_order(self):
+        response = self.get()
+        assert response.status_code == 200
+        assert [u["name"] for u in response.json()["users"]] == ["Alice", "Bob", "Carol", "Test User"]
+
+        page = self.get(limit=2, offset=1).json()["users"]
+        assert [u["name"] for u in page] == ["Bob", "Carol"]
+
+        last = self.get(limit=2, offset=3).json()["users"]
+        assert [u["name"] for u in last] == ["Test User"]
+
+    def test_enrollment_counts(self):
+        users = {u["name"]: u for u in self.get().json()["users"]}
+
+        assert users["Alice"]["enrollment_count"] == 2
+        assert users["Bob"]["enrollment_count"] == 1
+        assert users["Carol"]["enrollment_count"] == 0
+        assert users["Test User"]["enrollment_count"] == 0
+
+    def test_ndjson_is_one_object_per_line(self):
+        response = self.get(format="ndjson", limit=3)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert response.text.endswith("\n")
+        lines = response.text.splitlines()
+        assert len(lines) == 3
+        entries = [json.loads(line) for line in lines]
+        assert [e["name"] for e in entries] == ["Alice", "Bob", "Carol"]
+        assert entries[0]["enrollment_count"] == 2
+
+        # Same entries as the JSON response
+        assert entries == self.get(limit=3).json()["users"]
+
+    def test_unknown_format_is_rejected(self):
+        assert self.get(format="csv").status_code == 422
+
+class TestRoleChanges:
+    """Role-gated routes check the stored role, not just the token's role claim"""
+
+    def test_demoted_admin_loses_access(self, client, make_user):
+        _, headers = make_user("admin@example.com", UserRole.ADMIN)
+        other, other_headers = make_user("other@example.com", UserRole.ADMIN)
+        assert client.get("/api/users", headers=other_headers).status_code == 200
+
+        response = client.put(f"/api/users/{other.id}", headers=headers, json={"role": "lecturer"})
+        assert response.status_code == 200
+
+        assert client.get("/api/users", headers=other_headers).status_code == 403
+
+    def test_deactivated_admin_loses_access(self, client, make_user):
+        _, headers = make_user("admin@example.com", UserRole.ADMIN)
+        other, other_headers = make_user("other@example.com", UserRole.ADMIN)
+        assert client.get("/api/users", headers=other_headers).status_code == 200
+
+        assert client.put(f"/api/users/{other.id}/deactivate", headers=headers).status_code == 200
+
+        assert client.get("/api/users", headers=other_headers).status_code == 403
@@ -0,0 +1,151 @@
+"""
+In-process TTL cache
+Thread-safe LRU cache with per-entry expiry for hot lookups (token claims, user rows, etc.)
+
+RedisTTLCache offers the same interface backed by Redis, so JSON-able lookups can be
+shared (and invalidated) across workers.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from enum import Enum
+from typing import Any, Hashable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def redis_client(url: Optional[str]):
+    """Sync Redis client for `url`, or None when unset or redis isn't installed"""
+    if not url or redis is None:
+        return None
+    return redis.Redis.from_url(url)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RedisTTLCache:
+    """TTLCache lookalike stored in Redis under `namespace`; values must be JSON-serializable.
+
+    Redis errors are treated as cache misses so a Redis outage only costs the DB query.
+    """
+
+    def __init__(self, client, namespace: str, ttl: float = 60):
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+        # Set of live keys, so clear() never has to SCAN the keyspace. It expires with
+        # the entries it lists, so keys that expire on their own don't pile up in it
+        self._index = f"cache:{namespace}:keys"
+
+    def _key(self, key: Hashable) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(value)
+        return json.dumps(value, default=_json_default).encode()
+
+    @staticmethod
+    def _loads(raw: bytes) -> Any:
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            raw = self.client.get(self._key(key))
+        except redis.RedisError as e:
+            logger.warning("Redis cache get failed for %s: %s", self.namespace, e)
+            return default
+        return default if raw is None else self._loads(raw)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self._key(key), self._dumps(value), px=int(ttl * 1000))
+            pipe.sadd(self._index, self._key(key))
+            # Outlive every entry written with the default or this TTL
+            pipe.pexpire(self._index, int(max(ttl, self.ttl) * 1000))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Redis cache set failed for %s: %s", self.namespace, e)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        value = self.get(key, default)
+        try:
+            pipe = self.client.pipeline()
+            pipe.delete(self._key(key))
+            pipe.srem(self._index, self._key(key))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Redis cache delete failed for %s: %s", self.namespace, e)
+        return value
+
+    def clear(self) -> None:
+        try:
+            keys = self.client.smembers(self._index)
+            self.client.delete(self._index, *keys)
+        except redis.RedisError as e:
+            logger.warning("Redis cache clear failed for %s: %s", self.namespace, e)
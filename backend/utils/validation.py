@@ -3,8 +3,9 @@ Input validation utilities for security and data integrity
 """
 import re
 import html
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 from fastapi import HTTPException
+from pydantic import AfterValidator, BeforeValidator, StringConstraints
 
 
 class InputValidator:
@@ -256,40 +257,97 @@ class InputValidator:
         return validated_data
 
 
+_REGISTRATION_RULES = {
+    'first_name': {'type': 'string', 'required': True, 'field_type': 'name'},
+    'last_name': {'type': 'string', 'required': True, 'field_type': 'name'},
+    'email': {'type': 'email', 'required': True},
+    'password': {'type': 'string', 'required': True, 'field_type': 'medium_text'},
+    'phone': {'type': 'phone', 'required': False},
+    'student_id': {'type': 'code', 'required': False}
+}
+
+
 def validate_user_registration(request: Dict[str, Any]) -> Dict[str, Any]:
     """Validate user registration data"""
-    rules = {
-        'first_name': {'type': 'string', 'required': True, 'field_type': 'name'},
-        'last_name': {'type': 'string', 'required': True, 'field_type': 'name'},
-        'email': {'type': 'email', 'required': True},
-        'password': {'type': 'string', 'required': True, 'field_type': 'medium_text'},
-        'phone': {'type': 'phone', 'required': False},
-        'student_id': {'type': 'code', 'required': False}
-    }
-    return InputValidator.validate_request_data(request, rules)
+    return InputValidator.validate_request_data(request, _REGISTRATION_RULES)
+
+
+_COURSE_CREATION_RULES = {
+    'name': {'type': 'string', 'required': True, 'field_type': 'title'},
+    'code': {'type': 'code', 'required': True},
+    'description': {'type': 'string', 'required': False, 'field_type': 'description'},
+    'credits': {'type': 'integer', 'required': True, 'min_val': 1, 'max_val': 10},
+    'max_capacity': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 500},
+    'prerequisites': {'type': 'string', 'required': False, 'field_type': 'medium_text'},
+    'syllabus': {'type': 'string', 'required': False, 'field_type': 'long_text'}
+}
 
 
 def validate_course_creation(request: Dict[str, Any]) -> Dict[str, Any]:
     """Validate course creation data"""
-    rules = {
-        'name': {'type': 'string', 'required': True, 'field_type': 'title'},
-        'code': {'type': 'code', 'required': True},
-        'description': {'type': 'string', 'required': False, 'field_type': 'description'},
-        'credits': {'type': 'integer', 'required': True, 'min_val': 1, 'max_val': 10},
-        'max_capacity': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 500},
-        'prerequisites': {'type': 'string', 'required': False, 'field_type': 'medium_text'},
-        'syllabus': {'type': 'string', 'required': False, 'field_type': 'long_text'}
-    }
-    return InputValidator.validate_request_data(request, rules)
+    return InputValidator.validate_request_data(request, _COURSE_CREATION_RULES)
+
+
+_ASSIGNMENT_CREATION_RULES = {
+    'title': {'type': 'string', 'required': True, 'field_type': 'title'},
+    'description': {'type': 'string', 'required': False, 'field_type': 'description'},
+    'instructions': {'type': 'string', 'required': False, 'field_type': 'long_text'},
+    'max_points': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 1000},
+    'assignment_type': {'type': 'string', 'required': False, 'field_type': 'short_text'}
+}
 
 
 def validate_assignment_creation(request: Dict[str, Any]) -> Dict[str, Any]:
     """Validate assignment creation data"""
-    rules = {
-        'title': {'type': 'string', 'required': True, 'field_type': 'title'},
-        'description': {'type': 'string', 'required': False, 'field_type': 'description'},
-        'instructions': {'type': 'string', 'required': False, 'field_type': 'long_text'},
-        'max_points': {'type': 'integer', 'required': False, 'min_val': 1, 'max_val': 1000},
-        'assignment_type': {'type': 'string', 'required': False, 'field_type': 'short_text'}
-    }
-    return InputValidator.validate_request_data(request, rules)
+    return InputValidator.validate_request_data(request, _ASSIGNMENT_CREATION_RULES)
+
+
+# Pydantic field types applying the same rules as InputValidator, for endpoints that take
+# a typed request body (validated by pydantic-core before the handler runs)
+
+def _blank_to_none(value: Any) -> Any:
+    # InputValidator treats missing, empty and whitespace-only optional values alike
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def text_field(field_type: str = 'medium_text'):
+    """Required, stripped, HTML-sanitized string capped at MAX_LENGTHS[field_type]"""
+    return Annotated[
+        str,
+        StringConstraints(strip_whitespace=True, min_length=1, max_length=InputValidator.MAX_LENGTHS[field_type]),
+        AfterValidator(InputValidator.sanitize_html),
+    ]
+
+
+def optional_text_field(field_type: str = 'medium_text'):
+    """Like text_field, but blank values become None"""
+    return Annotated[Optional[text_field(field_type)], BeforeValidator(_blank_to_none)]
+
+
+EmailField = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True, to_lower=True,
+        max_length=InputValidator.MAX_LENGTHS['email'], pattern=InputValidator.EMAIL_PATTERN.pattern
+    ),
+]
+OptionalEmailField = Annotated[Optional[EmailField], BeforeValidator(_blank_to_none)]
+
+PhoneField = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True,
+        max_length=InputValidator.MAX_LENGTHS['phone'], pattern=InputValidator.PHONE_PATTERN.pattern
+    ),
+]
+OptionalPhoneField = Annotated[Optional[PhoneField], BeforeValidator(_blank_to_none)]
+
+CodeField = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True, to_upper=True,
+        max_length=InputValidator.MAX_LENGTHS['code'], pattern=InputValidator.CODE_PATTERN.pattern
+    ),
+]